@@ -1,13 +1,37 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.responses import FileResponse, PlainTextResponse, RedirectResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, Field
+import asyncio
+import json
+import mimetypes
 import os
 import glob
+import re
 import subprocess
 import threading
 import time
-from typing import Optional
+from typing import List, Optional
 from dotenv import load_dotenv
+from heartbeat import HeartbeatServer, DEFAULT_SOCKET_PATH
+from events import EventBus
+from scheduler import BotScheduler, SchedulerFull, free_disk_mb
+from coordinator import BATCH_PATHS, Coordinator, register_with_coordinator
+from batch import BatchRunner
+from metrics import MetricsRegistry, LIFETIME_BUCKETS
+from postprocess import PostProcessor, manifest_path
+from storage import RECORDINGS_DIR, recording_key, storage_from_env
+from transcode import FORMATS, TranscodeCache, validate_variant
+from peaks import build_peaks_from_wav, read_peaks
+from live import END_OF_STREAM, LiveAudioHub
+from capture import DEFAULT_CHANNELS, DEFAULT_SAMPLE_RATE, validate_capture
+from timeline import seek, timeline_summary
+from speakers import read_turns
+from chat import read_chat
+from auth_tokens import token_provider_from_env
+from standby import StandbyPool
+from retention import RetentionManager
 
 # Load environment variables
 load_dotenv()
@@ -18,13 +42,326 @@ app = FastAPI(title="Zoom Meeting Recorder API", version="1.0.0")
 active_processes = {}
 recording_files = {}
 
+# Meeting state transitions and recording-ready events for subscribers
+event_bus = EventBus()
+
+# Seconds between keep-alive comments on idle event streams
+EVENT_KEEPALIVE_INTERVAL = 15
+
+# Live audio from the bots' shared memory rings to /live subscribers
+live_hub = LiveAudioHub()
+
+
+def on_postprocess_complete(job):
+    event_bus.publish("artifacts_ready" if job["state"] == "done" else "postprocess_failed", job["meeting_id"],
+                      artifacts=job["artifacts"], error=job["error"])
+
+
+# Runs the configured stages (POSTPROCESS_STAGES) on every finished recording
+postprocessor = PostProcessor(
+    state_dir=os.environ.get("POSTPROCESS_STATE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "postprocess_jobs")),
+    on_complete=on_postprocess_complete
+)
+
+
+# Where bots upload recordings (RECORDING_STORAGE); /record falls back to it when the file is not local
+recording_storage = storage_from_env()
+record_redirect = os.environ.get("RECORD_STORAGE_REDIRECT", "true").lower() == "true"
+
+# Other formats and rates of recordings for /record?format=&rate=
+transcode_cache = TranscodeCache(
+    os.environ.get("TRANSCODE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "transcode_cache"))
+)
+
+
+def on_bot_event(meeting_id, message):
+    """Forward one-off bot events (e.g. recording_ready) to subscribers"""
+    data = {k: v for k, v in message.items() if k not in ("event", "meeting_id", "received_at")}
+    event_bus.publish(message["event"], meeting_id, **data)
+
+    if message["event"] == "recording_ready":
+        postprocessor.submit(meeting_id, message["path"])
+
+
+# Metrics exposed on /metrics; recording a value is lock-free (see metrics.py)
+metrics = MetricsRegistry()
+bot_spawn_seconds = metrics.histogram("zoom_bot_spawn_seconds", "Time to spawn a bot process")
+bot_start_to_joined_seconds = metrics.histogram("zoom_bot_start_to_joined_seconds", "Time from bot launch until it is in the meeting")
+bot_lifetime_seconds = metrics.histogram("zoom_bot_lifetime_seconds", "Lifetime of bot processes", LIFETIME_BUCKETS)
+audio_frames_total = metrics.counter("zoom_audio_frames_total", "Audio callbacks received by bots")
+audio_dropped_total = metrics.counter("zoom_audio_dropped_frames_total", "Audio frames bots could not write to the recording")
+recording_bytes_total = metrics.counter("zoom_recording_bytes_total", "Audio bytes written to recordings")
+recording_write_errors_total = metrics.counter("zoom_recording_write_errors_total", "Audio frames bots failed to write, e.g. on a full disk")
+record_transfer_bytes_total = metrics.counter("zoom_record_transfer_bytes_total", "Bytes served by /record")
+record_transfer_seconds = metrics.histogram("zoom_record_transfer_seconds", "Duration of /record downloads")
+record_transfer_rate = metrics.histogram(
+    "zoom_record_transfer_bytes_per_second", "Throughput of /record downloads",
+    (1e5, 1e6, 1e7, 5e7, 1e8, 5e8, 1e9)
+)
+transcode_cache_hits_total = metrics.counter("zoom_transcode_cache_hits_total", "Transcoded /record requests served from the cache")
+transcode_cache_misses_total = metrics.counter("zoom_transcode_cache_misses_total", "Transcoded /record requests that waited for ffmpeg")
+metrics.gauge_function("zoom_active_bots", "Bot processes currently running",
+                       lambda: sum(1 for process in list(active_processes.values()) if process.poll() is None))
+metrics.gauge_function("zoom_pending_bot_starts", "Start requests waiting for capacity",
+                       lambda: len(bot_scheduler.pending))
+metrics.gauge_function("zoom_standby_bots", "Authenticated bots waiting for a meeting",
+                       lambda: standby_pool.status()["waiting"])
+metrics.gauge_function("zoom_free_disk_mb", "Free space on the recordings disk",
+                       lambda: free_disk_mb(RECORDINGS_DIR) or 0)
+metrics.gauge_function("zoom_retention_freed_bytes", "Bytes the retention manager deleted or compressed away since startup",
+                       lambda: retention.status()["bytes_freed"])
+metrics.gauge_function("zoom_audio_callback_rate", "Audio callbacks per second across all bots",
+                       lambda: sum(heartbeat.get("audio_fps", 0) for heartbeat in heartbeat_server.all().values()))
+# Only reported by bots running with BOT_CALLBACK_STATS=true
+metrics.gauge_function("zoom_audio_callback_p99_seconds", "Highest p99 latency of the audio callback across bots",
+                       lambda: max((heartbeat["callbacks"]["audio"]["p99_us"] / 1e6
+                                    for heartbeat in heartbeat_server.all().values()
+                                    if "audio" in heartbeat.get("callbacks", {})), default=0))
+
+# Launch times of running bots, for start-to-joined latency and lifetime
+bot_launched_at = {}
+bots_awaiting_join = {}
+
+IN_MEETING_STATUS = "MEETING_STATUS_INMEETING"
+
+
+def record_bot_exit(meeting_id):
+    """Observe the lifetime of a bot once, whichever code path notices its exit first"""
+    launched_at = bot_launched_at.pop(meeting_id, None)
+    bots_awaiting_join.pop(meeting_id, None)
+    if launched_at is not None:
+        bot_lifetime_seconds.observe(time.monotonic() - launched_at)
+
+
+def on_bot_heartbeat(meeting_id, previous, message):
+    """Publish Zoom meeting status changes and turn cumulative bot counters into metrics"""
+    old_status = previous.get("status") if previous else None
+    if message.get("status") != old_status:
+        event_bus.publish("meeting_status", meeting_id, old_status=old_status, status=message.get("status"))
+
+        if message.get("status") == IN_MEETING_STATUS:
+            launched_at = bots_awaiting_join.pop(meeting_id, None)
+            if launched_at is not None:
+                bot_start_to_joined_seconds.observe(time.monotonic() - launched_at)
+
+    for field, counter in (("audio_frames", audio_frames_total),
+                           ("audio_dropped", audio_dropped_total),
+                           ("bytes_written", recording_bytes_total),
+                           ("write_errors", recording_write_errors_total)):
+        current = message.get(field, 0)
+        before = previous.get(field, 0) if previous else 0
+        # A restarted recorder resets its counters
+        counter.inc(current - before if current >= before else current)
+
+    # Without this a full disk only shows in the bot's log
+    error = message.get("last_write_error")
+    if error and error != (previous.get("last_write_error") if previous else None):
+        event_bus.publish("recording_write_error", meeting_id, error=error, write_errors=message.get("write_errors"))
+        retention.trigger()
+
+
+# Bots push their state here over a unix socket (see heartbeat.py)
+heartbeat_socket_path = os.environ.get("BOT_HEARTBEAT_SOCKET", DEFAULT_SOCKET_PATH)
+heartbeat_server = HeartbeatServer(
+    heartbeat_socket_path,
+    on_event=on_bot_event,
+    on_heartbeat=on_bot_heartbeat
+)
+
+
+# Exit status of bots that were cleaned up, for /status; the oldest entries are dropped
+bot_exits = {}
+MAX_BOT_EXITS = 1000
+reap_lock = threading.Lock()
+
+
+def reap_bot(meeting_id: str, process, state: str = "ended", **data) -> bool:
+    """
+    Clean up after an exited bot exactly once, whichever code path notices its exit first.
+
+    Returns:
+        False if the bot was already cleaned up (or replaced by a newer one)
+    """
+    with reap_lock:
+        if active_processes.get(meeting_id) is not process:
+            return False
+        del active_processes[meeting_id]
+        bot_exits[meeting_id] = {"pid": process.pid, "return_code": process.returncode}
+        while len(bot_exits) > MAX_BOT_EXITS:
+            bot_exits.pop(next(iter(bot_exits)))
+    heartbeat_server.forget(meeting_id)
+    bot_scheduler.release(meeting_id)
+    record_bot_exit(meeting_id)
+    event_bus.set_state(meeting_id, state, return_code=process.returncode, **data)
+    return True
+
+
+def watch_processes():
+    """Clean up after a bot and publish an 'ended' state as soon as it exits on its own"""
+    while True:
+        for meeting_id, process in list(active_processes.items()):
+            if process.poll() is not None:
+                reap_bot(meeting_id, process)
+        time.sleep(1)
+
+
+# Multi-host mode: a front instance (COORDINATOR_MODE=front) routes meetings to
+# nodes, and nodes with COORDINATOR_URL set report their capacity to it
+api_port = int(os.environ.get("API_PORT", 8000))
+coordinator = Coordinator() if os.environ.get("COORDINATOR_MODE") == "front" else None
+coordinator_url = os.environ.get("COORDINATOR_URL")
+node_url = os.environ.get("NODE_URL", f"http://127.0.0.1:{api_port}")
+
+if coordinator is not None:
+    @app.middleware("http")
+    async def route_to_owning_node(request: Request, call_next):
+        if request.url.path in BATCH_PATHS:
+            model = BatchStartRequest if request.url.path == "/start/batch" else BatchStopRequest
+            return await coordinator.route_batch(request, model)
+        meeting_id = coordinator.meeting_id_for(request)
+        if meeting_id is None:
+            return await call_next(request)
+        return await coordinator.route(request, meeting_id)
+
+
+@app.on_event("startup")
+async def start_background_services():
+    event_bus.bind(asyncio.get_running_loop())
+    heartbeat_server.start()
+    bot_scheduler.start()
+    postprocessor.start()
+    transcode_cache.start()
+    if token_provider is not None:
+        # Sign the first token now, so a credential problem shows at startup rather than at the first bot
+        try:
+            await run_in_threadpool(token_provider.token)
+        except Exception as e:
+            print(f"Error signing the SDK token, bots will sign their own: {e}")
+    standby_pool.start()
+    retention.start()
+    threading.Thread(target=watch_processes, daemon=True).start()
+    if coordinator_url:
+        threading.Thread(
+            target=register_with_coordinator,
+            args=(coordinator_url, node_url, bot_scheduler.capacity),
+            daemon=True
+        ).start()
+
+@app.on_event("shutdown")
+async def stop_background_services():
+    heartbeat_server.stop()
+    standby_pool.stop()
+    retention.stop()
+
+class NodeRegistration(BaseModel):
+    url: str
+    capacity: dict
+
+
+# Zoom meeting numbers. Recordings, logs, job state and caches are all named
+# after the meeting ID, so nothing that could form a path is accepted.
+MEETING_ID_PATTERN = r"^[0-9]+$"
+
+
 class StartMeetingResponse(BaseModel):
     status: str
     message: str
     meeting_id: str
+    queue_position: Optional[int] = None
+
+
+class BatchMeeting(BaseModel):
+    meeting_id: str = Field(pattern=MEETING_ID_PATTERN)
+    meeting_password: str
+    priority: int = 0
+    sample_rate: int = DEFAULT_SAMPLE_RATE
+    channels: int = DEFAULT_CHANNELS
+
+
+class BatchStartRequest(BaseModel):
+    meetings: List[BatchMeeting]
+
+
+class BatchStopRequest(BaseModel):
+    meeting_ids: List[str]
+
+
+# Bot output goes to a file per meeting; an undrained pipe would block the bot once full
+BOT_LOG_DIR = os.environ.get(
+    "BOT_LOG_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_program", "out", "logs")
+)
+
+
+def bot_log_path(meeting_id: str) -> str:
+    return os.path.join(BOT_LOG_DIR, f"bot_{meeting_id}.log")
+
+
+# Log files of bots that started in standby and kept their own file
+bot_log_files = {}
 
 
-def run_meeting_bot_cli(meeting_id: str, meeting_password: str):
+def bot_log_tail(meeting_id: str, max_bytes: int = 4096) -> str:
+    """Last lines a bot wrote, e.g. why it exited"""
+    try:
+        with open(bot_log_files.get(meeting_id) or bot_log_path(meeting_id), "rb") as f:
+            f.seek(max(0, os.fstat(f.fileno()).st_size - max_bytes))
+            return f.read().decode(errors="replace").strip()
+    except OSError:
+        return ""
+
+
+# Signs the SDK token bots authenticate with; None without app credentials (e.g. the fake SDK)
+token_provider = token_provider_from_env()
+
+
+def bot_env() -> dict:
+    """Environment of a bot process, including the current SDK token"""
+    env = dict(os.environ, BOT_HEARTBEAT_SOCKET=heartbeat_socket_path, BOT_NODE_ID=node_url)
+    if token_provider is not None:
+        try:
+            env["ZOOM_JWT"] = token_provider.token()
+        except Exception as e:
+            # The bot signs its own token then
+            print(f"Error signing the SDK token: {e}")
+    return env
+
+
+def spawn_standby_bot():
+    """Start a bot that initializes and authenticates now and is assigned a meeting later"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    os.makedirs(BOT_LOG_DIR, exist_ok=True)
+    log_path = os.path.join(BOT_LOG_DIR, f"bot_standby_{time.time_ns()}.log")
+    with open(log_path, "ab") as log_file:
+        process = subprocess.Popen(
+            ["python3", os.path.join(current_dir, "cli.py"), "--standby"],
+            stdin=subprocess.PIPE,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+            cwd=current_dir,
+            env=bot_env()
+        )
+    return process, log_path
+
+
+# Bots waiting for a meeting (BOT_STANDBY_POOL); start requests use them before spawning new ones
+standby_pool = StandbyPool(spawn_standby_bot)
+
+
+def pin_bot(pid: int, cpus: set):
+    """Pin every thread of a bot; a standby bot has started its SDK threads already"""
+    try:
+        threads = [int(tid) for tid in os.listdir(f"/proc/{pid}/task")]
+    except OSError:
+        threads = [pid]
+    for tid in threads:
+        try:
+            os.sched_setaffinity(tid, cpus)
+        except OSError:
+            pass
+
+
+def run_meeting_bot_cli(meeting_id: str, meeting_password: str, cpus: Optional[set] = None,
+                        sample_rate: int = DEFAULT_SAMPLE_RATE, channels: int = DEFAULT_CHANNELS) -> bool:
     """Run the meeting bot using CLI command in a separate process"""
     try:
         # Get the current directory
@@ -35,141 +372,365 @@ def run_meeting_bot_cli(meeting_id: str, meeting_password: str):
         cmd = [
             "python3", cli_script,
             "--meeting_id", meeting_id,
-            "--meeting_password", meeting_password
+            "--meeting_password", meeting_password,
+            "--sample_rate", str(sample_rate),
+            "--channels", str(channels)
         ]
         
-        # Start the process
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            cwd=current_dir
-        )
+        # Start the process, or hand the meeting to a bot that is already authenticated
+        spawn_started_at = time.monotonic()
+        os.makedirs(BOT_LOG_DIR, exist_ok=True)
+        standby = standby_pool.take(meeting_id, meeting_password, sample_rate, channels)
+        if standby is not None:
+            process, log_path = standby
+            if os.path.exists(bot_log_path(meeting_id)):
+                bot_log_files[meeting_id] = log_path
+            else:
+                os.replace(log_path, bot_log_path(meeting_id))
+                bot_log_files.pop(meeting_id, None)
+            if cpus:
+                pin_bot(process.pid, cpus)
+            print(f"Assigned meeting {meeting_id} to standby bot {process.pid}")
+        else:
+            bot_log_files.pop(meeting_id, None)
+            with open(bot_log_path(meeting_id), "ab") as log_file:
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT,
+                    cwd=current_dir,
+                    env=bot_env()
+                )
+
+            # Pin the bot before it starts its SDK threads; they inherit the affinity
+            if cpus:
+                os.sched_setaffinity(process.pid, cpus)
         
         # Store the process reference
         active_processes[meeting_id] = process
+        bot_exits.pop(meeting_id, None)
+        bot_launched_at[meeting_id] = bots_awaiting_join[meeting_id] = spawn_started_at
+        bot_spawn_seconds.observe(time.monotonic() - spawn_started_at)
+        event_bus.set_state(meeting_id, "starting", pid=process.pid)
         
         print(f"Started meeting bot process for {meeting_id} with PID {process.pid}")
+        return True
         
     except Exception as e:
         print(f"Error starting meeting bot for {meeting_id}: {e}")
         if meeting_id in active_processes:
             del active_processes[meeting_id]
+        event_bus.set_state(meeting_id, "failed", error=str(e))
+        return False
+
+# Limits how many bots run at once; extra start requests wait in a priority queue
+# Standby bots are bot processes too; the scheduler keeps room for the whole pool
+bot_scheduler = BotScheduler(launch=run_meeting_bot_cli, reserved_bots=standby_pool.size)
+
+
+def meeting_files_in_use(meeting_id: str) -> bool:
+    """Whether a meeting is still recording or post-processing, so retention must keep its files"""
+    process = active_processes.get(meeting_id)
+    if process is not None and process.poll() is None:
+        return True
+    job = postprocessor.get(meeting_id)
+    return job is not None and job["state"] in ("pending", "running")
+
+
+# Deletes, compresses or offloads old recordings and keeps the disk from filling up
+retention = RetentionManager(in_use=meeting_files_in_use, storage=recording_storage)
+
+# Seconds a new bot process must stay up to count as started
+BOT_START_GRACE = 2
+
+
+def is_bot_running(meeting_id: str) -> bool:
+    """Check whether a bot process is alive, cleaning up after one that has ended"""
+    process = active_processes.get(meeting_id)
+    if process is None:
+        return False
+    if process.poll() is None:
+        return True
+    reap_bot(meeting_id, process)
+    return False
+
+
+def check_bot_started(meeting_id: str) -> Optional[str]:
+    """Return None if the launched bot is still running, otherwise its error output"""
+    process = active_processes.get(meeting_id)
+    if process is None:
+        # The process watcher may have cleaned up after it already
+        if meeting_id not in bot_exits:
+            return "Failed to start meeting process"
+    elif process.poll() is None:  # Process is running
+        event_bus.set_state(meeting_id, "running", pid=process.pid)
+        return None
+
+    # Process failed to start
+    error_msg = bot_log_tail(meeting_id) or "Unknown error"
+    if process is None or not reap_bot(meeting_id, process, "failed", error=error_msg):
+        event_bus.set_state(meeting_id, "failed", error=error_msg)
+    return error_msg
+
+
+def stop_bot(meeting_id: str) -> str:
+    """
+    Cancel a queued start or terminate a running bot, waiting up to 10 seconds.
+    
+    Raises:
+        KeyError: if the meeting is neither queued nor running
+    """
+    if bot_scheduler.cancel(meeting_id):
+        event_bus.set_state(meeting_id, "cancelled")
+        return f"Queued meeting {meeting_id} cancelled"
+    
+    if meeting_id not in active_processes:
+        raise KeyError(meeting_id)
+    
+    process = active_processes[meeting_id]
+    
+    # Terminate the process
+    process.terminate()
+    
+    # Wait for graceful termination
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        # Force kill if it doesn't terminate gracefully
+        process.kill()
+        process.wait()
+    
+    if not reap_bot(meeting_id, process, "stopped"):
+        # The process watcher saw the exit first
+        event_bus.set_state(meeting_id, "stopped", return_code=process.returncode)
+    return f"Meeting {meeting_id} stopped successfully"
+
+
+def start_batch_meeting(meeting_id: str, meeting_password: str, priority: int, options: dict):
+    """Start one meeting of a batch; runs on a batch worker thread"""
+    if is_bot_running(meeting_id):
+        return "failed", f"Meeting {meeting_id} is already running"
+
+    error = validate_capture(options["sample_rate"], options["channels"])
+    if error:
+        return "rejected", error
+
+    try:
+        admission = bot_scheduler.submit(meeting_id, meeting_password, priority, options)
+    except SchedulerFull as e:
+        return "rejected", f"Host is at capacity: {e.reason}"
+
+    if admission["state"] == "queued":
+        event_bus.set_state(meeting_id, "queued", position=admission["position"])
+        return "queued", f"Queued at position {admission['position']}"
+
+    time.sleep(BOT_START_GRACE)
+    error_msg = check_bot_started(meeting_id)
+    if error_msg is not None:
+        return "failed", error_msg
+    return "started", None
+
+
+def stop_batch_meeting(meeting_id: str):
+    """Stop one meeting of a batch; runs on a batch worker thread"""
+    try:
+        return "stopped", stop_bot(meeting_id)
+    except KeyError:
+        return "failed", f"No active meeting found for {meeting_id}"
+
+
+def on_job_update(job):
+    event_bus.publish("job", job["meeting_id"], **{k: v for k, v in job.items() if k != "meeting_id"})
+
+
+# Batch starts are paced so a wave of meetings does not launch every bot in the same second
+batch_runner = BatchRunner(
+    start_one=start_batch_meeting,
+    stop_one=stop_batch_meeting,
+    spawn_rate=float(os.environ.get("BATCH_SPAWN_RATE", 5)),
+    spawn_burst=int(os.environ.get("BATCH_SPAWN_BURST", 5)),
+    workers=int(os.environ.get("BATCH_WORKERS", 16)),
+    on_update=on_job_update
+)
 
 @app.get("/start", response_model=StartMeetingResponse)
-async def start_meeting(meeting_id: str, meeting_password: str):
+async def start_meeting(meeting_id: str, meeting_password: str, response: Response, priority: int = 0,
+                        sample_rate: int = DEFAULT_SAMPLE_RATE, channels: int = DEFAULT_CHANNELS):
     """
     Start a Zoom meeting recording session.
     
+    If the host is at capacity the request is queued (HTTP 202) and the bot is
+    launched as soon as a slot frees up; higher priorities are launched first.
+    When the queue itself is full the request is rejected with HTTP 429.
+    
     Args:
         meeting_id: The meeting ID to start recording for
         meeting_password: The meeting password
+        priority: Queue priority, higher values start first
+        sample_rate: Capture rate of the recording: 16000, 32000 or 48000
+        channels: 1 for mono, 2 for stereo capture
         
     Returns:
         StartMeetingResponse with status and message
     """
+    if not re.fullmatch(MEETING_ID_PATTERN, meeting_id):
+        raise HTTPException(status_code=400, detail="meeting_id must be a Zoom meeting number (digits only)")
+    error = validate_capture(sample_rate, channels)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
     
     # Check if meeting is already running
-    if meeting_id in active_processes:
-        # Check if process is still running
-        process = active_processes[meeting_id]
-        if process.poll() is None:  # Process is still running
-            return StartMeetingResponse(
-                status="error",
-                message=f"Meeting {meeting_id} is already running",
-                meeting_id=meeting_id
-            )
-        else:
-            # Process has ended, remove it
-            del active_processes[meeting_id]
+    if is_bot_running(meeting_id):
+        return StartMeetingResponse(
+            status="error",
+            message=f"Meeting {meeting_id} is already running",
+            meeting_id=meeting_id
+        )
     
     try:
-        # Start the meeting bot using CLI in a separate thread
-        bot_thread = threading.Thread(
-            target=run_meeting_bot_cli,
-            args=(meeting_id, meeting_password),
-            daemon=True
+        admission = bot_scheduler.submit(meeting_id, meeting_password, priority,
+                                         {"sample_rate": sample_rate, "channels": channels})
+    except SchedulerFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Host is at capacity: {e.reason}",
+            headers={"Retry-After": str(e.retry_after)}
         )
-        bot_thread.start()
-        
-        # Give the process a moment to start
-        time.sleep(2)
+    
+    if admission["state"] == "queued":
+        event_bus.set_state(meeting_id, "queued", position=admission["position"])
+        response.status_code = 202
+        return StartMeetingResponse(
+            status="queued",
+            message=f"Meeting {meeting_id} is queued at position {admission['position']} until capacity is available",
+            meeting_id=meeting_id,
+            queue_position=admission["position"]
+        )
+    
+    try:
+        # Give the process a moment to start without blocking other requests
+        await asyncio.sleep(BOT_START_GRACE)
         
         # Check if process started successfully
-        if meeting_id in active_processes:
-            process = active_processes[meeting_id]
-            if process.poll() is None:  # Process is running
-                return StartMeetingResponse(
-                    status="success",
-                    message=f"Meeting {meeting_id} recording started successfully",
-                    meeting_id=meeting_id
-                )
-            else:
-                # Process failed to start
-                stdout, stderr = process.communicate()
-                error_msg = stderr.decode() if stderr else "Unknown error"
-                del active_processes[meeting_id]
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to start meeting: {error_msg}"
-                )
-        else:
+        error_msg = check_bot_started(meeting_id)
+        if error_msg is not None:
             raise HTTPException(
                 status_code=500,
-                detail="Failed to start meeting process"
+                detail=f"Failed to start meeting: {error_msg}"
             )
         
+        return StartMeetingResponse(
+            status="success",
+            message=f"Meeting {meeting_id} recording started successfully",
+            meeting_id=meeting_id
+        )
+        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to start meeting recording: {str(e)}"
         )
 
+@app.post("/start/batch", status_code=202)
+async def start_meetings_batch(batch: BatchStartRequest):
+    """
+    Start many meeting recordings at once.
+    
+    Every meeting becomes a job; starts run concurrently but are paced by
+    BATCH_SPAWN_RATE/BATCH_SPAWN_BURST. Job states are available from
+    /jobs/{job_id} and as "job" events on /events.
+    
+    Args:
+        batch: Meetings with their passwords and optional priorities
+        
+    Returns:
+        Dictionary with one job per meeting
+    """
+    jobs = batch_runner.submit_starts([meeting.model_dump() for meeting in batch.meetings])
+    return {"status": "accepted", "jobs": jobs}
+
+def record_transfer_done(started_at, size):
+    """Runs after a /record response body was sent"""
+    duration = time.monotonic() - started_at
+    record_transfer_bytes_total.inc(size)
+    record_transfer_seconds.observe(duration)
+    if duration > 0:
+        record_transfer_rate.observe(size / duration)
+
+async def transcoded_recording(meeting_id: str, source: str, format: str, rate: Optional[int], channels: Optional[int]):
+    """Serve a transcoded variant of a recording from the cache, transcoding it on first request"""
+    error = validate_variant(format, rate, channels)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    
+    path, hit = await asyncio.wrap_future(transcode_cache.get(meeting_id, source, format, rate, channels))
+    (transcode_cache_hits_total if hit else transcode_cache_misses_total).inc()
+    return FileResponse(
+        path=path,
+        media_type=FORMATS[format][2],
+        filename=f"meeting_recording_{meeting_id}{FORMATS[format][0]}",
+        background=BackgroundTask(record_transfer_done, time.monotonic(), os.path.getsize(path))
+    )
+
 @app.get("/record/{meeting_id}")
-async def get_recording(meeting_id: str):
+async def get_recording(meeting_id: str, format: Optional[str] = None, rate: Optional[int] = None, channels: Optional[int] = None):
     """
     Get the recording file for a specific meeting.
     
     Args:
         meeting_id: The meeting ID to get recording for
+        format: Optional output format (wav, mp3, opus, flac); transcoded and cached on first request
+        rate: Optional output sample rate, e.g. 16000
+        channels: Optional output channel count
         
     Returns:
         FileResponse with the wav file or HTTPException if not found
     """
     try:
-        # Look for the recording file for this meeting
-        # The recording files are stored in the out/audio directory
-        audio_dir = "/workspace/py-zoom-meeting-sdk/sample_program/sample_program/out/audio"
-        
-        if not os.path.exists(audio_dir):
-            raise HTTPException(
-                status_code=404,
-                detail="Audio directory not found"
-            )
+        wav_file = os.path.join(RECORDINGS_DIR, recording_key(meeting_id))
+        transcode = format is not None or rate is not None or channels is not None
         
-        # Look for the specific meeting recording file
-        wav_file = os.path.join(audio_dir, f"meeting_recording_{meeting_id}.wav")
-        print(wav_file, os.path.exists(wav_file))
-        if not os.path.exists(wav_file):
-            raise HTTPException(
-                status_code=404,
-                detail=f"No recording files found for meeting {meeting_id}"
+        # Recordings on this host's disk are served directly
+        if os.path.exists(wav_file) and os.path.getsize(wav_file) > 0:
+            if transcode:
+                return await transcoded_recording(meeting_id, wav_file, format or "wav", rate, channels)
+            return FileResponse(
+                path=wav_file,
+                media_type="audio/wav",
+                filename=recording_key(meeting_id),
+                background=BackgroundTask(record_transfer_done, time.monotonic(), os.path.getsize(wav_file))
             )
         
-        absolute_path = os.path.abspath(wav_file)
+        # Compressed by the retention manager; decoded back to WAV through the transcode cache
+        flac_file = os.path.join(RECORDINGS_DIR, recording_key(meeting_id, ".flac"))
+        if os.path.exists(flac_file):
+            return await transcoded_recording(meeting_id, flac_file, format or "wav", rate, channels)
         
-        # Check if the file exists and has content
-        if os.path.exists(absolute_path) and os.path.getsize(absolute_path) > 0:
-            return FileResponse(
-                path=absolute_path,
+        # Otherwise the recording may be in remote storage, e.g. after the bot host was replaced
+        if recording_storage.streaming and await run_in_threadpool(recording_storage.exists, recording_key(meeting_id)):
+            if transcode:
+                url = await run_in_threadpool(recording_storage.presigned_url, recording_key(meeting_id))
+                return await transcoded_recording(meeting_id, url, format or "wav", rate, channels)
+            if record_redirect:
+                url = await run_in_threadpool(recording_storage.presigned_url, recording_key(meeting_id))
+                return RedirectResponse(url, status_code=307)
+            return StreamingResponse(
+                iterate_in_threadpool(recording_storage.iter_object(recording_key(meeting_id))),
                 media_type="audio/wav",
-                filename=f"meeting_recording_{meeting_id}.wav"
+                headers={"Content-Disposition": f'attachment; filename="{recording_key(meeting_id)}"'}
             )
-        else:
+        
+        if os.path.exists(wav_file):
             raise HTTPException(
                 status_code=404,
                 detail=f"Recording file exists but is empty or corrupted"
             )
+        raise HTTPException(
+            status_code=404,
+            detail=f"No recording files found for meeting {meeting_id}"
+        )
             
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -180,6 +741,182 @@ async def get_recording(meeting_id: str):
             detail=f"Error retrieving recording: {str(e)}"
         )
 
+@app.get("/record/{meeting_id}/artifacts")
+async def get_recording_artifacts(meeting_id: str):
+    """
+    List the post-processed artifacts of a recording.
+    
+    Args:
+        meeting_id: The meeting ID to get artifacts for
+        
+    Returns:
+        Dictionary with the post-processing job state and the registered artifacts
+    """
+    job = postprocessor.get(meeting_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No post-processing job found for meeting {meeting_id}"
+        )
+    
+    manifest = {}
+    if os.path.exists(manifest_path(job["recording"])):
+        with open(manifest_path(job["recording"])) as f:
+            manifest = json.load(f)
+    
+    return {
+        "meeting_id": meeting_id,
+        "state": job["state"],
+        "stages": job["stages"],
+        "completed_stages": job["completed_stages"],
+        "error": job["error"],
+        "artifacts": manifest.get("artifacts", {})
+    }
+
+@app.get("/record/{meeting_id}/artifacts/{stage}")
+async def get_recording_artifact(meeting_id: str, stage: str):
+    """
+    Download one post-processed artifact, e.g. mp3 or transcript.
+    
+    Args:
+        meeting_id: The meeting ID
+        stage: Name of the stage that produced the artifact
+        
+    Returns:
+        FileResponse with the artifact
+    """
+    job = postprocessor.get(meeting_id)
+    path = job["artifacts"].get(stage) if job else None
+    if path is None or not os.path.exists(path):
+        raise HTTPException(
+            status_code=404,
+            detail=f"No {stage} artifact found for meeting {meeting_id}"
+        )
+    
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return FileResponse(path=path, media_type=media_type, filename=os.path.basename(path))
+
+peaks_backfill_lock = threading.Lock()
+
+def backfill_peaks(wav_file: str, resolution: int):
+    with peaks_backfill_lock:
+        peaks = read_peaks(wav_file, resolution)
+        if peaks is None:
+            build_peaks_from_wav(wav_file)
+            peaks = read_peaks(wav_file, resolution)
+        return peaks
+
+@app.get("/peaks/{meeting_id}")
+async def get_recording_peaks(meeting_id: str, resolution: int = 2000):
+    """
+    Get min/max waveform peaks of a recording for drawing its waveform.
+    
+    Args:
+        meeting_id: The meeting ID
+        resolution: Maximum number of min/max pairs wanted, e.g. the width in pixels
+        
+    Returns:
+        Dictionary with the peak level closest to the requested resolution
+    """
+    if resolution < 1:
+        raise HTTPException(status_code=400, detail="resolution must be positive")
+    
+    wav_file = os.path.join(RECORDINGS_DIR, recording_key(meeting_id))
+    peaks = await run_in_threadpool(read_peaks, wav_file, resolution)
+    if peaks is None and os.path.exists(wav_file) and not is_bot_running(meeting_id):
+        # Recordings made before peaks existed get them on first request
+        peaks = await run_in_threadpool(backfill_peaks, wav_file, resolution)
+    
+    if peaks is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No waveform peaks found for meeting {meeting_id}"
+        )
+    return dict(peaks, meeting_id=meeting_id, is_running=is_bot_running(meeting_id))
+
+@app.get("/timeline/{meeting_id}")
+async def get_recording_timeline(meeting_id: str, at: Optional[float] = None):
+    """
+    Get the capture timeline of a recording, or locate a moment in its streams.
+    
+    Args:
+        meeting_id: The meeting ID
+        at: Seconds since the recording started; when given, the audio byte offset,
+            video frame and transcript line captured at that time are returned
+        
+    Returns:
+        Dictionary with the recording start, duration and gaps, or the stream positions at `at`
+    """
+    if at is not None and at < 0:
+        raise HTTPException(status_code=400, detail="at must not be negative")
+    
+    wav_file = os.path.join(RECORDINGS_DIR, recording_key(meeting_id))
+    if at is None:
+        timeline = await run_in_threadpool(timeline_summary, wav_file)
+    else:
+        timeline = await run_in_threadpool(seek, wav_file, at)
+    
+    if timeline is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No capture timeline found for meeting {meeting_id}"
+        )
+    return dict(timeline, meeting_id=meeting_id, is_running=is_bot_running(meeting_id))
+
+@app.get("/speakers/{meeting_id}")
+async def get_speaker_turns(meeting_id: str, start: Optional[float] = None, end: Optional[float] = None):
+    """
+    Get who spoke when during a recording, from the SDK's active audio events.
+    
+    Args:
+        meeting_id: The meeting ID
+        start: Only turns ending after this many seconds since the recording started
+        end: Only turns starting before this many seconds since the recording started
+        
+    Returns:
+        Dictionary with speaker names, turns and talk time per speaker
+    """
+    if start is not None and end is not None and end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    
+    wav_file = os.path.join(RECORDINGS_DIR, recording_key(meeting_id))
+    turns = await run_in_threadpool(read_turns, wav_file, start, end)
+    if turns is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No speaker timeline found for meeting {meeting_id}"
+        )
+    return dict(turns, meeting_id=meeting_id, is_running=is_bot_running(meeting_id))
+
+@app.get("/chat/{meeting_id}")
+async def get_chat_messages(meeting_id: str, since: Optional[float] = None, limit: Optional[int] = None):
+    """
+    Get the chat messages captured by a meeting's bot.
+    
+    Args:
+        meeting_id: The meeting ID
+        since: Only messages sent after this unix timestamp, e.g. the last one already seen
+        limit: Only the most recent `limit` messages
+        
+    Returns:
+        Dictionary with the messages, oldest first
+    """
+    if limit is not None and limit < 0:
+        raise HTTPException(status_code=400, detail="limit must not be negative")
+    
+    messages = await run_in_threadpool(read_chat, meeting_id, since, limit)
+    if messages is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No chat messages found for meeting {meeting_id}"
+        )
+    return {
+        "meeting_id": meeting_id,
+        "count": len(messages),
+        "messages": messages,
+        "is_running": is_bot_running(meeting_id)
+    }
+
 @app.get("/status/{meeting_id}")
 async def get_meeting_status(meeting_id: str):
     """
@@ -193,44 +930,62 @@ async def get_meeting_status(meeting_id: str):
     """
     is_running = False
     process_info = None
+    health = {"heartbeat": None, "heartbeat_age": None, "is_stalled": False, "stall_reason": None}
     
-    if meeting_id in active_processes:
-        process = active_processes[meeting_id]
-        if process.poll() is None:  # Process is running
-            is_running = True
-            process_info = {
-                "pid": process.pid,
-                "status": "running"
-            }
-        else:
-            # Process has ended
-            process_info = {
-                "pid": process.pid,
-                "status": "ended",
-                "return_code": process.returncode
-            }
-            # Clean up the ended process
-            del active_processes[meeting_id]
+    process = active_processes.get(meeting_id)
+    if process is not None and process.poll() is None:  # Process is running
+        is_running = True
+        process_info = {
+            "pid": process.pid,
+            "status": "running"
+        }
+        health = heartbeat_server.health(meeting_id)
+    elif process is not None:
+        # Process has ended; the process watcher cleans up after it
+        process_info = {
+            "pid": process.pid,
+            "status": "ended",
+            "return_code": process.returncode
+        }
+    elif meeting_id in bot_exits:
+        process_info = dict(bot_exits[meeting_id], status="ended")
     
     # Check for recording files
-    audio_dir = "sample_program/out/audio"
     has_recording = False
     latest_recording = None
     
-    if os.path.exists(audio_dir):
-        wav_file = os.path.join(audio_dir, f"meeting_recording_{meeting_id}.wav")
-        if os.path.exists(wav_file):
-            has_recording = True
-            latest_recording = wav_file
+    wav_file = os.path.join(RECORDINGS_DIR, recording_key(meeting_id))
+    if os.path.exists(wav_file):
+        has_recording = True
+        latest_recording = wav_file
     
     return {
         "meeting_id": meeting_id,
         "is_running": is_running,
+        "queue_position": bot_scheduler.position(meeting_id),
         "process_info": process_info,
+        "heartbeat": health["heartbeat"],
+        "heartbeat_age": health["heartbeat_age"],
+        "is_stalled": health["is_stalled"],
+        "stall_reason": health["stall_reason"],
         "has_recording": has_recording,
         "latest_recording": latest_recording
     }
 
+@app.post("/stop/batch", status_code=202)
+async def stop_meetings_batch(batch: BatchStopRequest):
+    """
+    Stop many meeting recordings at once; all bots are terminated concurrently.
+    
+    Args:
+        batch: Meeting IDs to stop
+        
+    Returns:
+        Dictionary with one job per meeting
+    """
+    jobs = batch_runner.submit_stops(batch.meeting_ids)
+    return {"status": "accepted", "jobs": jobs}
+
 @app.post("/stop/{meeting_id}")
 async def stop_meeting(meeting_id: str):
     """
@@ -242,39 +997,184 @@ async def stop_meeting(meeting_id: str):
     Returns:
         Dictionary with stop status
     """
-    if meeting_id not in active_processes:
-        raise HTTPException(
-            status_code=404,
-            detail=f"No active meeting found for {meeting_id}"
-        )
-    
-    process = active_processes[meeting_id]
-    
     try:
-        # Terminate the process
-        process.terminate()
-        
-        # Wait for graceful termination
-        try:
-            process.wait(timeout=10)
-        except subprocess.TimeoutExpired:
-            # Force kill if it doesn't terminate gracefully
-            process.kill()
-            process.wait()
-        
-        del active_processes[meeting_id]
-        
+        message = await run_in_threadpool(stop_bot, meeting_id)
         return {
             "status": "success",
-            "message": f"Meeting {meeting_id} stopped successfully"
+            "message": message
         }
         
+    except KeyError:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No active meeting found for {meeting_id}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error stopping meeting: {str(e)}"
         )
 
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Get the state of a batch start/stop job.
+    
+    Args:
+        job_id: Job ID returned by /start/batch or /stop/batch
+        
+    Returns:
+        Job dictionary with state (pending, running, started, queued, rejected, stopped, failed) and detail
+    """
+    job = batch_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics in the text exposition format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/capacity")
+async def get_capacity():
+    """
+    Get the bot admission limits and current usage of this host.
+    
+    Returns:
+        Dictionary with running and pending bots, free memory, disk and load, the reason new bots
+        are held back, and the state of the standby pool and the retention manager
+    """
+    return dict(bot_scheduler.capacity(), standby=standby_pool.status(),
+                sdk_token=token_provider.status() if token_provider else None,
+                retention=retention.status())
+
+@app.post("/nodes/register")
+async def register_node(registration: NodeRegistration):
+    """
+    Register a bot node with this coordinator, or refresh its capacity.
+    
+    Args:
+        registration: Node base URL and its /capacity snapshot
+        
+    Returns:
+        Dictionary with registration status
+    """
+    if coordinator is None:
+        raise HTTPException(status_code=404, detail="This instance is not running in coordinator mode")
+    coordinator.register(registration.url, registration.capacity)
+    return {"status": "success"}
+
+@app.get("/nodes")
+async def list_nodes():
+    """List live bot nodes with their capacity and the meetings placed on them"""
+    if coordinator is None:
+        raise HTTPException(status_code=404, detail="This instance is not running in coordinator mode")
+    return coordinator.describe()
+
+def format_sse(event):
+    """Encode an event as a Server-Sent Events message"""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream_events(meeting_id: Optional[str]):
+    subscription = event_bus.subscribe(meeting_id)
+    try:
+        # Start with the current state so clients do not miss transitions that happened before connecting
+        for state_meeting_id, state in event_bus.get_states(meeting_id).items():
+            yield format_sse({"type": "snapshot", "meeting_id": state_meeting_id, "state": state, "ts": time.time()})
+
+        while not subscription.overflowed:
+            event = await subscription.get(timeout=EVENT_KEEPALIVE_INTERVAL)
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield format_sse(event)
+    finally:
+        event_bus.unsubscribe(subscription)
+
+
+@app.get("/events")
+async def subscribe_events(meeting_id: Optional[str] = None):
+    """
+    Stream meeting events as Server-Sent Events.
+    
+    Args:
+        meeting_id: Only stream events for this meeting (all meetings if omitted)
+        
+    Returns:
+        text/event-stream with state, meeting_status and recording_ready events
+    """
+    return StreamingResponse(
+        stream_events(meeting_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/events/{meeting_id}")
+async def subscribe_meeting_events(meeting_id: str):
+    """Stream events of a single meeting as Server-Sent Events"""
+    return await subscribe_events(meeting_id)
+
+@app.websocket("/live/{meeting_id}")
+async def live_audio(websocket: WebSocket, meeting_id: str, rate: Optional[int] = None):
+    """
+    Stream a meeting's audio in real time.
+    
+    The first message is JSON describing the format; every following message
+    is a binary chunk of little-endian 16-bit PCM. A client that cannot keep up
+    is disconnected with code 1013.
+    
+    Args:
+        meeting_id: The meeting ID to listen to
+        rate: Optional output sample rate that divides the bot's rate, e.g. 16000
+    """
+    await websocket.accept()
+    try:
+        subscriber = live_hub.subscribe(meeting_id, rate)
+    except FileNotFoundError:
+        await websocket.close(code=1008, reason=f"No live audio for meeting {meeting_id}")
+        return
+    except ValueError as e:
+        await websocket.close(code=1003, reason=str(e))
+        return
+    
+    try:
+        await websocket.send_json(dict(subscriber.format, meeting_id=meeting_id))
+        while True:
+            chunk = await subscriber.get(timeout=EVENT_KEEPALIVE_INTERVAL)
+            if subscriber.overflowed:
+                await websocket.close(code=1013, reason="Slow consumer")
+                break
+            if chunk == END_OF_STREAM:
+                await websocket.close(code=1000, reason="Meeting audio ended")
+                break
+            if chunk is not None:
+                await websocket.send_bytes(chunk)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live_hub.unsubscribe(meeting_id, subscriber)
+
+@app.websocket("/ws/events")
+async def websocket_events(websocket: WebSocket, meeting_id: Optional[str] = None):
+    """Same event stream as /events, delivered as JSON messages over a WebSocket"""
+    await websocket.accept()
+    subscription = event_bus.subscribe(meeting_id)
+    try:
+        for state_meeting_id, state in event_bus.get_states(meeting_id).items():
+            await websocket.send_json({"type": "snapshot", "meeting_id": state_meeting_id, "state": state, "ts": time.time()})
+
+        while not subscription.overflowed:
+            event = await subscription.get(timeout=EVENT_KEEPALIVE_INTERVAL)
+            if event is not None:
+                await websocket.send_json(event)
+        await websocket.close(code=1013)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        event_bus.unsubscribe(subscription)
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -282,13 +1182,26 @@ async def root():
         "message": "Zoom Meeting Recorder API",
         "version": "1.0.0",
         "endpoints": {
-            "start": "GET /start?meeting_id={id}&meeting_password={password} - Start meeting recording",
+            "start": "GET /start?meeting_id={id}&meeting_password={password}&priority={n}&sample_rate={hz}&channels={n} - Start meeting recording (queued when at capacity)",
             "record": "GET /record/{meeting_id} - Download recording wav file",
+            "artifacts": "GET /record/{meeting_id}/artifacts[/{stage}] - Post-processed artifacts",
+            "peaks": "GET /peaks/{meeting_id}?resolution={n} - Waveform min/max peaks",
+            "timeline": "GET /timeline/{meeting_id}?at={seconds} - Capture timeline, gaps and stream positions",
+            "speakers": "GET /speakers/{meeting_id}?start={seconds}&end={seconds} - Speaker turns",
+            "chat": "GET /chat/{meeting_id}?since={timestamp}&limit={n} - Captured chat messages",
             "status": "GET /status/{meeting_id} - Get meeting status",
-            "stop": "POST /stop/{meeting_id} - Stop meeting recording"
+            "stop": "POST /stop/{meeting_id} - Stop meeting recording",
+            "start_batch": "POST /start/batch - Start many meetings, returns job ids",
+            "stop_batch": "POST /stop/batch - Stop many meetings, returns job ids",
+            "jobs": "GET /jobs/{job_id} - Batch job state",
+            "events": "GET /events?meeting_id={id} - Stream meeting events (SSE), also WS /ws/events",
+            "live": "WS /live/{meeting_id}?rate={hz} - Stream live meeting audio (16-bit PCM)",
+            "capacity": "GET /capacity - Bot admission limits and usage",
+            "metrics": "GET /metrics - Prometheus metrics",
+            "nodes": "GET /nodes - Registered bot nodes (coordinator mode only)"
         }
     }
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=api_port)
@@ -0,0 +1,213 @@
+"""
+Live audio bus between a bot process and local consumers.
+
+Each recording bot publishes its PCM into a multiprocessing.shared_memory ring
+buffer named zoom_audio_<meeting_id>. A 64-byte header describes the stream:
+
+    offset  type     field
+    0       4s       magic b"ZAB1"
+    4       uint32   version
+    8       uint32   sample rate
+    12      uint32   channels
+    16      uint32   sample width in bytes
+    20      uint32   closed flag, set when the bot stops publishing
+    24      uint64   capacity of the ring in bytes
+    32      uint64   write index: total bytes ever written
+    40      float64  wall time of the first write
+    48      float64  wall time of the last write
+    56      float64  time.monotonic() of the last write
+
+The writer copies the data first and publishes the new write index last, so a
+reader never sees an index ahead of the data. Readers (the API, live
+transcription, VAD, monitoring) attach by meeting id, can look at the ring
+in place through a NumPy view, and detect when the writer has lapped them.
+
+Run `python audio_bus.py <meeting_id>` to print the level of a live meeting.
+"""
+
+import re
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+MAGIC = b"ZAB1"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIIIQQddd")
+HEADER_SIZE = 64
+CLOSED_OFFSET = 20
+WRITE_INDEX_OFFSET = 32
+TIMES_OFFSET = 40
+TIMES = struct.Struct("<ddd")
+INDEX = struct.Struct("<Q")
+
+DEFAULT_SECONDS = 30
+
+# Segments created by writers in this process
+_owned_names = set()
+
+
+def bus_name(meeting_id):
+    return "zoom_audio_" + re.sub(r"[^A-Za-z0-9_]", "_", str(meeting_id))
+
+
+class AudioBusWriter:
+    """Bot side: owns the shared memory segment and appends PCM to the ring"""
+
+    def __init__(self, meeting_id, sample_rate, channels=1, sample_width=2, seconds=DEFAULT_SECONDS):
+        frame_bytes = channels * sample_width
+        self.capacity = int(sample_rate * seconds) * frame_bytes
+        self.name = bus_name(meeting_id)
+
+        try:
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=HEADER_SIZE + self.capacity)
+        except FileExistsError:
+            # Left behind by a bot that was killed; nobody else writes this meeting
+            stale = shared_memory.SharedMemory(name=self.name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=HEADER_SIZE + self.capacity)
+
+        _owned_names.add(self.name)
+        HEADER.pack_into(self.shm.buf, 0, MAGIC, VERSION, sample_rate, channels, sample_width, 0,
+                         self.capacity, 0, 0.0, 0.0, 0.0)
+        self.data = self.shm.buf[HEADER_SIZE:]
+        self.write_index = 0
+        self.first_write_time = 0.0
+
+    def write(self, pcm_data):
+        """Append PCM bytes; the oldest audio is overwritten once the ring is full"""
+        pcm_data = memoryview(pcm_data)
+        size = len(pcm_data)
+        if size > self.capacity:
+            pcm_data = pcm_data[-self.capacity:]
+            self.write_index += size - self.capacity
+            size = self.capacity
+
+        start = self.write_index % self.capacity
+        first = min(size, self.capacity - start)
+        self.data[start:start + first] = pcm_data[:first]
+        if first < size:
+            self.data[:size - first] = pcm_data[first:]
+
+        now = time.time()
+        if not self.first_write_time:
+            self.first_write_time = now
+        TIMES.pack_into(self.shm.buf, TIMES_OFFSET, self.first_write_time, now, time.monotonic())
+        self.write_index += size
+        INDEX.pack_into(self.shm.buf, WRITE_INDEX_OFFSET, self.write_index)
+
+    def close(self):
+        """Mark the stream closed and remove the segment; attached readers keep their mapping"""
+        struct.pack_into("<I", self.shm.buf, CLOSED_OFFSET, 1)
+        self.data.release()
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        _owned_names.discard(self.name)
+
+
+class AudioBusReader:
+    """Consumer side: attaches to a bot's ring buffer by meeting id"""
+
+    def __init__(self, meeting_id, from_start=False):
+        """
+        Args:
+            meeting_id: Meeting whose audio to read
+            from_start: Start with the audio still in the ring instead of only new audio
+
+        Raises:
+            FileNotFoundError: If no bot publishes audio for the meeting
+        """
+        self.shm = shared_memory.SharedMemory(name=bus_name(meeting_id))
+        # Before Python 3.13 attaching registers the segment with this process's
+        # resource tracker, which would unlink the bot's segment when we exit
+        if self.shm.name not in _owned_names:
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+
+        magic, version, self.sample_rate, self.channels, self.sample_width, _, self.capacity, _, _, _, _ = \
+            HEADER.unpack_from(self.shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.shm.close()
+            raise ValueError(f"{bus_name(meeting_id)} is not a version {VERSION} audio bus")
+
+        self.data = self.shm.buf[HEADER_SIZE:HEADER_SIZE + self.capacity]
+        # Zero-copy view of the whole ring as samples; valid data is described by the header
+        self.ring = np.frombuffer(self.data, dtype=f"<i{self.sample_width}")
+        self.position = max(0, self.write_index() - self.capacity) if from_start else self.write_index()
+
+    def write_index(self):
+        return INDEX.unpack_from(self.shm.buf, WRITE_INDEX_OFFSET)[0]
+
+    def is_closed(self):
+        return struct.unpack_from("<I", self.shm.buf, CLOSED_OFFSET)[0] == 1
+
+    def timestamps(self):
+        """(first write wall time, last write wall time, last write monotonic time)"""
+        return TIMES.unpack_from(self.shm.buf, TIMES_OFFSET)
+
+    def read(self, max_bytes=None):
+        """
+        Copy out the audio written since the last read.
+
+        Returns:
+            Tuple (pcm bytes, dropped bytes), where dropped counts audio the
+            writer overwrote before this reader got to it
+        """
+        end = self.write_index()
+        dropped = 0
+        if end - self.position > self.capacity:
+            dropped = end - self.capacity - self.position
+            self.position = end - self.capacity
+        if max_bytes is not None:
+            end = min(end, self.position + max_bytes)
+
+        size = end - self.position
+        start = self.position % self.capacity
+        first = min(size, self.capacity - start)
+        chunk = bytes(self.data[start:start + first])
+        if first < size:
+            chunk += bytes(self.data[:size - first])
+
+        # The writer may have lapped us while copying; discard what it overwrote
+        overwritten = self.write_index() - self.capacity - self.position
+        if overwritten > 0:
+            chunk = chunk[overwritten:]
+            dropped += overwritten
+
+        self.position = end
+        return chunk, dropped
+
+    def close(self):
+        del self.ring
+        self.data.release()
+        self.shm.close()
+
+
+def monitor(meeting_id):
+    """Print the level of a live meeting once per second"""
+    reader = AudioBusReader(meeting_id)
+    print(f"{bus_name(meeting_id)}: {reader.sample_rate} Hz, {reader.channels} channel(s)")
+    try:
+        while not reader.is_closed():
+            time.sleep(1)
+            pcm, dropped = reader.read()
+            samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32)
+            rms = float(np.sqrt(np.mean(samples ** 2))) if len(samples) else 0.0
+            age = time.monotonic() - reader.timestamps()[2]
+            print(f"rms={rms:8.1f} bytes={len(pcm)} dropped={dropped} last_write_age={age:.2f}s")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python audio_bus.py <meeting_id>")
+        sys.exit(1)
+    monitor(sys.argv[1])
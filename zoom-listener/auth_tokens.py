@@ -0,0 +1,73 @@
+"""
+Zoom Meeting SDK JWTs.
+
+The API signs one token with the app credentials and hands it to every bot it
+launches in ZOOM_JWT, so bots neither sign tokens nor need the client secret.
+The token is re-signed when less than ZOOM_JWT_REFRESH_SECONDS of its lifetime
+(ZOOM_JWT_TTL_SECONDS) is left; a bot only needs the token to be valid while
+it authenticates.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+JWT_TTL = int(os.environ.get("ZOOM_JWT_TTL_SECONDS", 24 * 3600))
+JWT_REFRESH = int(os.environ.get("ZOOM_JWT_REFRESH_SECONDS", 3600))
+
+
+def generate_jwt(client_id, client_secret, ttl=JWT_TTL):
+    import jwt
+
+    iat = datetime.utcnow()
+    exp = iat + timedelta(seconds=ttl)
+
+    payload = {
+        "iat": iat,
+        "exp": exp,
+        "appKey": client_id,
+        "tokenExp": int(exp.timestamp())
+    }
+
+    return jwt.encode(payload, client_secret, algorithm="HS256")
+
+
+class TokenProvider:
+    """Current SDK token, re-signed shortly before it expires; safe to share between threads"""
+
+    def __init__(self, client_id, client_secret, ttl=JWT_TTL, refresh=JWT_REFRESH):
+        if refresh >= ttl:
+            raise ValueError("ZOOM_JWT_REFRESH_SECONDS must be shorter than ZOOM_JWT_TTL_SECONDS")
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.ttl = ttl
+        self.refresh = refresh
+        self.lock = threading.Lock()
+        self.current = None
+        self.expires_at = 0.0
+        self.signed = 0
+
+    def token(self):
+        with self.lock:
+            if self.current is None or time.time() > self.expires_at - self.refresh:
+                self.current = generate_jwt(self.client_id, self.client_secret, self.ttl)
+                self.expires_at = time.time() + self.ttl
+                self.signed += 1
+            return self.current
+
+    def status(self):
+        with self.lock:
+            return {
+                "expires_in": round(self.expires_at - time.time()) if self.current else None,
+                "signed": self.signed
+            }
+
+
+def token_provider_from_env():
+    """TokenProvider for the app credentials, or None if they are not configured"""
+    client_id = os.environ.get("ZOOM_APP_CLIENT_ID")
+    client_secret = os.environ.get("ZOOM_APP_CLIENT_SECRET")
+    if not client_id or not client_secret:
+        return None
+    return TokenProvider(client_id, client_secret)
@@ -0,0 +1,136 @@
+"""
+Batch start/stop of meeting bots.
+
+Scheduled meeting waves arrive as one request with dozens of meetings. Each
+meeting becomes a job that runs on a small worker pool, so the request returns
+immediately with per-meeting job ids. Starts pass through a token bucket that
+smooths the spawn rate, because launching every Zoom SDK bot in the same
+second saturates the CPU and makes all of them join late.
+"""
+
+import collections
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_TRACKED_JOBS = 10000
+
+
+class TokenBucket:
+    """Blocking token bucket: at most `burst` acquisitions at once, refilled at `rate` per second"""
+
+    def __init__(self, rate, burst):
+        # A zero rate never refills and a burst below one never holds a whole token
+        if rate <= 0:
+            raise ValueError(f"BATCH_SPAWN_RATE must be greater than 0, not {rate}")
+        if burst < 1:
+            raise ValueError(f"BATCH_SPAWN_BURST must be at least 1, not {burst}")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class BatchRunner:
+    """Runs batch start/stop jobs on a worker pool and keeps their state for /jobs queries"""
+
+    def __init__(self, start_one, stop_one, spawn_rate=5.0, spawn_burst=5, workers=8, on_update=None):
+        """
+        Args:
+            start_one: Callable (meeting_id, meeting_password, priority, options) -> (state, detail)
+            stop_one: Callable (meeting_id) -> (state, detail)
+            spawn_rate: Bot starts per second after the initial burst
+            spawn_burst: Bot starts allowed back to back
+            workers: Number of jobs executed concurrently
+            on_update: Optional callable (job) invoked on every job state change
+        """
+        self.start_one = start_one
+        self.stop_one = stop_one
+        self.pacer = TokenBucket(spawn_rate, spawn_burst)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch")
+        self.on_update = on_update
+        self.lock = threading.Lock()
+        self.jobs = collections.OrderedDict()
+
+    def submit_starts(self, meetings) -> list:
+        """
+        Queue start jobs for dicts with meeting_id, meeting_password and optional
+        priority; any other keys are passed to start_one as options
+        """
+        jobs = []
+        for meeting in meetings:
+            job = self._create("start", meeting["meeting_id"])
+            jobs.append(dict(job))
+            options = {k: v for k, v in meeting.items() if k not in ("meeting_id", "meeting_password", "priority")}
+            self.executor.submit(self._run_start, job, meeting["meeting_password"], meeting.get("priority", 0), options)
+        return jobs
+
+    def submit_stops(self, meeting_ids) -> list:
+        jobs = []
+        for meeting_id in meeting_ids:
+            job = self._create("stop", meeting_id)
+            jobs.append(dict(job))
+            self.executor.submit(self._run_stop, job)
+        return jobs
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _create(self, kind, meeting_id):
+        now = time.time()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "meeting_id": meeting_id,
+            "state": "pending",
+            "detail": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        with self.lock:
+            self.jobs[job["job_id"]] = job
+            while len(self.jobs) > MAX_TRACKED_JOBS:
+                self.jobs.popitem(last=False)
+        return job
+
+    def _update(self, job, state, detail=None):
+        with self.lock:
+            job["state"] = state
+            job["detail"] = detail
+            job["updated_at"] = time.time()
+            snapshot = dict(job)
+        if self.on_update:
+            self.on_update(snapshot)
+
+    def _run_start(self, job, meeting_password, priority, options):
+        self.pacer.acquire()
+        self._update(job, "running")
+        try:
+            state, detail = self.start_one(job["meeting_id"], meeting_password, priority, options)
+        except Exception as e:
+            state, detail = "failed", str(e)
+        self._update(job, state, detail)
+
+    def _run_stop(self, job):
+        self._update(job, "running")
+        try:
+            state, detail = self.stop_one(job["meeting_id"])
+        except Exception as e:
+            state, detail = "failed", str(e)
+        self._update(job, state, detail)
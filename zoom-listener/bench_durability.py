@@ -0,0 +1,121 @@
+"""
+Benchmark of the recording durability modes.
+
+Writes 10 ms audio chunks, the size of the SDK's audio callbacks, for several
+concurrent recordings as fast as possible, and reports the throughput and the
+latency of a single write as the audio callback sees it. "writeframes" is the
+writer before durability modes: wave.writeframes() with its header update
+after every chunk.
+
+Intervals are shortened so the syncs happen during a short run; the time a
+sync takes does not depend on how often it runs, only on the data it flushes.
+
+Usage:
+    python bench_durability.py [--seconds 600] [--streams 8] [--dir /path/on/recording/disk]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+import wave
+
+import numpy as np
+
+from durability import DurableWavFile
+
+SAMPLE_RATE = 32000
+CHUNK_MS = 10
+
+
+def writeframes_writer(path):
+    wave_file = wave.open(path, "wb")
+    wave_file.setnchannels(1)
+    wave_file.setsampwidth(2)
+    wave_file.setframerate(SAMPLE_RATE)
+    return wave_file.writeframes, wave_file.close, lambda: None
+
+
+def durable_writer(path, mode, fsync_interval, segment_seconds):
+    wav = DurableWavFile(path, SAMPLE_RATE, 1, 2, mode=mode, fsync_interval=fsync_interval,
+                         segment_seconds=segment_seconds, header_interval=fsync_interval)
+    return wav.write, wav.close, wav.stats
+
+
+def write_stream(open_writer, path, chunks, chunk, latencies, results, index):
+    write, close, stats = open_writer(path)
+    own = np.empty(chunks)
+    for i in range(chunks):
+        started = time.perf_counter()
+        write(chunk)
+        own[i] = time.perf_counter() - started
+    close()
+    latencies[index] = own
+    results[index] = stats()
+
+
+def run(name, open_writer, directory, seconds, streams):
+    chunk = np.zeros(SAMPLE_RATE * CHUNK_MS // 1000, dtype="<i2").tobytes()
+    chunks = seconds * 1000 // CHUNK_MS
+    latencies = [None] * streams
+    results = [None] * streams
+    threads = [
+        threading.Thread(target=write_stream, args=(open_writer, os.path.join(directory, f"{name}_{i}.wav"),
+                                                    chunks, chunk, latencies, results, i))
+        for i in range(streams)
+    ]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latency = np.concatenate(latencies) * 1e6
+    total_bytes = streams * chunks * len(chunk)
+    for i in range(streams):
+        os.remove(os.path.join(directory, f"{name}_{i}.wav"))
+    return {
+        "mode": name,
+        "mb_per_second": total_bytes / wall / 1e6,
+        "realtime": streams * seconds / wall,
+        "p50_us": np.percentile(latency, 50),
+        "p99_us": np.percentile(latency, 99),
+        "max_us": latency.max(),
+        "syncs": sum((result or {}).get("syncs", 0) for result in results),
+        "max_sync_ms": max((result or {}).get("max_sync_ms", 0) for result in results)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the recording durability modes")
+    parser.add_argument("--seconds", type=int, default=600, help="Audio duration per recording")
+    parser.add_argument("--streams", type=int, default=8, help="Concurrent recordings")
+    parser.add_argument("--dir", help="Directory on the disk to test; defaults to a temporary directory")
+    parser.add_argument("--fsync-interval", type=float, default=0.5, help="Periodic mode interval in seconds")
+    parser.add_argument("--segment-seconds", type=float, default=30, help="Segment mode segment length")
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix="bench_durability_")
+    writers = (
+        ("writeframes", writeframes_writer),
+        ("none", lambda path: durable_writer(path, "none", args.fsync_interval, args.segment_seconds)),
+        ("periodic", lambda path: durable_writer(path, "periodic", args.fsync_interval, args.segment_seconds)),
+        ("segment", lambda path: durable_writer(path, "segment", args.fsync_interval, args.segment_seconds)),
+    )
+
+    print(f"{args.streams} recordings of {args.seconds} s at {SAMPLE_RATE // 1000} kHz mono in {CHUNK_MS} ms chunks, in {directory}")
+    print(f"{'mode':<13}{'MB/s':>8}{'x realtime':>12}{'p50 us':>9}{'p99 us':>9}{'max us':>10}{'syncs':>7}{'max sync':>11}")
+    for name, open_writer in writers:
+        result = run(name, open_writer, directory, args.seconds, args.streams)
+        print(f"{result['mode']:<13}{result['mb_per_second']:>8.1f}{result['realtime']:>12.0f}"
+              f"{result['p50_us']:>9.1f}{result['p99_us']:>9.1f}{result['max_us']:>10.0f}"
+              f"{result['syncs']:>7}{result['max_sync_ms']:>9.1f}ms")
+    if not args.dir:
+        os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main()
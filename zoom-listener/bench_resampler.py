@@ -0,0 +1,69 @@
+"""
+Benchmark of the streaming resampler as used on the bot's audio path.
+
+Feeds synthetic speech-like audio in 10 ms chunks, the size of the SDK's
+audio callbacks, and reports the CPU cost per stream and the bandwidth a
+transcription feed saves at the lower rate.
+
+Usage:
+    python bench_resampler.py [--seconds 60] [--chunk-ms 10]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from resampler import StreamingResampler
+
+CONVERSIONS = ((32000, 16000), (32000, 8000), (48000, 16000), (48000, 32000))
+
+
+def synthetic_audio(rate, seconds):
+    rng = np.random.default_rng(0)
+    t = np.arange(int(rate * seconds)) / rate
+    voice = np.sin(2 * np.pi * 180 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    return (voice * 8000 + rng.standard_normal(len(t)) * 500).astype("<i2")
+
+
+def run(input_rate, output_rate, seconds, chunk_ms):
+    audio = synthetic_audio(input_rate, seconds).tobytes()
+    chunk_bytes = input_rate * chunk_ms // 1000 * 2
+    resampler = StreamingResampler(input_rate, output_rate)
+
+    output_bytes = 0
+    chunks = 0
+    started = time.process_time()
+    for i in range(0, len(audio), chunk_bytes):
+        output_bytes += len(resampler.process(audio[i:i + chunk_bytes]))
+        chunks += 1
+    cpu = time.process_time() - started
+
+    return {
+        "conversion": f"{input_rate // 1000}k->{output_rate // 1000}k",
+        "cpu_percent": 100 * cpu / seconds,
+        "us_per_chunk": 1e6 * cpu / chunks,
+        "input_kbps": len(audio) * 8 / seconds / 1000,
+        "output_kbps": output_bytes * 8 / seconds / 1000,
+        "saved_percent": 100 * (1 - output_bytes / len(audio)),
+        "latency_ms": 1000 * resampler.latency_seconds()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming resampler")
+    parser.add_argument("--seconds", type=int, default=60, help="Audio duration per conversion")
+    parser.add_argument("--chunk-ms", type=int, default=10, help="Chunk size in milliseconds")
+    args = parser.parse_args()
+
+    print(f"{args.seconds} s of audio per conversion in {args.chunk_ms} ms chunks, one stream")
+    print(f"{'conversion':<12}{'CPU/stream':>12}{'us/chunk':>10}{'in kbit/s':>11}{'out kbit/s':>12}{'saved':>8}{'delay':>9}")
+    for input_rate, output_rate in CONVERSIONS:
+        result = run(input_rate, output_rate, args.seconds, args.chunk_ms)
+        print(f"{result['conversion']:<12}{result['cpu_percent']:>11.2f}%{result['us_per_chunk']:>10.1f}"
+              f"{result['input_kbps']:>11.0f}{result['output_kbps']:>12.0f}{result['saved_percent']:>7.0f}%"
+              f"{result['latency_ms']:>7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
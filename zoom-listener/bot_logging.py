@@ -0,0 +1,165 @@
+"""
+Logging for meeting bot processes.
+
+SDK callbacks must not block on writes to a pipe or file. Bot modules log
+through the "zoom_bot" logger, whose only handler puts the record on a queue.
+A QueueListener thread formats the records and writes them. Records are not
+formatted before they are queued, so a callback pays only for the level check,
+the rate limiter and the enqueue; pass immutable arguments (ints, strings) and
+let logging interpolate them.
+
+Every line carries the meeting id and node id. BOT_LOG_FORMAT=json writes one
+JSON object per line instead of text. A message logged from the same line of
+code more than RATE_LIMIT_BURST times within RATE_LIMIT_WINDOW seconds is
+suppressed for the rest of the window; the next message from that line reports
+how many were suppressed. Errors are never suppressed.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import socket
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+LOGGER_NAME = "zoom_bot"
+
+LOG_LEVEL = os.environ.get("BOT_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("BOT_LOG_FORMAT", "text")
+RATE_LIMIT_WINDOW = float(os.environ.get("BOT_LOG_RATE_WINDOW", 10))
+RATE_LIMIT_BURST = int(os.environ.get("BOT_LOG_RATE_BURST", 20))
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s [meeting=%(meeting_id)s node=%(node_id)s] %(message)s"
+
+_listener = None
+_context = None
+
+log = logging.getLogger(LOGGER_NAME)
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets through RATE_LIMIT_BURST records per call site and window; suppressed records are never queued"""
+
+    def __init__(self, window=RATE_LIMIT_WINDOW, burst=RATE_LIMIT_BURST):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.lock = threading.Lock()
+        # (pathname, lineno) -> [window start, records in window, records suppressed]
+        self.sites = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        site = (record.pathname, record.lineno)
+        now = record.created
+        with self.lock:
+            state = self.sites.get(site)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state else 0
+                self.sites[site] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            state[1] += 1
+            if state[1] <= self.burst:
+                return True
+            state[2] += 1
+            return False
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread"""
+
+    def prepare(self, record):
+        return record
+
+
+class _ContextFilter(logging.Filter):
+    def __init__(self, meeting_id, node_id):
+        super().__init__()
+        self.meeting_id = meeting_id
+        self.node_id = node_id
+
+    def filter(self, record):
+        record.meeting_id = self.meeting_id
+        record.node_id = self.node_id
+        return True
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record):
+        line = super().format(record)
+        if getattr(record, "suppressed", 0):
+            line += f" (suppressed {record.suppressed} similar messages)"
+        return line
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "meeting_id": record.meeting_id,
+            "node_id": record.node_id,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_bot_logging(meeting_id, node_id=None, level=LOG_LEVEL, stream=None):
+    """
+    Route the "zoom_bot" logger through a queue to a background writer thread.
+
+    Args:
+        meeting_id: Added to every record
+        node_id: Added to every record; defaults to BOT_NODE_ID or the host name
+        level: Minimum level; records below it are dropped before they are queued
+        stream: Where the listener writes, default stdout (the API points it at the bot's log file)
+    """
+    global _listener, _context
+    if _listener is not None:
+        return log
+
+    node_id = node_id or os.environ.get("BOT_NODE_ID") or socket.gethostname()
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(_JsonFormatter() if LOG_FORMAT == "json" else _TextFormatter(TEXT_FORMAT))
+    _context = _ContextFilter(meeting_id, node_id)
+    handler.addFilter(_context)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())
+    log.handlers = [queue_handler]
+    log.setLevel(level)
+    log.propagate = False
+
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_bot_logging)
+    return log
+
+
+def set_log_meeting_id(meeting_id):
+    """Tag later records with a new meeting id, e.g. when a standby bot is assigned a meeting"""
+    if _context is not None:
+        _context.meeting_id = meeting_id
+
+
+def shutdown_bot_logging():
+    """Write out queued records and stop the listener; call before os._exit()"""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.flush()
@@ -0,0 +1,33 @@
+"""
+Per-meeting audio capture format.
+
+A meeting is recorded at 16, 32 or 48 kHz, mono or stereo; the choice is made
+on /start and passed to the bot on its command line. Everything downstream
+(recording file, peaks, live audio bus, transcription feed) uses the capture
+format, so a 16 kHz meeting halves storage, upload and transcoding cost.
+
+The SDK only delivers raw audio at 32 or 48 kHz. A 16 kHz meeting is
+captured at 32 kHz and resampled in the bot before anything is written.
+"""
+
+import os
+
+SAMPLE_RATES = (16000, 32000, 48000)
+CHANNELS = (1, 2)
+
+DEFAULT_SAMPLE_RATE = int(os.environ.get("CAPTURE_SAMPLE_RATE", 32000))
+DEFAULT_CHANNELS = int(os.environ.get("CAPTURE_CHANNELS", 1))
+
+
+def validate_capture(sample_rate, channels):
+    """Return an error message for an unsupported capture format, or None"""
+    if sample_rate not in SAMPLE_RATES:
+        return f"Unsupported sample_rate {sample_rate}; use one of {', '.join(map(str, SAMPLE_RATES))}"
+    if channels not in CHANNELS:
+        return "channels must be 1 (mono) or 2 (stereo)"
+    return None
+
+
+def sdk_sample_rate(sample_rate):
+    """Rate to request from the SDK for a capture rate"""
+    return 48000 if sample_rate == 48000 else 32000
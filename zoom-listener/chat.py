@@ -0,0 +1,110 @@
+"""
+Meeting chat capture.
+
+The SDK's chat callback runs on the SDK thread. The bot reads only the fields
+it stores from the message and puts a small dict on a queue. A writer thread
+appends the queued messages in batches to a per-meeting JSON lines file, one
+write and flush per batch:
+
+    meeting_recording_<id>.chat.jsonl
+
+The API reads that file for GET /chat/{meeting_id}. Chat often holds the
+action items the post-processing turns into issues, so nothing is dropped:
+the queue is unbounded and the writer drains it before the bot exits.
+"""
+
+import json
+import os
+import queue
+import threading
+
+from bot_logging import log
+from storage import RECORDINGS_DIR, recording_key
+
+CHAT_FLUSH_INTERVAL = float(os.environ.get("CHAT_FLUSH_INTERVAL", 1.0))
+CHAT_BATCH_SIZE = 100
+
+_STOP = object()
+
+
+def chat_path(meeting_id, root=RECORDINGS_DIR):
+    return os.path.join(root, recording_key(meeting_id, ".chat.jsonl"))
+
+
+class ChatStore:
+    """Queue of chat messages persisted in batches by a background thread"""
+
+    def __init__(self, meeting_id, root=RECORDINGS_DIR, flush_interval=CHAT_FLUSH_INTERVAL):
+        self.path = chat_path(meeting_id, root)
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.count = 0
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.thread = threading.Thread(target=self._write_loop, name=f"chat-{meeting_id}", daemon=True)
+        self.thread.start()
+
+    def put(self, message):
+        """Queue a message dict; never blocks the SDK thread"""
+        self.queue.put(message)
+        self.count += 1
+
+    def close(self, timeout=5.0):
+        """Write out everything queued and stop the writer"""
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join(timeout)
+
+    def _write_loop(self):
+        # Appending keeps the messages of an earlier bot run for the same meeting
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                try:
+                    batch = [self.queue.get(timeout=self.flush_interval)]
+                except queue.Empty:
+                    continue
+                while len(batch) < CHAT_BATCH_SIZE:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                stopping = any(message is _STOP for message in batch)
+                messages = [message for message in batch if message is not _STOP]
+                if messages:
+                    try:
+                        f.write("".join(json.dumps(message, ensure_ascii=False) + "\n" for message in messages))
+                        f.flush()
+                    except Exception as e:
+                        log.error("Error writing %d chat messages: %s", len(messages), e)
+                if stopping:
+                    return
+
+
+def read_chat(meeting_id, since=None, limit=None, root=RECORDINGS_DIR):
+    """
+    Chat messages of a meeting, oldest first.
+
+    Args:
+        since: Only messages with a SDK timestamp (unix seconds) after this
+        limit: Only the last `limit` of the matching messages
+
+    Returns:
+        List of message dicts, or None if no chat was captured for the meeting
+    """
+    path = chat_path(meeting_id, root)
+    if not os.path.exists(path):
+        return None
+
+    messages = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            # The writer may be halfway through a batch
+            if not line.endswith("\n"):
+                break
+            message = json.loads(line)
+            if since is not None and (message.get("timestamp") or 0) <= since:
+                continue
+            messages.append(message)
+    if limit is not None:
+        messages = messages[-limit:] if limit else []
+    return messages
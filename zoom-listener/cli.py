@@ -1,19 +1,27 @@
-import zoom_meeting_sdk as zoom
+# Imported first so the startup report includes the time spent importing
+from startup import startup
+import os
+if os.environ.get("ZOOM_SDK_FAKE", "false").lower() == "true":
+    import fake_zoom_sdk as zoom
+else:
+    import zoom_meeting_sdk as zoom
+import json
+import threading
 import time
-import jwt
-from datetime import datetime, timedelta
-from typing import Callable, Optional
-import asyncio
 from meeting_bot import MeetingBot
+from heartbeat import HEARTBEAT_INTERVAL_MS
+from capture import CHANNELS, DEFAULT_CHANNELS, DEFAULT_SAMPLE_RATE, SAMPLE_RATES
+from bot_logging import log, set_log_meeting_id, setup_bot_logging, shutdown_bot_logging
 from dotenv import load_dotenv
 import signal
 import sys
 import gi
 gi.require_version('GLib', '2.0')
 from gi.repository import GLib
-import os
 import click
 
+startup.mark("imports")
+
 class ZoomBotRunner:
     def __init__(self):
         self.bot = None
@@ -22,7 +30,7 @@ class ZoomBotRunner:
 
     def exit_process(self):
         """Clean shutdown of the bot and main loop"""
-        print("Starting cleanup process...")
+        log.info("Starting cleanup process...")
         
         # Set flag to prevent re-entry
         if self.shutdown_requested:
@@ -31,28 +39,30 @@ class ZoomBotRunner:
         
         try:
             if self.bot:
-                print("Leaving meeting...")
+                log.info("Leaving meeting...")
                 self.bot.leave()
-                print("Cleaning up bot...")
+                log.info("Cleaning up bot...")
                 self.bot.cleanup()
             
                 self.force_exit()
              
         except Exception as e:
-            print(f"Error during cleanup: {e}")
+            log.exception("Error during cleanup: %s", e)
             self.force_exit()
         
         return False
 
     def force_exit(self):
         """Force the process to exit"""
-        print("Forcing exit...")
+        log.info("Forcing exit...")
+        # os._exit() skips atexit handlers; write out the queued log records first
+        shutdown_bot_logging()
         os._exit(0)  # Use os._exit() to force immediate termination
         return False
 
     def on_signal(self, signum, frame):
         """Signal handler for SIGINT and SIGTERM"""
-        print(f"\nReceived signal {signum}")
+        log.info("Received signal %s", signum)
         # Schedule the exit process to run soon, but not immediately
         if self.main_loop:
             GLib.timeout_add(100, self.exit_process)
@@ -65,30 +75,62 @@ class ZoomBotRunner:
             return False
         return True
 
-    def run(self, meeting_number, password, display_name):
+    def send_heartbeat(self):
+        """Push the bot state to the API; runs on the main loop so a stuck loop stops heartbeats"""
+        if self.shutdown_requested:
+            return False
+        # A standby bot has no meeting to report on yet
+        if self.bot.meeting_number is not None:
+            self.bot.heartbeat.send(self.bot.heartbeat_stats())
+        return True
+
+    def wait_for_assignment(self):
+        """Read the meeting of a standby bot, one JSON line from the API on stdin"""
+        line = sys.stdin.readline()
+        if not line:
+            log.info("No meeting assigned before stdin closed, exiting")
+            GLib.idle_add(self.exit_process)
+            return
+        GLib.idle_add(self.assign, json.loads(line))
+
+    def assign(self, assignment):
+        set_log_meeting_id(assignment["meeting_id"])
+        try:
+            self.bot.assign(assignment["meeting_id"], assignment["meeting_password"],
+                            sample_rate=int(assignment.get("sample_rate", DEFAULT_SAMPLE_RATE)),
+                            channels=int(assignment.get("channels", DEFAULT_CHANNELS)))
+        except Exception as e:
+            log.exception("Failed to join the assigned meeting: %s", e)
+            self.exit_process()
+        return False
+
+    def run(self, meeting_number, password, display_name, sample_rate=DEFAULT_SAMPLE_RATE, channels=DEFAULT_CHANNELS):
         """Main run method"""
-        self.bot = MeetingBot(meeting_number, password, display_name)
+        self.bot = MeetingBot(meeting_number, password, display_name, sample_rate=sample_rate, channels=channels)
         try:
             self.bot.init()
             # self.bot.join_meeting()
         except Exception as e:
-            print(e)
+            log.exception("Failed to start the bot: %s", e)
             self.exit_process()
-        
+
+        if meeting_number is None:
+            threading.Thread(target=self.wait_for_assignment, name="assignment", daemon=True).start()
 
         # Create a GLib main loop
         self.main_loop = GLib.MainLoop()
 
         # Add a timeout function that will be called every 100ms
         GLib.timeout_add(100, self.on_timeout)
+        GLib.timeout_add(HEARTBEAT_INTERVAL_MS, self.send_heartbeat)
 
         try:
-            print("Starting main event loop")
+            log.info("Starting main event loop")
             self.main_loop.run()
         except KeyboardInterrupt:
-            print("Interrupted by user, shutting down...")
+            log.info("Interrupted by user, shutting down...")
         except Exception as e:
-            print(f"Error in main loop: {e}")
+            log.exception("Error in main loop: %s", e)
         finally:
             self.exit_process()
 
@@ -96,10 +138,18 @@ class ZoomBotRunner:
 DISPLAY_NAME = "Bott"
 
 @click.command()
-@click.option("--meeting_id", type=str, required=True)
-@click.option("--meeting_password", type=str, required=True)
-def main(meeting_id, meeting_password):
+@click.option("--meeting_id", type=str)
+@click.option("--meeting_password", type=str)
+@click.option("--sample_rate", type=click.Choice([str(rate) for rate in SAMPLE_RATES]), default=str(DEFAULT_SAMPLE_RATE))
+@click.option("--channels", type=click.Choice([str(count) for count in CHANNELS]), default=str(DEFAULT_CHANNELS))
+@click.option("--standby", is_flag=True, help="Initialize and authenticate now, read the meeting from stdin later")
+def main(meeting_id, meeting_password, sample_rate, channels, standby):
+    if standby:
+        meeting_id = meeting_password = None
+    elif not meeting_id or meeting_password is None:
+        raise click.UsageError("--meeting_id and --meeting_password are required unless --standby is given")
     load_dotenv()
+    setup_bot_logging(meeting_id or "standby")
     
     runner = ZoomBotRunner()
     
@@ -108,7 +158,7 @@ def main(meeting_id, meeting_password):
     signal.signal(signal.SIGTERM, runner.on_signal)
     
     # Run the Meeting Bot
-    runner.run(meeting_id, meeting_password, DISPLAY_NAME)
+    runner.run(meeting_id, meeting_password, DISPLAY_NAME, int(sample_rate), int(channels))
     
 
 if __name__ == "__main__":
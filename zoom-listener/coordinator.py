@@ -0,0 +1,299 @@
+"""
+Multi-host sharding of meeting bots.
+
+Several api.py instances run as nodes and register their capacity with a
+front instance (COORDINATOR_MODE=front). The front places every meeting on a
+node by consistent hashing of the meeting id, skipping nodes that are full,
+and proxies /start, /status, /record, /peaks, /timeline, /speakers, /chat and
+/stop to the node that owns the meeting. Nodes only need COORDINATOR_URL and their
+own NODE_URL, so a whole cluster can be run as separate local processes on
+one machine.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import re
+import threading
+import time
+from typing import Optional, Type
+
+import httpx
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from starlette.background import BackgroundTask
+
+VIRTUAL_NODES = 64
+NODE_TIMEOUT = 15.0
+NODE_REGISTER_INTERVAL = 5.0
+PROXY_TIMEOUT = 30.0
+
+MEETING_PATH = re.compile(r"^/(status|record|peaks|timeline|speakers|chat|stop)/([^/]+)(/.*)?$")
+BATCH_PATHS = ("/start/batch", "/stop/batch")
+
+# Hop-by-hop headers must not be forwarded by a proxy
+HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "te", "trailer", "upgrade", "host", "content-length"}
+
+
+def ring_hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes"""
+
+    def __init__(self, virtual_nodes=VIRTUAL_NODES):
+        self.virtual_nodes = virtual_nodes
+        self.hashes = []
+        self.owners = []
+
+    def rebuild(self, node_urls):
+        points = sorted(
+            (ring_hash(f"{url}#{i}"), url)
+            for url in node_urls
+            for i in range(self.virtual_nodes)
+        )
+        self.hashes = [point[0] for point in points]
+        self.owners = [point[1] for point in points]
+
+    def walk(self, key):
+        """Distinct nodes in ring order starting at the position of key"""
+        if not self.hashes:
+            return []
+
+        start = bisect.bisect(self.hashes, ring_hash(key))
+        seen = []
+        for i in range(len(self.owners)):
+            url = self.owners[(start + i) % len(self.owners)]
+            if url not in seen:
+                seen.append(url)
+        return seen
+
+
+class Coordinator:
+    """Node registry, meeting placement and request proxying for the front instance"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # node url -> {"capacity": dict, "last_seen": time}
+        self.nodes = {}
+        # meeting id -> node url
+        self.assignments = {}
+        self.ring = HashRing()
+        self.ring_nodes = ()
+        self.client = httpx.AsyncClient(timeout=PROXY_TIMEOUT)
+
+    def register(self, url, capacity):
+        """Record a node heartbeat with its current capacity"""
+        url = url.rstrip("/")
+        with self.lock:
+            self.nodes[url] = {"capacity": capacity, "last_seen": time.time()}
+
+    def live_nodes(self) -> dict:
+        now = time.time()
+        with self.lock:
+            live = {url: node for url, node in self.nodes.items() if now - node["last_seen"] < NODE_TIMEOUT}
+            if tuple(sorted(live)) != self.ring_nodes:
+                self.ring_nodes = tuple(sorted(live))
+                self.ring.rebuild(self.ring_nodes)
+            return live
+
+    def candidates(self, meeting_id):
+        """
+        Nodes to try for a new meeting, best first.
+
+        Ring order keeps placement stable; nodes with a free slot come before
+        nodes that would only queue the meeting, which are ordered by load.
+        """
+        live = self.live_nodes()
+        ordered = self.ring.walk(meeting_id)
+
+        def has_room(url):
+            capacity = live[url]["capacity"]
+            return capacity.get("block_reason") is None and capacity.get("pending", 0) == 0
+
+        def load(url):
+            capacity = live[url]["capacity"]
+            bots = capacity.get("running", 0) + capacity.get("reserved", 0) + capacity.get("pending", 0)
+            return bots / max(capacity.get("max_concurrent", 1), 1)
+
+        free = [url for url in ordered if has_room(url)]
+        busy = sorted((url for url in ordered if not has_room(url)), key=load)
+        return free + busy
+
+    def owner(self, meeting_id) -> Optional[str]:
+        """Node a meeting was placed on; falls back to the ring owner if the front was restarted"""
+        with self.lock:
+            url = self.assignments.get(meeting_id)
+        if url is not None:
+            return url
+
+        live = self.live_nodes()
+        ordered = [url for url in self.ring.walk(meeting_id) if url in live]
+        return ordered[0] if ordered else None
+
+    def meeting_id_for(self, request: Request) -> Optional[str]:
+        """Meeting id of a request that must be routed to a node, or None"""
+        if request.url.path == "/start":
+            return request.query_params.get("meeting_id")
+        if request.url.path in BATCH_PATHS:
+            return None
+        match = MEETING_PATH.match(request.url.path)
+        return match.group(2) if match else None
+
+    async def route(self, request: Request, meeting_id):
+        """Proxy a meeting request to the owning node, placing new meetings first"""
+        if request.url.path == "/start":
+            return await self._route_start(request, meeting_id)
+
+        url = self.owner(meeting_id)
+        if url is None:
+            return JSONResponse(status_code=503, content={"detail": "No bot nodes registered"})
+
+        response = await self.proxy(request, url)
+        if request.url.path.startswith("/stop/") and response.status_code == 200:
+            with self.lock:
+                self.assignments.pop(meeting_id, None)
+        return response
+
+    async def route_batch(self, request: Request, model: Type[BaseModel]):
+        """
+        Split a batch start/stop by node and forward one sub-batch to each.
+
+        Job ids come from the nodes; every job is tagged with its node so
+        /jobs/{job_id} can be queried there.
+
+        Args:
+            model: Request body model of the batch endpoint, so invalid batches
+                get the same 422 as on a node
+        """
+        try:
+            payload = model.model_validate_json(await request.body()).model_dump()
+        except ValidationError as e:
+            errors = [dict(error, loc=("body", *error["loc"])) for error in e.errors(include_url=False)]
+            return JSONResponse(status_code=422, content={"detail": jsonable_encoder(errors)})
+        is_start = request.url.path == "/start/batch"
+        key = "meetings" if is_start else "meeting_ids"
+
+        groups = {}
+        for item in payload[key]:
+            meeting_id = item["meeting_id"] if is_start else item
+            if is_start:
+                with self.lock:
+                    url = self.assignments.get(meeting_id)
+                if url is None:
+                    candidates = self.candidates(meeting_id)
+                    url = candidates[0] if candidates else None
+            else:
+                url = self.owner(meeting_id)
+            groups.setdefault(url, []).append(item)
+
+        jobs = []
+        targets = [(url, items) for url, items in groups.items() if url is not None]
+        for item in groups.get(None, []):
+            jobs.append({"meeting_id": item["meeting_id"] if is_start else item, "state": "rejected", "detail": "No bot nodes registered"})
+
+        responses = await asyncio.gather(
+            *(self.client.post(url + request.url.path, json={key: items}) for url, items in targets),
+            return_exceptions=True
+        )
+        for (url, items), response in zip(targets, responses):
+            if isinstance(response, Exception) or response.status_code >= 300:
+                detail = str(response) if isinstance(response, Exception) else response.text
+                for item in items:
+                    jobs.append({"meeting_id": item["meeting_id"] if is_start else item, "state": "failed", "detail": detail, "node": url})
+                continue
+
+            for job in response.json()["jobs"]:
+                job["node"] = url
+                jobs.append(job)
+                with self.lock:
+                    if is_start:
+                        self.assignments[job["meeting_id"]] = url
+                    else:
+                        self.assignments.pop(job["meeting_id"], None)
+
+        return JSONResponse(status_code=202, content={"status": "accepted", "jobs": jobs})
+
+    async def _route_start(self, request, meeting_id):
+        with self.lock:
+            existing = self.assignments.get(meeting_id)
+        candidates = [existing] if existing else self.candidates(meeting_id)
+        if not candidates:
+            return JSONResponse(status_code=503, content={"detail": "No bot nodes registered"})
+
+        body = await request.body()
+        for i, url in enumerate(candidates):
+            upstream = await self._send(request, url, body)
+            # Unreachable node: fall through to the next one
+            if isinstance(upstream, JSONResponse):
+                if i == len(candidates) - 1:
+                    return upstream
+                continue
+
+            # A full node answers 429; try the next one on the ring
+            if upstream.status_code == 429 and i < len(candidates) - 1:
+                await upstream.aclose()
+                continue
+
+            if upstream.status_code < 300:
+                with self.lock:
+                    self.assignments[meeting_id] = url
+            return self._relay(upstream, url)
+
+    async def proxy(self, request: Request, node_url):
+        """Forward a request to a node and stream the response back"""
+        upstream = await self._send(request, node_url, await request.body())
+        if isinstance(upstream, JSONResponse):
+            return upstream
+        return self._relay(upstream, node_url)
+
+    async def _send(self, request, node_url, body):
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+        upstream_request = self.client.build_request(
+            request.method,
+            node_url + request.url.path,
+            params=request.query_params,
+            headers=headers,
+            content=body
+        )
+
+        try:
+            return await self.client.send(upstream_request, stream=True)
+        except httpx.HTTPError as e:
+            return JSONResponse(status_code=502, content={"detail": f"Node {node_url} unreachable: {e}"})
+
+    def _relay(self, upstream, node_url):
+        response_headers = {k: v for k, v in upstream.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+        response_headers["X-Bot-Node"] = node_url
+        return StreamingResponse(
+            upstream.aiter_raw(),
+            status_code=upstream.status_code,
+            headers=response_headers,
+            background=BackgroundTask(upstream.aclose)
+        )
+
+    def describe(self) -> dict:
+        live = self.live_nodes()
+        with self.lock:
+            placed = {}
+            for meeting_id, url in self.assignments.items():
+                placed.setdefault(url, []).append(meeting_id)
+        return {
+            url: dict(node, meetings=placed.get(url, []), age=round(time.time() - node["last_seen"], 1))
+            for url, node in live.items()
+        }
+
+
+def register_with_coordinator(coordinator_url, node_url, get_capacity):
+    """Node side: periodically report this node's capacity to the front instance"""
+    register_url = coordinator_url.rstrip("/") + "/nodes/register"
+    with httpx.Client(timeout=5.0) as client:
+        while True:
+            try:
+                client.post(register_url, json={"url": node_url, "capacity": get_capacity()})
+            except httpx.HTTPError as e:
+                print(f"Failed to register with coordinator {coordinator_url}: {e}")
+            time.sleep(NODE_REGISTER_INTERVAL)
@@ -11,8 +11,10 @@ from deepgram import (
 
 import asyncio
 
+from bot_logging import log
+
 class DeepgramTranscriber:
-    def __init__(self):
+    def __init__(self, sample_rate=32000, channels=1, on_transcript=None):
         # Configure the DeepgramClientOptions to enable KeepAlive for maintaining the WebSocket connection (only if necessary to your scenario)
         config = DeepgramClientOptions(
             options={"keepalive": "true"}
@@ -24,6 +26,10 @@ class DeepgramTranscriber:
         # Use the listen.live class to create the websocket connection
         self.dg_connection = self.deepgram.listen.websocket.v("1") 
 
+        # Called with (start, duration, text) of every final segment, times in seconds of the audio sent
+        self.on_transcript = on_transcript
+        transcriber = self
+
         def on_message(self, result, **kwargs):
             #print("got")
             #print(result)
@@ -31,12 +37,14 @@ class DeepgramTranscriber:
             sentence = result.channel.alternatives[0].transcript
             if len(sentence) == 0:
                 return
-            print(f"Transcription: {sentence}")
+            log.debug("Transcription: %s", sentence)
+            if transcriber.on_transcript and result.is_final:
+                transcriber.on_transcript(result.start, result.duration, sentence)
 
         self.dg_connection.on(LiveTranscriptionEvents.Transcript, on_message)
 
         def on_error(self, error, **kwargs):
-            print(f"Error: {error}")
+            log.error("Deepgram error: %s", error)
 
         self.dg_connection.on(LiveTranscriptionEvents.Error, on_error)
 
@@ -46,7 +54,8 @@ class DeepgramTranscriber:
             interim_results=True,
             language='en-GB',
             encoding= "linear16",
-            sample_rate=32000
+            sample_rate=sample_rate,
+            channels=channels
             )
 
         self.dg_connection.start(options)
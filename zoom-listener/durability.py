@@ -0,0 +1,198 @@
+"""
+Crash-safe WAV recording files.
+
+The wave module writes the sizes in the WAV header only when the file is
+closed, and writeframes() rewrites the header after every frame, which costs
+a seek and a flush per audio callback. A bot that crashes leaves a header
+claiming no audio, and a host crash also loses whatever was still in the page
+cache. DurableWavFile writes frames with writeframesraw() and leaves the rest
+to a background thread, so the audio callback never waits for the disk:
+
+- every RECORDING_HEADER_INTERVAL_SECONDS it flushes the file and patches the
+  header sizes in place, so a file left behind by a crashed bot plays up to
+  that point
+- RECORDING_DURABILITY selects when it also fdatasyncs the file:
+  - none: never; a host crash may lose everything the kernel had not written yet
+  - periodic (default): every RECORDING_FSYNC_INTERVAL_SECONDS
+  - segment: after every RECORDING_SEGMENT_SECONDS of audio, so at most one
+    segment is lost however the audio arrives
+
+repair_wav.py fixes files whose header is stale or missing anyway.
+bench_durability.py measures what each mode costs.
+"""
+
+import os
+import struct
+import threading
+import time
+import wave
+
+MODES = ("none", "periodic", "segment")
+DURABILITY_MODE = os.environ.get("RECORDING_DURABILITY", "periodic")
+FSYNC_INTERVAL = float(os.environ.get("RECORDING_FSYNC_INTERVAL_SECONDS", 5))
+SEGMENT_SECONDS = float(os.environ.get("RECORDING_SEGMENT_SECONDS", 30))
+HEADER_INTERVAL = float(os.environ.get("RECORDING_HEADER_INTERVAL_SECONDS", 2))
+
+# Offsets of the RIFF chunk size and the data chunk size in the canonical PCM
+# header the wave module writes
+RIFF_SIZE_OFFSET = 4
+DATA_SIZE_OFFSET = 40
+
+
+def wav_header(sample_rate, channels, sample_width, data_bytes):
+    """Canonical 44-byte PCM WAV header, as written by the wave module"""
+    block_align = channels * sample_width
+    return (b"RIFF" + struct.pack("<I", 36 + data_bytes) + b"WAVE"
+            + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, sample_rate * block_align,
+                                    block_align, sample_width * 8)
+            + b"data" + struct.pack("<I", data_bytes))
+
+
+def patch_wav_header(fd, data_bytes):
+    """Write the sizes for `data_bytes` of audio into the header without moving the file position"""
+    os.pwrite(fd, struct.pack("<I", 36 + data_bytes), RIFF_SIZE_OFFSET)
+    os.pwrite(fd, struct.pack("<I", data_bytes), DATA_SIZE_OFFSET)
+
+
+class DurableWavFile:
+    """WAV file whose header and data reach the disk in the background; write() is thread-safe"""
+
+    def __init__(self, path, sample_rate, channels, sample_width=2, mode=None,
+                 fsync_interval=None, segment_seconds=None, header_interval=None):
+        """
+        Args:
+            path: File to create
+            mode: none, periodic or segment; defaults to RECORDING_DURABILITY
+            fsync_interval: Seconds between fdatasyncs in periodic mode
+            segment_seconds: Seconds of audio between fdatasyncs in segment mode
+            header_interval: Seconds between header updates; 0 updates it only on close
+        """
+        self.mode = mode or DURABILITY_MODE
+        if self.mode not in MODES:
+            raise ValueError(f"RECORDING_DURABILITY must be one of {', '.join(MODES)}, not {self.mode!r}")
+        self.fsync_interval = fsync_interval or FSYNC_INTERVAL
+        self.header_interval = header_interval if header_interval is not None else HEADER_INTERVAL
+        self.segment_bytes = int((segment_seconds or SEGMENT_SECONDS) * sample_rate * channels * sample_width)
+
+        self.path = path
+        self.file = open(path, "wb")
+        self.wave_file = wave.open(self.file, "wb")
+        self.wave_file.setnchannels(channels)
+        self.wave_file.setsampwidth(sample_width)
+        self.wave_file.setframerate(sample_rate)
+
+        self.lock = threading.Lock()
+        self.data_bytes = 0
+        self.next_segment_at = self.segment_bytes
+        self.segment_done = threading.Event()
+        self.closed = threading.Event()
+        self.syncs = 0
+        self.header_updates = 0
+        self.max_sync_ms = 0.0
+        self.synced_bytes = 0
+        self.errors = 0
+        self.last_error = None
+
+        self.thread = None
+        if self.header_interval > 0 or self.mode != "none":
+            self.thread = threading.Thread(target=self._sync_loop, name="recording-sync", daemon=True)
+            self.thread.start()
+
+    def write(self, data):
+        """Append audio; only buffers it, the header is patched and synced in the background"""
+        with self.lock:
+            self.wave_file.writeframesraw(data)
+            self.data_bytes += len(data)
+            if self.mode == "segment" and self.data_bytes >= self.next_segment_at:
+                self.next_segment_at += self.segment_bytes
+                self.segment_done.set()
+
+    def close(self):
+        self.closed.set()
+        self.segment_done.set()
+        if self.thread is not None:
+            self.thread.join()
+        with self.lock:
+            try:
+                # Patches the header if anything was written since the last update
+                self.wave_file.close()
+                if self.mode != "none":
+                    self.file.flush()
+                    os.fdatasync(self.file.fileno())
+                    self.synced_bytes = self.data_bytes
+            finally:
+                self.file.close()
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "syncs": self.syncs,
+            "header_updates": self.header_updates,
+            "max_sync_ms": round(self.max_sync_ms, 2),
+            "errors": self.errors,
+            # Audio that would survive a host crash right now
+            "unsynced_bytes": self.data_bytes - self.synced_bytes if self.mode != "none" else None
+        }
+
+    def _sync_loop(self):
+        if self.mode != "none":
+            # The file only survives a crash once its directory entry does
+            self._sync_directory()
+
+        now = time.monotonic()
+        next_header = now + self.header_interval if self.header_interval > 0 else float("inf")
+        next_sync = now + self.fsync_interval if self.mode == "periodic" else float("inf")
+        while not self.closed.is_set():
+            # Set by write() when a segment is complete, and by close()
+            timeout = min(next_header, next_sync) - time.monotonic()
+            self.segment_done.wait(max(0.0, timeout) if timeout != float("inf") else None)
+            if self.closed.is_set():
+                return
+
+            now = time.monotonic()
+            sync = self.segment_done.is_set() or now >= next_sync
+            self.segment_done.clear()
+            if sync or now >= next_header:
+                if self.header_interval > 0:
+                    next_header = now + self.header_interval
+                if self.mode == "periodic" and sync:
+                    next_sync = now + self.fsync_interval
+                try:
+                    data_bytes = self._flush_header()
+                    if sync:
+                        self._sync(data_bytes)
+                except OSError as e:
+                    # E.g. a full disk; the writer sees the same error on its next write
+                    self.errors += 1
+                    self.last_error = str(e)
+
+    def _flush_header(self):
+        """Hand buffered audio to the kernel and make the header cover it; returns the covered bytes"""
+        with self.lock:
+            self.file.flush()
+            data_bytes = self.data_bytes
+            # The wave module writes the header with the first frames
+            if data_bytes:
+                patch_wav_header(self.file.fileno(), data_bytes)
+                self.header_updates += 1
+        return data_bytes
+
+    def _sync(self, data_bytes):
+        # Outside the lock: fdatasync can take tens of milliseconds, writes go on meanwhile
+        started = time.monotonic()
+        os.fdatasync(self.file.fileno())
+        self.max_sync_ms = max(self.max_sync_ms, (time.monotonic() - started) * 1000)
+        self.syncs += 1
+        self.synced_bytes = data_bytes
+
+    def _sync_directory(self):
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
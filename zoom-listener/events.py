@@ -0,0 +1,126 @@
+"""
+In-process publish/subscribe for meeting events.
+
+The API publishes meeting state transitions and recording-ready events here,
+from request handlers as well as from background threads. Every subscriber
+(an SSE or WebSocket connection) gets its own bounded asyncio queue, filtered
+by meeting id, so clients no longer need to poll /status.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# States after which a meeting's bot is gone. They stay in the snapshot for a
+# while, so a client subscribing after the meeting ended (e.g. to wait for
+# artifacts_ready) still sees how it ended, and are dropped after that.
+TERMINAL_STATES = ("ended", "stopped", "failed", "cancelled")
+TERMINAL_STATE_TTL = 3600
+
+
+class Subscription:
+    """A single subscriber; meeting_id None means all meetings"""
+
+    def __init__(self, meeting_id=None, max_queue=SUBSCRIBER_QUEUE_SIZE):
+        self.meeting_id = meeting_id
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def wants(self, event):
+        return self.meeting_id is None or self.meeting_id == event["meeting_id"]
+
+    async def get(self, timeout=None) -> Optional[dict]:
+        """Wait for the next event; returns None on timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBus:
+    """Fan-out of meeting events to asyncio subscribers, safe to publish from any thread"""
+
+    def __init__(self):
+        self.loop = None
+        self.subscriptions = set()
+        self.lock = threading.Lock()
+        self.states = {}
+        # meeting_id -> monotonic time it reached a terminal state, oldest first
+        self.ended_at = {}
+
+    def bind(self, loop):
+        """Attach the bus to the event loop the subscribers run on"""
+        self.loop = loop
+
+    def subscribe(self, meeting_id=None) -> Subscription:
+        subscription = Subscription(meeting_id)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.discard(subscription)
+
+    def publish(self, event_type, meeting_id, **data):
+        """Publish an event; may be called from any thread"""
+        event = dict(data, type=event_type, meeting_id=meeting_id, ts=time.time())
+
+        if self.loop is None or self.loop.is_closed():
+            return
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self.loop:
+            self._deliver(event)
+        else:
+            self.loop.call_soon_threadsafe(self._deliver, event)
+
+    def set_state(self, meeting_id, state, **data):
+        """Record the state of a meeting and publish it if it changed"""
+        with self.lock:
+            if self.states.get(meeting_id) == state:
+                return
+            self.states[meeting_id] = state
+            self.ended_at.pop(meeting_id, None)
+            if state in TERMINAL_STATES:
+                self.ended_at[meeting_id] = time.monotonic()
+            self._expire()
+        self.publish("state", meeting_id, state=state, **data)
+
+    def get_states(self, meeting_id=None) -> dict:
+        """Current state per meeting, used as the first message of a subscription"""
+        with self.lock:
+            self._expire()
+            if meeting_id is None:
+                return dict(self.states)
+            if meeting_id in self.states:
+                return {meeting_id: self.states[meeting_id]}
+            return {}
+
+    def _expire(self):
+        # Caller holds the lock
+        expired_before = time.monotonic() - TERMINAL_STATE_TTL
+        while self.ended_at:
+            meeting_id, ended_at = next(iter(self.ended_at.items()))
+            if ended_at > expired_before:
+                break
+            del self.ended_at[meeting_id]
+            del self.states[meeting_id]
+
+    def _deliver(self, event):
+        # Runs on the event loop thread only
+        for subscription in list(self.subscriptions):
+            if not subscription.wants(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Drop the subscriber rather than block the loop or skip events
+                # silently: /events and /ws/events end the stream on overflowed
+                subscription.overflowed = True
+                self.subscriptions.discard(subscription)
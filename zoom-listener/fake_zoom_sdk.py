@@ -0,0 +1,752 @@
+"""
+Local stand-in for zoom_meeting_sdk.
+
+Implements the part of the SDK that meeting_bot.py uses (init, auth and
+meeting services, meeting status, controllers, raw audio and video delegates,
+chat), so a bot can join a simulated meeting without Zoom credentials.
+meeting_bot.py and cli.py import it instead of the real SDK when
+ZOOM_SDK_FAKE=true. Callbacks are driven from background threads the way the
+SDK drives them from its own threads:
+
+- raw audio at the rate and channel count requested in JoinParam, one frame
+  every ZOOM_FAKE_FRAME_MS, from a WAV file (ZOOM_FAKE_AUDIO, looped) or
+  synthetic speech-like audio
+- raw video frames (I420) at ZOOM_FAKE_VIDEO_FPS for subscribed renderers
+- active speaker changes among ZOOM_FAKE_PARTICIPANTS simulated participants,
+  occasional mutes, and chat messages every ZOOM_FAKE_CHAT_INTERVAL seconds
+
+ZOOM_FAKE_DROP_RATE drops that fraction of audio frames and
+ZOOM_FAKE_DURATION ends the meeting after that many seconds, to exercise gap
+handling and shutdown. Frames are paced against absolute deadlines, so a late
+frame is delivered late rather than shifting all later ones. ZOOM_FAKE_SPEED
+runs the simulated meeting that many times faster than real time (soak.py uses
+it to simulate hours of media in minutes); all the intervals above are in
+simulated seconds.
+"""
+
+import enum
+import itertools
+import os
+import random
+import threading
+import time
+import wave
+
+import numpy as np
+
+from resampler import StreamingResampler
+
+FRAME_MS = int(os.environ.get("ZOOM_FAKE_FRAME_MS", 10))
+AUDIO_FILE = os.environ.get("ZOOM_FAKE_AUDIO")
+VIDEO_FPS = float(os.environ.get("ZOOM_FAKE_VIDEO_FPS", 10))
+PARTICIPANTS = int(os.environ.get("ZOOM_FAKE_PARTICIPANTS", 3))
+JOIN_DELAY = float(os.environ.get("ZOOM_FAKE_JOIN_DELAY", 0.5))
+SPEAKER_INTERVAL = float(os.environ.get("ZOOM_FAKE_SPEAKER_INTERVAL", 2))
+CHAT_INTERVAL = float(os.environ.get("ZOOM_FAKE_CHAT_INTERVAL", 30))
+DROP_RATE = float(os.environ.get("ZOOM_FAKE_DROP_RATE", 0))
+DURATION = float(os.environ.get("ZOOM_FAKE_DURATION", 0))
+SPEED = float(os.environ.get("ZOOM_FAKE_SPEED", 1))
+
+# Seconds of synthetic audio generated once and looped
+SYNTHETIC_SECONDS = 10
+
+MY_USER_ID = 16778240
+
+
+class SDKError(enum.IntEnum):
+    SDKERR_SUCCESS = 0
+    SDKERR_WRONG_USAGE = 2
+    SDKERR_INTERNAL_ERROR = 3
+
+
+SDKERR_SUCCESS = SDKError.SDKERR_SUCCESS
+
+
+class AuthResult(enum.IntEnum):
+    AUTHRET_SUCCESS = 0
+
+
+AUTHRET_SUCCESS = AuthResult.AUTHRET_SUCCESS
+
+
+class MeetingStatus(enum.IntEnum):
+    MEETING_STATUS_IDLE = 0
+    MEETING_STATUS_CONNECTING = 1
+    MEETING_STATUS_WAITINGFORHOST = 2
+    MEETING_STATUS_INMEETING = 3
+    MEETING_STATUS_DISCONNECTING = 4
+    MEETING_STATUS_RECONNECTING = 5
+    MEETING_STATUS_FAILED = 6
+    MEETING_STATUS_ENDED = 7
+
+
+MEETING_STATUS_IDLE = MeetingStatus.MEETING_STATUS_IDLE
+MEETING_STATUS_CONNECTING = MeetingStatus.MEETING_STATUS_CONNECTING
+MEETING_STATUS_WAITINGFORHOST = MeetingStatus.MEETING_STATUS_WAITINGFORHOST
+MEETING_STATUS_INMEETING = MeetingStatus.MEETING_STATUS_INMEETING
+MEETING_STATUS_DISCONNECTING = MeetingStatus.MEETING_STATUS_DISCONNECTING
+MEETING_STATUS_RECONNECTING = MeetingStatus.MEETING_STATUS_RECONNECTING
+MEETING_STATUS_FAILED = MeetingStatus.MEETING_STATUS_FAILED
+MEETING_STATUS_ENDED = MeetingStatus.MEETING_STATUS_ENDED
+
+
+class AudioStatus(enum.IntEnum):
+    Audio_None = 0
+    Audio_Muted = 1
+    Audio_UnMuted = 2
+
+
+class LeaveMeetingCmd(enum.IntEnum):
+    LEAVE_MEETING = 0
+    END_MEETING = 1
+
+
+LEAVE_MEETING = LeaveMeetingCmd.LEAVE_MEETING
+
+
+class SDK_LANGUAGE_ID(enum.IntEnum):
+    LANGUAGE_English = 1
+
+
+class SDKUserType(enum.IntEnum):
+    SDK_UT_WITHOUT_LOGIN = 1
+
+
+class AudioRawdataSamplingRate(enum.IntEnum):
+    AudioRawdataSamplingRate_32K = 32000
+    AudioRawdataSamplingRate_48K = 48000
+
+
+class SDKChatMessageType(enum.IntEnum):
+    To_All = 0
+    To_Individual = 3
+
+
+class ZoomSDKRawDataType(enum.IntEnum):
+    RAW_DATA_TYPE_VIDEO = 0
+    RAW_DATA_TYPE_SHARE = 1
+
+
+FrameDataFormat_I420_FULL = 1
+ZoomSDKAudioChannel_Mono = 1
+ZoomSDKResolution_720P = 3
+
+
+class _Params:
+    """Plain attribute holder for the SDK's parameter structs"""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class _Callbacks:
+    """Stand-in for the SDK's *Callbacks classes: keeps the callables passed by keyword"""
+
+    def __init__(self, **callbacks):
+        self.__dict__.update(callbacks)
+
+    def call(self, name, *args):
+        callback = getattr(self, name, None)
+        if callback is not None:
+            callback(*args)
+
+
+MeetingServiceEventCallbacks = AuthServiceEventCallbacks = MeetingReminderEventCallbacks = _Callbacks
+MeetingRecordingCtrlEventCallbacks = MeetingParticipantsCtrlEventCallbacks = MeetingShareCtrlEventCallbacks = _Callbacks
+MeetingAudioCtrlEventCallbacks = MeetingChatEventCallbacks = MeetingBOEventCallbacks = _Callbacks
+ZoomSDKAudioRawDataDelegateCallbacks = ZoomSDKVirtualAudioMicEventCallbacks = ZoomSDKRendererDelegateCallbacks = _Callbacks
+ShareSourceCallbacks = ShareAudioCallbacks = ZoomSDKVideoSourceCallbacks = _Callbacks
+
+
+def InitParam():
+    return _Params(strWebDomain=None, strSupportUrl=None, enableGenerateDump=False,
+                   emLanguageID=SDK_LANGUAGE_ID.LANGUAGE_English, enableLogByDefault=False)
+
+
+def AuthContext():
+    return _Params(jwt_token=None)
+
+
+def JoinParam():
+    return _Params(userType=None, param=_Params(
+        meetingNumber=None, userName=None, psw=None, isVideoOff=True, isAudioOff=False,
+        isAudioRawDataStereo=False, isMyVoiceInMix=False,
+        eAudioRawdataSamplingRate=AudioRawdataSamplingRate.AudioRawdataSamplingRate_32K
+    ))
+
+
+def InitSDK(init_param):
+    return SDKERR_SUCCESS
+
+
+def CleanUPSDK():
+    _meeting.stop()
+    return SDKERR_SUCCESS
+
+
+def _run_later(delay, fn, *args):
+    timer = threading.Timer(delay / SPEED, fn, args)
+    timer.daemon = True
+    timer.start()
+    return timer
+
+
+class _Pacer:
+    """Calls fn every `interval` simulated seconds on a daemon thread until stopped"""
+
+    def __init__(self, interval, fn, name):
+        self.interval = interval / SPEED
+        self.fn = fn
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        deadline = time.monotonic()
+        while not self.stopped.is_set():
+            deadline += self.interval
+            delay = deadline - time.monotonic()
+            if delay > 0 and self.stopped.wait(delay):
+                return
+            self.fn()
+
+    def stop(self):
+        self.stopped.set()
+
+
+# ---------------------------------------------------------------- media
+
+def _synthetic_audio(sample_rate, seconds=SYNTHETIC_SECONDS):
+    """Voiced bursts with pauses and a little noise, like a conversation"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    pitch = 140 + 40 * np.sin(2 * np.pi * 0.3 * t)
+    voice = sum(np.sin(2 * np.pi * k * np.cumsum(pitch) / sample_rate) / k for k in (1, 2, 3))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (np.sin(2 * np.pi * 0.25 * t) > -0.3)
+    return (voice * syllables * 6000 + rng.standard_normal(len(t)) * 200).astype("<i2")
+
+
+def _file_audio(path, sample_rate):
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM is supported")
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+        channels, rate = wav.getnchannels(), wav.getframerate()
+    mono = samples.reshape(-1, channels).mean(axis=1).astype("<i2")
+    if rate != sample_rate:
+        mono = np.frombuffer(StreamingResampler(rate, sample_rate).process(mono.tobytes()), dtype="<i2")
+    return mono
+
+
+class AudioRawData:
+    def __init__(self, buffer, sample_rate, channels):
+        self.buffer = buffer
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+    def GetBuffer(self):
+        return self.buffer
+
+    def GetBufferLen(self):
+        return len(self.buffer)
+
+    def GetSampleRate(self):
+        return self.sample_rate
+
+    def GetChannelNum(self):
+        return self.channels
+
+
+class YUVRawDataI420:
+    def __init__(self, buffer, width, height):
+        self.buffer = buffer
+        self.width = width
+        self.height = height
+
+    def GetBuffer(self):
+        return self.buffer
+
+    def GetStreamWidth(self):
+        return self.width
+
+    def GetStreamHeight(self):
+        return self.height
+
+
+class _AudioSource:
+    """Loops the source audio and cuts it into SDK-sized frames"""
+
+    def __init__(self, sample_rate, channels):
+        mono = _file_audio(AUDIO_FILE, sample_rate) if AUDIO_FILE else _synthetic_audio(sample_rate)
+        samples = np.repeat(mono[:, None], channels, axis=1) if channels > 1 else mono
+        self.pcm = samples.tobytes()
+        self.frame_bytes = sample_rate * FRAME_MS // 1000 * 2 * channels
+        self.offsets = itertools.cycle(range(0, len(self.pcm) - self.frame_bytes + 1, self.frame_bytes))
+
+    def next_frame(self):
+        offset = next(self.offsets)
+        return self.pcm[offset:offset + self.frame_bytes]
+
+
+# ---------------------------------------------------------------- meeting
+
+class _User:
+    def __init__(self, user_id, name):
+        self.user_id = user_id
+        self.name = name
+
+    def GetUserID(self):
+        return self.user_id
+
+    def GetUserName(self):
+        return self.name
+
+
+class _UserAudioStatus:
+    def __init__(self, user_id, status):
+        self.user_id = user_id
+        self.status = status
+
+    def GetUserId(self):
+        return self.user_id
+
+    def GetStatus(self):
+        return self.status
+
+
+class _ChatMsgInfo:
+    _ids = itertools.count(1)
+
+    def __init__(self, sender, content, receiver=None, thread_id=None):
+        self.message_id = f"fake-{next(self._ids)}"
+        self.sender = sender
+        self.receiver = receiver
+        self.content = content
+        self.timestamp = int(time.time())
+        self.thread_id = thread_id
+
+    def GetMessageID(self):
+        return self.message_id
+
+    def GetSenderUserId(self):
+        return self.sender.user_id
+
+    def GetSenderDisplayName(self):
+        return self.sender.name
+
+    def GetReceiverUserId(self):
+        return self.receiver.user_id if self.receiver else 0
+
+    def GetReceiverDisplayName(self):
+        return self.receiver.name if self.receiver else ""
+
+    def GetContent(self):
+        return self.content
+
+    def GetTimeStamp(self):
+        return self.timestamp
+
+    def GetChatMessageType(self):
+        return SDKChatMessageType.To_Individual if self.receiver else SDKChatMessageType.To_All
+
+    def IsChatToAll(self):
+        return self.receiver is None
+
+    def IsChatToAllPanelist(self):
+        return False
+
+    def IsChatToWaitingroom(self):
+        return False
+
+    def IsComment(self):
+        return self.thread_id is not None
+
+    def IsThread(self):
+        return False
+
+    def GetThreadID(self):
+        return self.thread_id or ""
+
+
+CHAT_LINES = (
+    "Can everyone see my screen?",
+    "Action item: update the release checklist before Friday",
+    "I'll take the login timeout bug",
+    "Let's follow up on this tomorrow",
+)
+
+
+class _Meeting:
+    """State of the one simulated meeting of this process and the threads driving it"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.status = MEETING_STATUS_IDLE
+        self.events = {}
+        self.join_param = None
+        self.me = _User(MY_USER_ID, "Bot")
+        self.others = [_User(MY_USER_ID + 1024 * (i + 1), f"Participant {i + 1}") for i in range(PARTICIPANTS)]
+        self.muted = set()
+        self.pacers = []
+        self.renderers = []
+        self.audio_pacer = None
+        self.rng = random.Random(0)
+
+    def event(self, name, callback, *args):
+        callbacks = self.events.get(name)
+        if callbacks is not None:
+            callbacks.call(callback, *args)
+
+    def set_status(self, status, result=0):
+        with self.lock:
+            if self.status == status:
+                return
+            self.status = status
+        self.event("meeting", "onMeetingStatusChangedCallback", status, result)
+
+    def join(self, join_param):
+        self.join_param = join_param.param
+        self.set_status(MEETING_STATUS_CONNECTING)
+        _run_later(JOIN_DELAY, self._joined)
+
+    def _joined(self):
+        if self.status != MEETING_STATUS_CONNECTING:
+            return
+        self.set_status(MEETING_STATUS_INMEETING)
+        self.event("participants", "onUserJoinCallback", [user.user_id for user in self.others], None)
+        if SPEAKER_INTERVAL > 0 and self.others:
+            self.pacers.append(_Pacer(SPEAKER_INTERVAL, self._change_speakers, "fake-sdk-speakers"))
+        if CHAT_INTERVAL > 0 and self.others:
+            self.pacers.append(_Pacer(CHAT_INTERVAL, self._send_chat, "fake-sdk-chat"))
+        if DURATION > 0:
+            _run_later(DURATION, self._end)
+
+    def _end(self):
+        self.stop()
+        self.set_status(MEETING_STATUS_ENDED)
+
+    def leave(self):
+        self.stop()
+        self.set_status(MEETING_STATUS_DISCONNECTING)
+        _run_later(0.1, self.set_status, MEETING_STATUS_ENDED)
+
+    def stop(self):
+        for pacer in self.pacers:
+            pacer.stop()
+        self.pacers = []
+        for renderer in list(self.renderers):
+            renderer.unSubscribe()
+        self.stop_audio()
+
+    def start_audio(self, delegate):
+        param = self.join_param
+        sample_rate = int(param.eAudioRawdataSamplingRate) if param else 32000
+        channels = 2 if param and param.isAudioRawDataStereo else 1
+        source = _AudioSource(sample_rate, channels)
+
+        def deliver():
+            frame = source.next_frame()
+            if DROP_RATE and self.rng.random() < DROP_RATE:
+                return
+            delegate.call("onMixedAudioRawDataReceivedCallback", AudioRawData(frame, sample_rate, channels))
+
+        self.stop_audio()
+        self.audio_pacer = _Pacer(FRAME_MS / 1000, deliver, "fake-sdk-audio")
+
+    def stop_audio(self):
+        if self.audio_pacer is not None:
+            self.audio_pacer.stop()
+            self.audio_pacer = None
+
+    def _change_speakers(self):
+        speaking = [user for user in self.others if user.user_id not in self.muted]
+        active = self.rng.sample(speaking, k=min(len(speaking), self.rng.choice((0, 1, 1, 1, 2))))
+        self.event("audio", "onUserActiveAudioChangeCallback", [user.user_id for user in active])
+
+        if self.rng.random() < 0.1:
+            user = self.rng.choice(self.others)
+            if user.user_id in self.muted:
+                self.muted.discard(user.user_id)
+                status = AudioStatus.Audio_UnMuted
+            else:
+                self.muted.add(user.user_id)
+                status = AudioStatus.Audio_Muted
+            self.event("audio", "onUserAudioStatusChangeCallback", [_UserAudioStatus(user.user_id, status)], None)
+
+    def _send_chat(self):
+        sender = self.rng.choice(self.others)
+        self.event("chat", "onChatMsgNotificationCallback", _ChatMsgInfo(sender, self.rng.choice(CHAT_LINES)), None)
+
+    def user(self, user_id):
+        for user in [self.me] + self.others:
+            if user.user_id == user_id:
+                return user
+        return None
+
+
+_meeting = _Meeting()
+
+
+class _Controller:
+    """Controller whose SetEvent registers its callbacks with the meeting under `kind`"""
+
+    def __init__(self, kind):
+        self.kind = kind
+
+    def SetEvent(self, callbacks):
+        _meeting.events[self.kind] = callbacks
+        return SDKERR_SUCCESS
+
+
+class _RecordingController(_Controller):
+    def CanStartRawRecording(self):
+        return SDKERR_SUCCESS
+
+    def StartRawRecording(self):
+        return SDKERR_SUCCESS
+
+    def StopRawRecording(self):
+        return SDKERR_SUCCESS
+
+    def RequestLocalRecordingPrivilege(self):
+        return SDKERR_SUCCESS
+
+
+class _ParticipantsController(_Controller):
+    def GetMySelfUser(self):
+        return _meeting.me
+
+    def GetParticipantsList(self):
+        return [_meeting.me.user_id] + [user.user_id for user in _meeting.others]
+
+    def GetUserByUserID(self, user_id):
+        return _meeting.user(user_id)
+
+
+class _ShareController(_Controller):
+    def GetViewableSharingUserList(self):
+        return []
+
+    def GetSharingSourceInfoList(self, user_id):
+        return []
+
+    def ResumeCurrentSharing(self):
+        return SDKERR_SUCCESS
+
+
+class _AudioController(_Controller):
+    def JoinVoip(self):
+        return SDKERR_SUCCESS
+
+
+class _ChatMessageBuilder:
+    def __init__(self):
+        self.Clear()
+
+    def SetContent(self, content):
+        self.content = content
+        return self
+
+    def SetReceiver(self, user_id):
+        self.receiver = user_id
+        return self
+
+    def SetMessageType(self, message_type):
+        self.message_type = message_type
+        return self
+
+    def Build(self):
+        receiver = _meeting.user(self.receiver) if self.receiver else None
+        return _ChatMsgInfo(_meeting.me, self.content, receiver)
+
+    def Clear(self):
+        self.content = ""
+        self.receiver = 0
+        self.message_type = SDKChatMessageType.To_All
+
+
+class _ChatController(_Controller):
+    def GetChatMessageBuilder(self):
+        return _ChatMessageBuilder()
+
+    def SendChatMsgTo(self, message):
+        # The SDK reports the bot's own messages like everyone else's
+        _run_later(0, _meeting.event, "chat", "onChatMsgNotificationCallback", message, None)
+        return SDKERR_SUCCESS
+
+
+class _VideoController:
+    def UnmuteVideo(self):
+        return SDKERR_SUCCESS
+
+    def MuteVideo(self):
+        return SDKERR_SUCCESS
+
+
+class MeetingService:
+    def SetEvent(self, callbacks):
+        _meeting.events["meeting"] = callbacks
+        return SDKERR_SUCCESS
+
+    def Join(self, join_param):
+        _meeting.join(join_param)
+        return SDKERR_SUCCESS
+
+    def Leave(self, command):
+        _meeting.leave()
+        return SDKERR_SUCCESS
+
+    def GetMeetingStatus(self):
+        return _meeting.status
+
+    def GetMeetingReminderController(self):
+        return _Controller("reminder")
+
+    def GetMeetingRecordingController(self):
+        return _RecordingController("recording")
+
+    def GetMeetingParticipantsController(self):
+        return _ParticipantsController("participants")
+
+    def GetMeetingShareController(self):
+        return _ShareController("share")
+
+    def GetMeetingAudioController(self):
+        return _AudioController("audio")
+
+    def GetMeetingChatController(self):
+        return _ChatController("chat")
+
+    def GetMeetingBOController(self):
+        return _Controller("bo")
+
+    def GetMeetingVideoController(self):
+        return _VideoController()
+
+    def StopRawRecording(self):
+        return _RecordingController("recording")
+
+
+class _AudioSettings:
+    def EnableAutoJoinAudio(self, enable):
+        return SDKERR_SUCCESS
+
+
+class SettingService:
+    def GetAudioSettings(self):
+        return _AudioSettings()
+
+
+class AuthService:
+    def __init__(self):
+        self.callbacks = None
+
+    def SetEvent(self, callbacks):
+        self.callbacks = callbacks
+        return SDKERR_SUCCESS
+
+    def SDKAuth(self, auth_context):
+        # The real SDK answers asynchronously, after SDKAuth has returned
+        if self.callbacks is not None:
+            _run_later(0.05, self.callbacks.call, "onAuthenticationReturnCallback", AUTHRET_SUCCESS)
+        return SDKERR_SUCCESS
+
+
+def CreateMeetingService():
+    return MeetingService()
+
+
+def CreateSettingService():
+    return SettingService()
+
+
+def CreateAuthService():
+    return AuthService()
+
+
+def DestroyMeetingService(service):
+    _meeting.stop()
+
+
+def DestroySettingService(service):
+    pass
+
+
+def DestroyAuthService(service):
+    pass
+
+
+class _AudioRawdataHelper:
+    def subscribe(self, delegate, with_interpreters=False):
+        _meeting.start_audio(delegate)
+        return SDKERR_SUCCESS
+
+    def unSubscribe(self):
+        _meeting.stop_audio()
+        return SDKERR_SUCCESS
+
+    def setExternalAudioSource(self, callbacks):
+        return SDKERR_SUCCESS
+
+
+def GetAudioRawdataHelper():
+    return _AudioRawdataHelper()
+
+
+class _ShareSourceHelper:
+    def setExternalShareSource(self, video_callbacks, audio_callbacks):
+        return SDKERR_SUCCESS
+
+
+def GetRawdataShareSourceHelper():
+    return _ShareSourceHelper()
+
+
+class _VideoSourceHelper:
+    def setExternalVideoSource(self, callbacks):
+        return SDKERR_SUCCESS
+
+
+def GetRawdataVideoSourceHelper():
+    return _VideoSourceHelper()
+
+
+class _Renderer:
+    """Delivers a moving gray gradient as I420 frames to onRawDataFrameReceivedCallback"""
+
+    def __init__(self, delegate):
+        self.delegate = delegate
+        self.width, self.height = 640, 360
+        self.pacer = None
+
+    def setRawDataResolution(self, resolution):
+        if resolution == ZoomSDKResolution_720P:
+            self.width, self.height = 1280, 720
+        return SDKERR_SUCCESS
+
+    def subscribe(self, user_id, data_type):
+        width, height = self.width, self.height
+        gradient = np.add.outer(np.arange(height), np.arange(width)).astype(np.uint8)
+        chroma = b"\x80" * (width * height // 2)
+        frames = itertools.count()
+
+        def deliver():
+            luma = (gradient + next(frames) * 4).astype(np.uint8).tobytes()
+            self.delegate.call("onRawDataFrameReceivedCallback", YUVRawDataI420(luma + chroma, width, height))
+
+        if VIDEO_FPS > 0:
+            self.unSubscribe()
+            self.pacer = _Pacer(1 / VIDEO_FPS, deliver, "fake-sdk-video")
+            _meeting.renderers.append(self)
+        return SDKERR_SUCCESS
+
+    def unSubscribe(self):
+        if self.pacer is not None:
+            self.pacer.stop()
+            self.pacer = None
+            _meeting.renderers.remove(self)
+        return SDKERR_SUCCESS
+
+
+def createRenderer(delegate):
+    return _Renderer(delegate)
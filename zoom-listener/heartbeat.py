@@ -0,0 +1,192 @@
+"""
+Heartbeat channel between meeting bot processes and the API.
+
+Every bot pushes a small JSON datagram over a unix domain socket about once
+a second. The API keeps only the latest heartbeat per meeting in memory, so
+status queries are plain dictionary reads and a bot that is alive but no
+longer receiving audio shows up within a few seconds.
+
+The same socket carries one-off bot events (messages with an "event" key),
+such as a recording being closed and ready for download.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from typing import Optional
+
+DEFAULT_SOCKET_PATH = "/tmp/zoom_bot_heartbeat.sock"
+HEARTBEAT_INTERVAL_MS = 1000
+
+# A bot is considered stalled if it stops sending heartbeats, or if it is in
+# the meeting and recording but no audio callback arrived for this long, or
+# a recording write failed within it.
+HEARTBEAT_TIMEOUT = 5.0
+AUDIO_TIMEOUT = 5.0
+
+MAX_DATAGRAM_SIZE = 65536
+
+
+class HeartbeatServer:
+    """Receives bot heartbeats on a unix datagram socket and keeps the latest one per meeting"""
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, on_event=None, on_heartbeat=None):
+        """
+        Args:
+            socket_path: Path of the unix datagram socket to bind
+            on_event: Optional callable (meeting_id, message) for one-off bot events
+            on_heartbeat: Optional callable (meeting_id, previous, message) for every heartbeat;
+                previous is the prior heartbeat of the meeting or None
+        """
+        self.socket_path = socket_path
+        self.on_event = on_event
+        self.on_heartbeat = on_heartbeat
+        self.sock = None
+        self.thread = None
+        self.running = False
+        self.lock = threading.Lock()
+        self.latest = {}
+
+    def start(self):
+        """Bind the socket and start the receiver thread"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(self.socket_path)
+        self.running = True
+
+        self.thread = threading.Thread(target=self._receive_loop, daemon=True)
+        self.thread.start()
+        print(f"Heartbeat server listening on {self.socket_path}")
+
+    def stop(self):
+        """Stop receiving heartbeats and remove the socket file"""
+        self.running = False
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def _receive_loop(self):
+        while self.running:
+            try:
+                data = self.sock.recv(MAX_DATAGRAM_SIZE)
+            except OSError:
+                # Socket was closed by stop()
+                break
+
+            try:
+                message = json.loads(data)
+                meeting_id = message["meeting_id"]
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Dropping malformed heartbeat: {e}")
+                continue
+
+            message["received_at"] = time.time()
+            try:
+                self.handle_message(meeting_id, message)
+            except Exception as e:
+                print(f"Error handling heartbeat from {meeting_id}: {e}")
+
+    def handle_message(self, meeting_id, message):
+        """Store a heartbeat as the latest known state of a meeting, or dispatch a bot event"""
+        if "event" in message:
+            if self.on_event:
+                self.on_event(meeting_id, message)
+            return
+
+        with self.lock:
+            previous = self.latest.get(meeting_id)
+            self.latest[meeting_id] = message
+
+        if self.on_heartbeat:
+            self.on_heartbeat(meeting_id, previous, message)
+
+    def get(self, meeting_id) -> Optional[dict]:
+        """Return the latest heartbeat for a meeting, or None if none was received"""
+        with self.lock:
+            return self.latest.get(meeting_id)
+
+    def all(self) -> dict:
+        """Latest heartbeat of every meeting"""
+        with self.lock:
+            return dict(self.latest)
+
+    def forget(self, meeting_id):
+        """Drop the stored heartbeat of a meeting that is no longer running"""
+        with self.lock:
+            self.latest.pop(meeting_id, None)
+
+    def health(self, meeting_id) -> dict:
+        """
+        Summarize the liveness of a meeting bot from its latest heartbeat.
+
+        Returns:
+            Dictionary with the heartbeat, its age and whether the bot looks stalled
+        """
+        heartbeat = self.get(meeting_id)
+        if heartbeat is None:
+            return {"heartbeat": None, "heartbeat_age": None, "is_stalled": False, "stall_reason": None}
+
+        now = time.time()
+        heartbeat_age = now - heartbeat["received_at"]
+        stall_reason = None
+
+        if heartbeat_age > HEARTBEAT_TIMEOUT:
+            stall_reason = "no_heartbeat"
+        elif heartbeat.get("last_write_error_at") and now - heartbeat["last_write_error_at"] < AUDIO_TIMEOUT:
+            # Audio arrives but cannot be written, e.g. the disk is full
+            stall_reason = "write_errors"
+        elif heartbeat.get("recording"):
+            last_audio_at = heartbeat.get("last_audio_at")
+            if last_audio_at is None or now - last_audio_at > AUDIO_TIMEOUT:
+                stall_reason = "no_audio"
+
+        return {
+            "heartbeat": heartbeat,
+            "heartbeat_age": round(heartbeat_age, 3),
+            "is_stalled": stall_reason is not None,
+            "stall_reason": stall_reason
+        }
+
+
+class HeartbeatClient:
+    """Sends heartbeats from a bot process; does nothing if no socket is configured"""
+
+    def __init__(self, meeting_id, socket_path=None):
+        self.meeting_id = str(meeting_id)
+        self.socket_path = socket_path or os.environ.get("BOT_HEARTBEAT_SOCKET")
+        self.sock = None
+        self.seq = 0
+
+        if self.socket_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self.sock.setblocking(False)
+
+    def send(self, stats):
+        """Send one heartbeat; failures are ignored so the bot never blocks on the API"""
+        self.seq += 1
+        self._send(dict(stats, meeting_id=self.meeting_id, pid=os.getpid(), seq=self.seq, ts=time.time()))
+
+    def send_event(self, event, **data):
+        """Send a one-off event such as recording_ready"""
+        self._send(dict(data, event=event, meeting_id=self.meeting_id, pid=os.getpid(), ts=time.time()))
+
+    def _send(self, message):
+        if self.sock is None:
+            return
+
+        try:
+            self.sock.sendto(json.dumps(message, separators=(",", ":")).encode(), self.socket_path)
+        except OSError:
+            # API not listening (yet) or receive buffer full; the next heartbeat will retry
+            pass
+
+    def close(self):
+        if self.sock:
+            self.sock.close()
+            self.sock = None
@@ -0,0 +1,136 @@
+"""
+Fan-out of live meeting audio to WebSocket subscribers.
+
+For every meeting with listeners the hub runs one task that polls the bot's
+shared memory ring (see audio_bus.py), converts each new chunk once per
+requested sample rate, and puts it on every subscriber's bounded queue. A
+subscriber whose queue fills up is dropped instead of holding back the
+others or growing memory; its connection handler then closes the socket.
+"""
+
+import asyncio
+
+from audio_bus import AudioBusReader
+from resampler import StreamingResampler
+
+LIVE_POLL_INTERVAL = 0.02
+# About one second of audio at the bot's 10 ms callback rate and 20 ms polling
+LIVE_QUEUE_CHUNKS = 50
+
+END_OF_STREAM = b""
+
+LIVE_RATES = (8000, 16000, 24000, 32000, 48000)
+
+
+class LiveSubscriber:
+    def __init__(self, rate, max_queue=LIVE_QUEUE_CHUNKS):
+        self.rate = rate
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+        self.format = None
+
+    async def get(self, timeout=None):
+        """Next PCM chunk, END_OF_STREAM when the bot stopped, or None on timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class _Upstream:
+    def __init__(self, reader):
+        self.reader = reader
+        self.subscribers = set()
+        # Output rate -> converter shared by all subscribers of that rate
+        self.converters = {}
+        self.task = None
+
+
+class LiveAudioHub:
+    """One ring buffer reader per meeting shared by all of its subscribers; runs on the event loop"""
+
+    def __init__(self, poll_interval=LIVE_POLL_INTERVAL, max_queue=LIVE_QUEUE_CHUNKS):
+        self.poll_interval = poll_interval
+        self.max_queue = max_queue
+        self.upstreams = {}
+
+    def subscribe(self, meeting_id, rate=None) -> LiveSubscriber:
+        """
+        Raises:
+            FileNotFoundError: If the meeting's bot is not publishing audio
+            ValueError: If the requested rate cannot be produced from the bot's rate
+        """
+        upstream = self.upstreams.get(meeting_id)
+        if upstream is None:
+            upstream = _Upstream(AudioBusReader(meeting_id))
+
+        reader = upstream.reader
+        rate = rate or reader.sample_rate
+        if (rate != reader.sample_rate and rate not in LIVE_RATES) or reader.sample_width != 2:
+            if not upstream.subscribers:
+                reader.close()
+            raise ValueError(f"Cannot stream {rate} Hz; use one of {', '.join(map(str, LIVE_RATES))}")
+
+        subscriber = LiveSubscriber(rate, self.max_queue)
+        subscriber.format = {
+            "sample_rate": rate,
+            "channels": reader.channels,
+            "encoding": "pcm_s16le"
+        }
+        upstream.subscribers.add(subscriber)
+        if rate != reader.sample_rate and rate not in upstream.converters:
+            upstream.converters[rate] = StreamingResampler(reader.sample_rate, rate, reader.channels)
+
+        if upstream.task is None:
+            self.upstreams[meeting_id] = upstream
+            upstream.task = asyncio.create_task(self._pump(meeting_id, upstream))
+        return subscriber
+
+    def unsubscribe(self, meeting_id, subscriber):
+        upstream = self.upstreams.get(meeting_id)
+        if upstream is None:
+            return
+        upstream.subscribers.discard(subscriber)
+        if not upstream.subscribers:
+            self._close(meeting_id, upstream)
+
+    def listeners(self) -> dict:
+        return {meeting_id: len(upstream.subscribers) for meeting_id, upstream in self.upstreams.items()}
+
+    async def _pump(self, meeting_id, upstream):
+        reader = upstream.reader
+        while True:
+            pcm, _ = reader.read()
+            if not pcm and reader.is_closed():
+                for subscriber in list(upstream.subscribers):
+                    self._offer(upstream, subscriber, END_OF_STREAM)
+                self._close(meeting_id, upstream)
+                return
+
+            if pcm:
+                converted = {reader.sample_rate: pcm}
+                for rate, converter in upstream.converters.items():
+                    converted[rate] = converter.process(pcm)
+                for subscriber in list(upstream.subscribers):
+                    # An empty chunk would read as END_OF_STREAM
+                    if converted[subscriber.rate]:
+                        self._offer(upstream, subscriber, converted[subscriber.rate])
+
+            await asyncio.sleep(self.poll_interval)
+
+    def _offer(self, upstream, subscriber, chunk):
+        try:
+            subscriber.queue.put_nowait(chunk)
+        except asyncio.QueueFull:
+            # Audio with a hole in it is worse than no audio: /live/{meeting_id}
+            # closes the socket with 1013 when it sees overflowed
+            subscriber.overflowed = True
+            upstream.subscribers.discard(subscriber)
+
+    def _close(self, meeting_id, upstream):
+        if self.upstreams.get(meeting_id) is upstream:
+            del self.upstreams[meeting_id]
+        if upstream.task is not None and upstream.task is not asyncio.current_task():
+            upstream.task.cancel()
+        upstream.task = None
+        upstream.reader.close()
@@ -1,17 +1,20 @@
-import zoom_meeting_sdk as zoom
+import os
+if os.environ.get("ZOOM_SDK_FAKE", "false").lower() == "true":
+    import fake_zoom_sdk as zoom
+else:
+    import zoom_meeting_sdk as zoom
 import time
-import jwt
 from datetime import datetime, timedelta
 from typing import Callable, Optional
 import asyncio
 from meeting_bot import MeetingBot
+from bot_logging import setup_bot_logging, shutdown_bot_logging
 from dotenv import load_dotenv
 import signal
 import sys
 import gi
 gi.require_version('GLib', '2.0')
 from gi.repository import GLib
-import os
 
 class ZoomBotRunner:
     def __init__(self):
@@ -46,6 +49,7 @@ class ZoomBotRunner:
     def force_exit(self):
         """Force the process to exit"""
         print("Forcing exit...")
+        shutdown_bot_logging()
         os._exit(0)  # Use os._exit() to force immediate termination
         return False
 
@@ -96,6 +100,7 @@ password = "N69MNbM6P45bERruycF7kpm5ZPXNXg.1"
 display_name = "Bott"
 def main():
     load_dotenv()
+    setup_bot_logging(meeting_number)
     
     runner = ZoomBotRunner()
     
@@ -1,18 +1,38 @@
-import zoom_meeting_sdk as zoom
-import jwt
-from deepgram_transcriber import DeepgramTranscriber
-from datetime import datetime, timedelta
 import os
-import wave
+# ZOOM_SDK_FAKE=true joins a simulated meeting, see fake_zoom_sdk.py
+FAKE_SDK = os.environ.get("ZOOM_SDK_FAKE", "false").lower() == "true"
+if FAKE_SDK:
+    import fake_zoom_sdk as zoom
+else:
+    import zoom_meeting_sdk as zoom
+from heartbeat import HeartbeatClient
+from storage import RECORDINGS_DIR, recording_key, storage_from_env
+from peaks import PeakWriter
+from durability import DurableWavFile
+from audio_bus import AudioBusWriter
+from resampler import StreamingResampler
+from capture import DEFAULT_CHANNELS, DEFAULT_SAMPLE_RATE, sdk_sample_rate
+from timeline import CaptureTimeline, silence
+from speakers import SpeakerTimeline
+from chat import ChatStore
+from bot_logging import log
+from startup import startup
+from auth_tokens import generate_jwt
+import callback_stats
+from callback_stats import timed
+from datetime import datetime
 import threading
+import time
 
-import cv2
 import numpy as np
 import gi
 gi.require_version('GLib', '2.0')
 from gi.repository import GLib
 def save_yuv420_frame_as_png(frame_bytes, width, height, output_path):
     try:
+        # OpenCV takes a noticeable part of startup; only video recording needs it
+        import cv2
+
         # Convert bytes to numpy array
         yuv_data = np.frombuffer(frame_bytes, dtype=np.uint8)
 
@@ -25,21 +45,7 @@ def save_yuv420_frame_as_png(frame_bytes, width, height, output_path):
         # Save as PNG
         cv2.imwrite(output_path, bgr_frame)
     except Exception as e:
-        print(f"Error saving frame to {output_path}: {e}")
-
-def generate_jwt(client_id, client_secret):
-    iat = datetime.utcnow()
-    exp = iat + timedelta(hours=24)
-
-    payload = {
-        "iat": iat,
-        "exp": exp,
-        "appKey": client_id,
-        "tokenExp": int(exp.timestamp())
-    }
-
-    token = jwt.encode(payload, client_secret, algorithm="HS256")
-    return token
+        log.error("Error saving frame to %s: %s", output_path, e)
 
 def normalized_rms_audio(pcm_data: bytes, sample_width: int = 2) -> bool:
     """
@@ -72,6 +78,8 @@ def normalized_rms_audio(pcm_data: bytes, sample_width: int = 2) -> bool:
     return normalized_rms
 
 def create_red_yuv420_frame(width=640, height=360):
+    import cv2
+
     # Create BGR frame (red is [0,0,255] in BGR)
     bgr_frame = np.zeros((height, width, 3), dtype=np.uint8)
     bgr_frame[:, :] = [0, 0, 255]  # Pure red in BGR
@@ -85,14 +93,21 @@ def create_red_yuv420_frame(width=640, height=360):
 class AudioFileWriter:
     """Thread-safe audio file writer for continuous meeting recording"""
     
-    def __init__(self, output_path, sample_rate=32000, channels=1, sample_width=2):
+    def __init__(self, output_path, sample_rate=32000, channels=1, sample_width=2, uploader=None):
         self.output_path = output_path
+        self.uploader = uploader
+        self.peaks = None
         self.sample_rate = sample_rate
         self.channels = channels
         self.sample_width = sample_width
         self.wave_file = None
         self.lock = threading.Lock()
         self.is_recording = False
+        self.bytes_written = 0
+        # Failed writes (e.g. a full disk), reported in the heartbeat
+        self.write_errors = 0
+        self.last_write_error = None
+        self.last_write_error_at = None
         
     def start_recording(self):
         """Start recording to the audio file"""
@@ -104,24 +119,33 @@ class AudioFileWriter:
                 # Create output directory if it doesn't exist
                 os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
                 
-                self.wave_file = wave.open(self.output_path, 'wb')
-                self.wave_file.setnchannels(self.channels)
-                self.wave_file.setsampwidth(self.sample_width)
-                self.wave_file.setframerate(self.sample_rate)
+                self.wave_file = DurableWavFile(self.output_path, self.sample_rate, self.channels, self.sample_width)
+                self.start_peaks()
                 self.is_recording = True
-                print(f"Started audio recording to: {self.output_path}")
+                log.info("Started audio recording to: %s (durability %s)", self.output_path, self.wave_file.mode)
             except Exception as e:
-                print(f"Error starting audio recording: {e}")
+                log.error("Error starting audio recording: %s", e)
                 self.is_recording = False
                 
     def write_audio_data(self, audio_data):
-        """Write audio data to the file (thread-safe)"""
+        """Write audio data to the file (thread-safe); returns False if the data was dropped"""
         with self.lock:
             if self.is_recording and self.wave_file:
                 try:
-                    self.wave_file.writeframes(audio_data)
+                    self.wave_file.write(audio_data)
+                    self.bytes_written += len(audio_data)
+                    if self.uploader:
+                        self.uploader.feed(audio_data)
+                    self.feed_peaks(audio_data)
+                    return True
                 except Exception as e:
-                    print(f"Error writing audio data: {e}")
+                    # Logged once per distinct error; every frame fails the same way on a full disk
+                    if str(e) != self.last_write_error:
+                        log.error("Error writing audio data: %s", e)
+                    self.write_errors += 1
+                    self.last_write_error = str(e)
+                    self.last_write_error_at = time.time()
+            return False
                     
     def stop_recording(self):
         """Stop recording and close the file"""
@@ -134,17 +158,42 @@ class AudioFileWriter:
                     self.wave_file.close()
                     self.wave_file = None
                 self.is_recording = False
-                print(f"Stopped audio recording. File saved to: {self.output_path}")
+                if self.peaks:
+                    self.peaks.close()
+                    self.peaks = None
+                log.info("Stopped audio recording. File saved to: %s", self.output_path)
             except Exception as e:
-                print(f"Error stopping audio recording: {e}")
+                log.error("Error stopping audio recording: %s", e)
                 
+    def start_peaks(self):
+        """Waveform peaks are a convenience for the UI; failing to write them never stops the recording"""
+        try:
+            self.peaks = PeakWriter(self.output_path, self.sample_rate, self.channels)
+        except Exception as e:
+            log.warning("Error starting waveform peaks: %s", e)
+            self.peaks = None
+
+    def feed_peaks(self, audio_data):
+        if self.peaks is None:
+            return
+        try:
+            self.peaks.feed(audio_data)
+        except Exception as e:
+            log.warning("Error updating waveform peaks, disabling them: %s", e)
+            self.peaks = None
+
+    def durability_stats(self):
+        with self.lock:
+            return self.wave_file.stats() if self.wave_file else None
+
     def is_active(self):
         """Check if currently recording"""
         with self.lock:
             return self.is_recording
 
 class MeetingBot:
-    def __init__(self, meeting_number, password, display_name):
+    def __init__(self, meeting_number, password, display_name, sample_rate=DEFAULT_SAMPLE_RATE, channels=DEFAULT_CHANNELS):
+        """A meeting_number of None starts a standby bot that authenticates and waits for assign()"""
 
         self.meeting_service = None
         self.setting_service = None
@@ -170,7 +219,10 @@ class MeetingBot:
         self.audio_raw_data_sender = None
         self.virtual_audio_mic_event_passthrough = None
 
-        self.deepgram_transcriber = DeepgramTranscriber()
+        # Connected in the background by start_transcription(), only if DEEPGRAM_API_KEY is set
+        self.deepgram_transcriber = None
+        # Capture time of the first audio sent to Deepgram; its segment times are relative to it
+        self.deepgram_started_ns = None
 
         self.my_participant_id = None
         self.other_participant_id = None
@@ -198,6 +250,8 @@ class MeetingBot:
 
         self.chat_ctrl = None
         self.chat_ctrl_event = None
+        # Chat messages are queued here and written in batches (see chat.py)
+        self.chat_store = None
 
         self.bo_ctrl = None
         self.bo_ctrl_event = None
@@ -205,47 +259,110 @@ class MeetingBot:
         # Audio recording state
         self.audio_recorder = None
         self.is_audio_recording = False
+
+        # Shared memory ring other processes read live audio from (see audio_bus.py)
+        self.audio_bus = None
+        # Gap detection and alignment index of the recording (see timeline.py)
+        self.timeline = None
+        # Speaker turns on the same clock (see speakers.py)
+        self.speakers = None
+
+        # Counters reported through the heartbeat channel
+        self.meeting_status = None
+        self.audio_frame_count = 0
+        self.audio_dropped_count = 0
+        self.last_audio_at = None
+        self.last_stats_at = time.monotonic()
+        self.last_stats_frame_count = 0
+        # Last error writing the audio.wav mirror, so a full disk is logged once
+        self.mirror_error = None
         
+        self.display_name = display_name
+        # Set once SDKAuth succeeded; a standby bot joins as soon as it is assigned a meeting
+        self.authenticated = False
+        self.meeting_number = None
+        if meeting_number is not None:
+            self.configure(meeting_number, password, sample_rate, channels)
+        startup.mark("bot")
+
+    def configure(self, meeting_number, password, sample_rate=DEFAULT_SAMPLE_RATE, channels=DEFAULT_CHANNELS):
+        """Set the meeting to join and its capture format"""
         self.meeting_number = meeting_number
         self.password = password
-        self.display_name = display_name
+
+        # Capture format of this meeting (see capture.py); the SDK delivers sdk_sample_rate
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sdk_sample_rate = sdk_sample_rate(sample_rate)
+        self.capture_resampler = None
+        if self.sdk_sample_rate != sample_rate:
+            self.capture_resampler = StreamingResampler(self.sdk_sample_rate, sample_rate, channels)
+
+        # Speech recognition needs no more than 16 kHz; higher capture rates are resampled before sending
+        self.deepgram_sample_rate = min(sample_rate, int(os.environ.get("DEEPGRAM_SAMPLE_RATE", 16000)))
+        self.deepgram_resampler = StreamingResampler(sample_rate, self.deepgram_sample_rate, channels)
+
+        self.heartbeat = HeartbeatClient(meeting_number)
+
+    def assign(self, meeting_number, password, sample_rate=DEFAULT_SAMPLE_RATE, channels=DEFAULT_CHANNELS):
+        """Give a standby bot its meeting; joins now if authentication already finished"""
+        if self.meeting_number is not None:
+            raise Exception(f"Bot is already assigned to meeting {self.meeting_number}")
+        startup.mark("standby")
+        self.configure(meeting_number, password, sample_rate, channels)
+        log.info("Assigned to meeting %s", meeting_number)
+        self.start_transcription()
+        if self.authenticated:
+            self.join_meeting()
 
     def cleanup(self):
         # Stop audio recording if active
         if self.audio_recorder and self.audio_recorder.is_active():
-            self.audio_recorder.stop_recording()
-            print("Stopped audio recording during cleanup")
+            self.stop_audio_recording()
+            log.info("Stopped audio recording during cleanup")
+
+        if self.chat_store:
+            self.chat_store.close()
+            log.info("Saved %d chat messages to %s", self.chat_store.count, self.chat_store.path)
+
+        if callback_stats.ENABLED:
+            log.info("SDK callback latency:\n%s", callback_stats.format_summary(callback_stats.snapshot()))
 
         if self.meeting_service:
             zoom.DestroyMeetingService(self.meeting_service)
-            print("Destroyed Meeting service")
+            log.info("Destroyed Meeting service")
         if self.setting_service:
             zoom.DestroySettingService(self.setting_service)
-            print("Destroyed Setting service")
+            log.info("Destroyed Setting service")
         if self.auth_service:
             zoom.DestroyAuthService(self.auth_service)
-            print("Destroyed Auth service")
+            log.info("Destroyed Auth service")
 
         if self.audio_helper:
             audio_helper_unsubscribe_result = self.audio_helper.unSubscribe()
-            print("audio_helper.unSubscribe() returned", audio_helper_unsubscribe_result)
+            log.info("audio_helper.unSubscribe() returned %s", audio_helper_unsubscribe_result)
 
         if self.video_helper:
             video_helper_unsubscribe_result = self.video_helper.unSubscribe()
-            print("video_helper.unSubscribe() returned", video_helper_unsubscribe_result)
+            log.info("video_helper.unSubscribe() returned %s", video_helper_unsubscribe_result)
 
-        print("CleanUPSDK() called")
+        log.info("CleanUPSDK() called")
         zoom.CleanUPSDK()
-        print("CleanUPSDK() finished")
+        log.info("CleanUPSDK() finished")
 
     def init(self):
-        if os.environ.get('MEETING_ID') is None:
+        if FAKE_SDK:
+            log.warning("Using the fake Zoom SDK, no real meeting will be joined")
+        elif os.environ.get('ZOOM_JWT'):
+            # Launched by the API, which validated the credentials and signed the token
+            pass
+        elif os.environ.get('MEETING_ID') is None:
             raise Exception('No MEETING_ID found in environment. Please define this in a .env file located in the repository root')
-        if os.environ.get('MEETING_PWD') is None:
+        elif os.environ.get('MEETING_PWD') is None:
             raise Exception('No MEETING_PWD found in environment. Please define this in a .env file located in the repository root')
-        if os.environ.get('ZOOM_APP_CLIENT_ID') is None:
+        elif os.environ.get('ZOOM_APP_CLIENT_ID') is None:
             raise Exception('No ZOOM_APP_CLIENT_ID found in environment. Please define this in a .env file located in the repository root')
-        if os.environ.get('ZOOM_APP_CLIENT_SECRET') is None:
+        elif os.environ.get('ZOOM_APP_CLIENT_SECRET') is None:
             raise Exception('No ZOOM_APP_CLIENT_SECRET found in environment. Please define this in a .env file located in the repository root')
 
         init_param = zoom.InitParam()
@@ -259,80 +376,83 @@ class MeetingBot:
         init_sdk_result = zoom.InitSDK(init_param)
         if init_sdk_result != zoom.SDKERR_SUCCESS:
             raise Exception('InitSDK failed')
+        startup.mark("sdk_init")
 
+        if self.meeting_number is not None:
+            self.start_transcription()
         self.create_services()
 
+    @timed("user_join")
     def on_user_join_callback(self, joined_user_ids, user_name):
-        print("on_user_join_callback called. joined_user_ids =", joined_user_ids, "user_name =", user_name)
+        log.info("on_user_join_callback called. joined_user_ids = %s user_name = %s", joined_user_ids, user_name)
 
     def on_sharing_status_callback(self, share_info):
-        print(
-            f"on_sharing_status_callback called. ",
-            f"userid = {share_info.userid} ",
-            f"shareSourceID = {share_info.shareSourceID} ",
-            f"status = {share_info.status} ",
-            f"contentType = {share_info.contentType} ",
-            f"isShowingInFirstView = {share_info.isShowingInFirstView} ",
-            f"isShowingInSecondView = {share_info.isShowingInSecondView} ",
+        log.debug(
+            "on_sharing_status_callback called. userid = %s shareSourceID = %s status = %s contentType = %s "
+            "isShowingInFirstView = %s isShowingInSecondView = %s",
+            share_info.userid, share_info.shareSourceID, share_info.status, share_info.contentType,
+            share_info.isShowingInFirstView, share_info.isShowingInSecondView
         )
 
     def on_failed_to_start_share_callback(self):
-        print("on_failed_to_start_share_callback called")
+        log.warning("on_failed_to_start_share_callback called")
 
     def on_share_content_notification_callback(self, share_info):
-        print(
-            f"on_share_content_notification_callback called. ",
-            f"userid = {share_info.userid} ",
-            f"shareSourceID = {share_info.shareSourceID} ",
-            f"status = {share_info.status} ",
-            f"contentType = {share_info.contentType} ",
-            f"isShowingInFirstView = {share_info.isShowingInFirstView} ",
-            f"isShowingInSecondView = {share_info.isShowingInSecondView} ",
+        log.debug(
+            "on_share_content_notification_callback called. userid = %s shareSourceID = %s status = %s contentType = %s "
+            "isShowingInFirstView = %s isShowingInSecondView = %s",
+            share_info.userid, share_info.shareSourceID, share_info.status, share_info.contentType,
+            share_info.isShowingInFirstView, share_info.isShowingInSecondView
         )
 
     def on_share_setting_type_changed_notification_callback(self, share_setting_type):
-        print("on_share_setting_type_changed_notification_callback called. share_setting_type =", share_setting_type)
+        log.debug("on_share_setting_type_changed_notification_callback called. share_setting_type = %s", share_setting_type)
 
     def on_shared_video_ended_callback(self):
-        print("on_shared_video_ended_callback called")
+        log.debug("on_shared_video_ended_callback called")
 
     def on_video_file_share_play_error_callback(self, error):
-        print("on_video_file_share_play_error_callback called. error =", error)
+        log.warning("on_video_file_share_play_error_callback called. error = %s", error)
 
     def on_optimizing_share_for_video_clip_status_changed_callback(self, share_info):
-        print(
-            f"on_optimizing_share_for_video_clip_status_changed_callback called. ",
-            f"userid = {share_info.userid} ",
-            f"shareSourceID = {share_info.shareSourceID} ",
-            f"status = {share_info.status} ",
-            f"contentType = {share_info.contentType} ",
-            f"isShowingInFirstView = {share_info.isShowingInFirstView} ",
-            f"isShowingInSecondView = {share_info.isShowingInSecondView} ",
+        log.debug(
+            "on_optimizing_share_for_video_clip_status_changed_callback called. userid = %s shareSourceID = %s status = %s contentType = %s "
+            "isShowingInFirstView = %s isShowingInSecondView = %s",
+            share_info.userid, share_info.shareSourceID, share_info.status, share_info.contentType,
+            share_info.isShowingInFirstView, share_info.isShowingInSecondView
         )
 
     # NOTE: content will always be None use chat_msg_info.GetContent() instead
+    @timed("chat")
     def on_chat_msg_notification_callback(self, chat_msg_info, content):
-        print("\n=== on_chat_msg_notification called ===")
-        print(f"Message ID: {chat_msg_info.GetMessageID()}")
-        print(f"Sender ID: {chat_msg_info.GetSenderUserId()}")
-        print(f"Sender Name: {chat_msg_info.GetSenderDisplayName()}")
-        print(f"Receiver ID: {chat_msg_info.GetReceiverUserId()}")
-        print(f"Receiver Name: {chat_msg_info.GetReceiverDisplayName()}")
-        print(f"Content: {chat_msg_info.GetContent()}")
-        print(f"Timestamp: {chat_msg_info.GetTimeStamp()}")
-        print(f"Message Type: {chat_msg_info.GetChatMessageType()}")
-        print(f"Is Chat To All: {chat_msg_info.IsChatToAll()}")
-        print(f"Is Chat To All Panelist: {chat_msg_info.IsChatToAllPanelist()}")
-        print(f"Is Chat To Waitingroom: {chat_msg_info.IsChatToWaitingroom()}")
-        print(f"Is Comment: {chat_msg_info.IsComment()}")
-        print(f"Is Thread: {chat_msg_info.IsThread()}")
-        print(f"Thread ID: {chat_msg_info.GetThreadID()}")
-        print("=====================\n")
+        """Queue the message for the chat store; only the stored fields are read from the SDK"""
+        captured_ns = time.monotonic_ns()
+        if self.chat_store is None:
+            return
+        to_all = chat_msg_info.IsChatToAll()
+        message = {
+            "id": chat_msg_info.GetMessageID(),
+            "timestamp": chat_msg_info.GetTimeStamp(),
+            "sender_id": chat_msg_info.GetSenderUserId(),
+            "sender_name": chat_msg_info.GetSenderDisplayName(),
+            "to_all": to_all,
+            "content": chat_msg_info.GetContent()
+        }
+        if not to_all:
+            message["receiver_id"] = chat_msg_info.GetReceiverUserId()
+            message["receiver_name"] = chat_msg_info.GetReceiverDisplayName()
+        if chat_msg_info.IsComment():
+            message["thread_id"] = chat_msg_info.GetThreadID()
+        timeline = self.timeline
+        if timeline is not None:
+            # Seconds since the recording started, on the clock of /timeline and /speakers
+            message["at"] = (captured_ns - timeline.origin_ns) / 1e9
+        self.chat_store.put(message)
 
     def on_has_attendee_rights_notification(self, attendee):
-        print("on_has_attendee_rights_notification called. attendee =", attendee)
+        log.info("on_has_attendee_rights_notification called. attendee = %s", attendee)
         join_bo_result = attendee.JoinBo()
-        print("called JoinBo(). join_bo_result =", join_bo_result)
+        log.info("called JoinBo(). join_bo_result = %s", join_bo_result)
 
     def on_join(self):
         self.meeting_reminder_event = zoom.MeetingReminderEventCallbacks(onReminderNotifyCallback=self.on_reminder_notify)
@@ -343,7 +463,7 @@ class MeetingBot:
             self.recording_ctrl = self.meeting_service.GetMeetingRecordingController()
 
             def on_recording_privilege_changed(can_rec):
-                print("on_recording_privilege_changed called. can_record =", can_rec)
+                log.info("on_recording_privilege_changed called. can_record = %s", can_rec)
                 if can_rec:
                     GLib.timeout_add_seconds(1, self.start_raw_recording)
                 else:
@@ -360,12 +480,12 @@ class MeetingBot:
         self.my_participant_id = self.participants_ctrl.GetMySelfUser().GetUserID()
 
         participant_ids_list = self.participants_ctrl.GetParticipantsList()
-        print("participant_ids_list", participant_ids_list)
+        log.debug("participant_ids_list %s", participant_ids_list)
         for participant_id in participant_ids_list:
             if participant_id != self.my_participant_id:
                 self.other_participant_id = participant_id
                 break
-        print("other_participant_id", self.other_participant_id)
+        log.debug("other_participant_id %s", self.other_participant_id)
 
         self.meeting_sharing_controller = self.meeting_service.GetMeetingShareController()
         self.meeting_share_ctrl_event = zoom.MeetingShareCtrlEventCallbacks(
@@ -379,10 +499,10 @@ class MeetingBot:
         )
         self.meeting_sharing_controller.SetEvent(self.meeting_share_ctrl_event)
         viewable_sharing_user_list = self.meeting_sharing_controller.GetViewableSharingUserList()
-        print("viewable_sharing_user_list", viewable_sharing_user_list)
+        log.debug("viewable_sharing_user_list %s", viewable_sharing_user_list)
         for user_id in viewable_sharing_user_list:
             sharing_info_list_for_user = self.meeting_sharing_controller.GetSharingSourceInfoList(user_id)
-            print("sharing_info_list_for_user", user_id, " = ", sharing_info_list_for_user)
+            log.debug("sharing_info_list_for_user %s = %s", user_id, sharing_info_list_for_user)
 
         self.audio_ctrl = self.meeting_service.GetMeetingAudioController()
         self.audio_ctrl_event = zoom.MeetingAudioCtrlEventCallbacks(onUserAudioStatusChangeCallback=self.on_user_audio_status_change_callback, onUserActiveAudioChangeCallback=self.on_user_active_audio_change_callback)
@@ -392,6 +512,8 @@ class MeetingBot:
         # See here for more details: https://devforum.zoom.us/t/cant-record-audio-with-linux-meetingsdk-after-6-3-5-6495-error-code-32/130689/5
         self.audio_ctrl.JoinVoip()
 
+        if self.chat_store is None:
+            self.chat_store = ChatStore(self.meeting_number)
         self.chat_ctrl = self.meeting_service.GetMeetingChatController()
         self.chat_ctrl_event = zoom.MeetingChatEventCallbacks(onChatMsgNotificationCallback=self.on_chat_msg_notification_callback)
         self.chat_ctrl.SetEvent(self.chat_ctrl_event)
@@ -409,21 +531,48 @@ class MeetingBot:
         builder.SetMessageType(zoom.SDKChatMessageType.To_All)
         msg = builder.Build()
         send_result = self.chat_ctrl.SendChatMsgTo(msg)
-        print("send_result =", send_result)
+        log.debug("send_result = %s", send_result)
         builder.Clear()
 
+    @timed("active_audio")
     def on_user_active_audio_change_callback(self, user_ids):
-        print("on_user_active_audio_change_callback called. user_ids =", user_ids)
+        captured_ns = time.monotonic_ns()
+        speakers = self.speakers
+        if speakers is None:
+            return
+        user_ids = [user_id for user_id in user_ids if user_id != self.my_participant_id]
+        speakers.active(user_ids, captured_ns)
+        for user_id in user_ids:
+            if not speakers.knows(user_id):
+                speakers.name(user_id, self.participant_name(user_id))
 
+    @timed("audio_status")
     def on_user_audio_status_change_callback(self, user_audio_statuses, otherstuff):
-        print("on_user_audio_status_change_callback called. user_audio_statuses =", user_audio_statuses, "otherstuff =", otherstuff)
+        captured_ns = time.monotonic_ns()
+        speakers = self.speakers
+        if speakers is None:
+            return
+        for user_audio_status in user_audio_statuses:
+            user_id = user_audio_status.GetUserId()
+            status = getattr(user_audio_status.GetStatus(), "name", "")
+            if user_id == self.my_participant_id or "Muted" not in status:
+                continue
+            speakers.muted(user_id, "UnMuted" not in status, captured_ns)
+
+    def participant_name(self, user_id):
+        try:
+            user = self.participants_ctrl.GetUserByUserID(user_id)
+            return user.GetUserName() if user else None
+        except Exception as e:
+            log.warning("Error looking up participant %s: %s", user_id, e)
+            return None
 
     def on_mic_initialize_callback(self, sender):
-        print("on_mic_initialize_callback called")
+        log.debug("on_mic_initialize_callback called")
         self.audio_raw_data_sender = sender
 
     def on_mic_start_send_callback(self):
-        print("on_mic_start_send_callback called")
+        log.debug("on_mic_start_send_callback called")
         # audio_path = 'sample_program/input_audio/test_audio_16778240.pcm'
         # if not os.path.exists(audio_path):
         #     print(f"Audio file not found: {audio_path}")
@@ -434,27 +583,36 @@ class MeetingBot:
         #     self.audio_raw_data_sender.send(chunk, 32000, zoom.ZoomSDKAudioChannel_Mono)
         
 
+    @timed("audio")
     def on_one_way_audio_raw_data_received_callback(self, data, node_id=None):
+        captured_ns = time.monotonic_ns()
+        self.audio_frame_count += 1
+        self.last_audio_at = time.time()
+        if self.audio_frame_count == 1:
+            startup.finish("first_audio")
+
         # Handle both mixed audio (no node_id) and individual participant audio (with node_id)
         if node_id is not None:
             # Individual participant audio
             if node_id != self.my_participant_id:
                 # Write to the continuous recording file if recording is active
-                if self.audio_recorder and self.audio_recorder.is_active():
-                    self.audio_recorder.write_audio_data(data.GetBuffer())
+                buffer = self.captured_audio(data)
+                self.write_to_recording(buffer, captured_ns)
                 
                 # Also write to the existing audio.wav file for backward compatibility
-                self.write_to_file("sample_program/out/audio/audio.wav", data)
+                self.write_to_file("sample_program/out/audio/audio.wav", buffer)
         else:
             # Mixed audio (all participants combined) - always record this
-            if self.audio_recorder and self.audio_recorder.is_active():
-                self.audio_recorder.write_audio_data(data.GetBuffer())
+            buffer = self.captured_audio(data)
+            self.write_to_recording(buffer, captured_ns)
             
             # Also write to the existing audio.wav file for backward compatibility
-            self.write_to_file("sample_program/out/audio/audio.wav", data)
+            self.write_to_file("sample_program/out/audio/audio.wav", buffer)
 
     def on_share_video_start_send_callback(self, sender):
-        print("on_share_video_start_send_callback called, sender =", sender)
+        log.debug("on_share_video_start_send_callback called, sender = %s", sender)
+        import cv2
+
         number_of_frames = 26
         yuv_frames = []
         for frame in range(number_of_frames):
@@ -472,7 +630,7 @@ class MeetingBot:
 
         def try_send_frame():
             if self.share_video_sender is None:
-                print("share_video_sender is None")
+                log.debug("share_video_sender is None")
                 return False
 
             # Shift the frame to the end of the list (circular buffer)
@@ -480,25 +638,25 @@ class MeetingBot:
             yuv_frames.append(frame_bytes)
             result = self.share_video_sender.sendShareFrame(frame_bytes, 1280, 720, zoom.FrameDataFormat_I420_FULL)
             if result != zoom.SDKERR_SUCCESS:
-                print(f"Failed to send frame: {result}")
+                log.warning("Failed to send frame: %s", result)
                 return False
             return True
 
-        print(f"Sending frames every 200 milliseconds")
+        log.debug("Sending frames every 200 milliseconds")
         GLib.timeout_add(200, try_send_frame)
 
     def on_share_video_stop_send_callback(self):
-        print("on_share_video_stop_send_callback called")
+        log.debug("on_share_video_stop_send_callback called")
         self.share_video_sender = None
 
     def on_share_audio_start_send_callback(self, sender):
-        print("on_share_audio_start_send_callback called, sender =", sender)
+        log.debug("on_share_audio_start_send_callback called, sender = %s", sender)
         self.share_audio_sender = sender
 
         audio_path = 'sample_program/input_audio/test_audio_16778240.pcm'
 
         if not os.path.exists(audio_path):
-            print(f"Audio file not found: {audio_path}")
+            log.debug("Audio file not found: %s", audio_path)
             return
 
         # Uncomment this to send audio as shared audio
@@ -507,31 +665,118 @@ class MeetingBot:
         #     self.audio_raw_data_sender.send(chunk, 32000, zoom.ZoomSDKAudioChannel_Mono)
 
     def on_share_audio_stop_send_callback(self):
-        print("on_share_audio_stop_send_callback called")
+        log.debug("on_share_audio_stop_send_callback called")
         self.share_audio_sender = None
 
-    def write_to_deepgram(self, data):
+    def start_transcription(self):
+        """Connect to Deepgram on a background thread so the websocket handshake does not delay joining"""
+        if not os.environ.get("DEEPGRAM_API_KEY"):
+            log.info("DEEPGRAM_API_KEY is not set, recording without live transcription")
+            return
+
+        def connect():
+            started = time.monotonic()
+            try:
+                from deepgram_transcriber import DeepgramTranscriber
+                self.deepgram_transcriber = DeepgramTranscriber(sample_rate=self.deepgram_sample_rate, channels=self.channels, on_transcript=self.on_transcript)
+                log.info("Connected to Deepgram in %.2f s", time.monotonic() - started)
+            except Exception as e:
+                log.error("Live transcription unavailable: %s", e)
+
+        threading.Thread(target=connect, name="deepgram-connect", daemon=True).start()
+
+    def write_to_deepgram(self, buffer, captured_ns):
+        """Send PCM in the capture format (see captured_audio) to the live transcription, resampled to DEEPGRAM_SAMPLE_RATE"""
+        if self.deepgram_transcriber is None:
+            return
         try:
-            buffer_bytes = data.GetBuffer()
-            self.deepgram_transcriber.send(buffer_bytes)
+            if self.deepgram_started_ns is None:
+                # Transcript times count from the first audio Deepgram received
+                self.deepgram_started_ns = captured_ns
+            buffer_bytes = self.deepgram_resampler.process(buffer)
+            if buffer_bytes:
+                self.deepgram_transcriber.send(buffer_bytes)
         except IOError as e:
-            print(f"Error: failed to send audio data to Deepgram. Error: {e}")
+            log.error("Error: failed to send audio data to Deepgram. Error: %s", e)
             return
         except Exception as e:
-            print(f"Unexpected error occurred: {e}")
+            log.exception("Unexpected error occurred: %s", e)
             return
 
-    def write_to_file(self, path, data):
+    def captured_audio(self, data):
+        """PCM of an SDK audio frame in this meeting's capture format; call once per frame, the resampler is stateful"""
+        if self.capture_resampler is None:
+            return data.GetBuffer()
+        return self.capture_resampler.process(data.GetBuffer())
+
+    def on_transcript(self, start, duration, text):
+        """Final transcript segment from Deepgram, times in seconds of the audio sent to it"""
+        if self.timeline is None or self.deepgram_started_ns is None:
+            return
+        start_ns = self.deepgram_started_ns + int(start * 1e9)
         try:
-            buffer_bytes = data.GetBuffer()
+            self.timeline.transcript(start_ns, start_ns + int(duration * 1e9), text)
+        except Exception as e:
+            log.error("Error writing transcript segment: %s", e)
+
+    def write_to_recording(self, buffer, captured_ns):
+        """Append a frame from captured_audio() to the meeting recording and the live transcription, counting frames that could not be written"""
+        frames = len(buffer) // (2 * self.channels)
+        # Capture time of the frame's first sample, where Deepgram's clock starts
+        started_ns = captured_ns - frames * 1_000_000_000 // self.sample_rate
+        if self.audio_recorder is None:
+            self.audio_dropped_count += 1
+            self.write_to_deepgram(buffer, started_ns)
+            return
+        timeline = self.timeline
+        if timeline is not None:
+            # Keep the recording on the wall clock across frames the SDK dropped; Deepgram
+            # gets the same silence so its transcript times stay on that clock too
+            missing = timeline.audio(frames, captured_ns)
+            for chunk in silence(missing, 2 * self.channels, self.sample_rate):
+                self.audio_recorder.write_audio_data(chunk)
+                self.write_to_deepgram(chunk, started_ns)
+        if not self.audio_recorder.write_audio_data(buffer):
+            self.audio_dropped_count += 1
+        self.write_to_deepgram(buffer, started_ns)
+        self.publish_live_audio(buffer)
+
+    def publish_live_audio(self, buffer):
+        if self.audio_bus is None:
+            return
+        try:
+            self.audio_bus.write(buffer)
+        except Exception as e:
+            log.error("Error publishing live audio, disabling the audio bus: %s", e)
+            self.close_audio_bus()
 
+    def open_audio_bus(self, sample_rate, channels):
+        seconds = float(os.environ.get("AUDIO_BUS_SECONDS", 30))
+        if seconds <= 0:
+            return
+        try:
+            self.audio_bus = AudioBusWriter(self.meeting_number, sample_rate, channels, seconds=seconds)
+            log.info("Publishing live audio to shared memory %s", self.audio_bus.name)
+        except Exception as e:
+            log.warning("Error creating the live audio bus: %s", e)
+
+    def close_audio_bus(self):
+        if self.audio_bus is not None:
+            audio_bus, self.audio_bus = self.audio_bus, None
+            audio_bus.close()
+
+    def write_to_file(self, path, buffer_bytes):
+        try:
             with open(path, 'ab') as file:
                 file.write(buffer_bytes)
+            self.mirror_error = None
         except IOError as e:
-            print(f"Error: failed to open or write to audio file path: {path}. Error: {e}")
+            if str(e) != self.mirror_error:
+                log.error("Error: failed to open or write to audio file path: %s. Error: %s", path, e)
+            self.mirror_error = str(e)
             return
         except Exception as e:
-            print(f"Unexpected error occurred: {e}")
+            log.exception("Unexpected error occurred: %s", e)
             return
 
     def start_raw_recording(self):
@@ -540,37 +785,40 @@ class MeetingBot:
         can_start_recording_result = self.recording_ctrl.CanStartRawRecording()
         if can_start_recording_result != zoom.SDKERR_SUCCESS:
             self.recording_ctrl.RequestLocalRecordingPrivilege()
-            print("Requesting recording privilege.")
+            log.info("Requesting recording privilege.")
             return
 
         start_raw_recording_result = self.recording_ctrl.StartRawRecording()
         if start_raw_recording_result != zoom.SDKERR_SUCCESS:
-            print("Start raw recording failed.")
+            log.error("Start raw recording failed.")
             return
+        startup.mark("recording")
 
         # Initialize audio recording
         if not self.is_audio_recording:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            recording_filename = f"sample_program/out/audio/meeting_recording_{self.meeting_number}.wav"
-            self.audio_recorder = AudioFileWriter(recording_filename, sample_rate=32000, channels=1, sample_width=2)
+            recording_filename = os.path.join(RECORDINGS_DIR, recording_key(self.meeting_number))
+            self.audio_recorder = AudioFileWriter(recording_filename, sample_rate=self.sample_rate, channels=self.channels, sample_width=2, uploader=self.open_recording_upload())
             self.audio_recorder.start_recording()
+            self.open_timeline(recording_filename)
+            self.open_audio_bus(self.sample_rate, self.channels)
             self.is_audio_recording = True
-            print(f"Started continuous audio recording: {recording_filename}")
+            log.info("Started continuous audio recording: %s", recording_filename)
 
         self.audio_helper = zoom.GetAudioRawdataHelper()
         if self.audio_helper is None:
-            print("audio_helper is None")
+            log.error("audio_helper is None")
             return
 
         # if self.audio_source is None:
         self.audio_source = zoom.ZoomSDKAudioRawDataDelegateCallbacks(onMixedAudioRawDataReceivedCallback=self.on_one_way_audio_raw_data_received_callback, collectPerformanceData=True)
 
         audio_helper_subscribe_result = self.audio_helper.subscribe(self.audio_source, False)
-        print("audio_helper_subscribe_result =",audio_helper_subscribe_result)
+        log.info("audio_helper_subscribe_result = %s", audio_helper_subscribe_result)
 
         self.virtual_audio_mic_event_passthrough = zoom.ZoomSDKVirtualAudioMicEventCallbacks(onMicInitializeCallback=self.on_mic_initialize_callback,onMicStartSendCallback=self.on_mic_start_send_callback)
         audio_helper_set_external_audio_source_result = self.audio_helper.setExternalAudioSource(self.virtual_audio_mic_event_passthrough)
-        print("audio_helper_set_external_audio_source_result =", audio_helper_set_external_audio_source_result)
+        log.info("audio_helper_set_external_audio_source_result = %s", audio_helper_set_external_audio_source_result)
 
         # self.renderer_delegate = zoom.ZoomSDKRendererDelegateCallbacks(onRawDataFrameReceivedCallback=self.on_raw_data_frame_received_callback)
         # self.video_helper = zoom.createRenderer(self.renderer_delegate)
@@ -579,6 +827,10 @@ class MeetingBot:
         # subscribe_result = self.video_helper.subscribe(self.other_participant_id, zoom.ZoomSDKRawDataType.RAW_DATA_TYPE_VIDEO)
         # print("video_helper subscribe_result =", subscribe_result)
 
+        # Screen sharing and the virtual camera send test video and need OpenCV; skip them unless video is on
+        if not self.use_video_recording:
+            return
+
         self.share_helper = zoom.GetRawdataShareSourceHelper()
         self.share_video_renderer_delegate = zoom.ShareSourceCallbacks(
             onStartSendCallback=self.on_share_video_start_send_callback,
@@ -590,62 +842,113 @@ class MeetingBot:
         )
         self.share_helper.setExternalShareSource(self.share_video_renderer_delegate, self.share_audio_renderer_delegate)
         sharing_result = self.meeting_sharing_controller.ResumeCurrentSharing()
-        print("sharing_result =", sharing_result)
+        log.debug("sharing_result = %s", sharing_result)
 
 
         self.virtual_camera_video_source = zoom.ZoomSDKVideoSourceCallbacks(onInitializeCallback=self.on_virtual_camera_initialize_callback, onStartSendCallback=self.on_virtual_camera_start_send_callback)
         self.video_source_helper = zoom.GetRawdataVideoSourceHelper()
         if self.video_source_helper:
-            print("video_source_helper is not None")
+            log.debug("video_source_helper is not None")
             set_external_video_source_result = self.video_source_helper.setExternalVideoSource(self.virtual_camera_video_source)
-            print("set_external_video_source_result =", set_external_video_source_result)
+            log.debug("set_external_video_source_result = %s", set_external_video_source_result)
             if set_external_video_source_result == zoom.SDKERR_SUCCESS:
-                print("starting video")
+                log.debug("starting video")
                 self.meeting_video_controller = self.meeting_service.GetMeetingVideoController()
-                print("meeting_video_controller =", self.meeting_video_controller)
-                print("unmuting video")
+                log.debug("meeting_video_controller = %s", self.meeting_video_controller)
+                log.debug("unmuting video")
                 self.meeting_video_controller.UnmuteVideo()
-                print("unmuted video")
+                log.debug("unmuted video")
         else:
-            print("video_source_helper is None")
+            log.debug("video_source_helper is None")
 
     def on_virtual_camera_start_send_callback(self):
-        print("on_virtual_camera_start_send_callback called")
+        log.debug("on_virtual_camera_start_send_callback called")
         if self.video_sender:
             red_frame = create_red_yuv420_frame(640, 360)
             self.video_sender.sendVideoFrame(red_frame, 640, 360, 0, zoom.FrameDataFormat_I420_FULL)
 
     def on_virtual_camera_initialize_callback(self, video_sender, support_cap_list, suggest_cap):
-        print("on_virtual_camera_initialize_callback called")
+        log.debug("on_virtual_camera_initialize_callback called")
         self.video_sender = video_sender
 
+    @timed("video_frame")
     def on_raw_data_frame_received_callback(self, data):
+        timeline = self.timeline
+        if timeline is not None:
+            timeline.video(self.video_frame_counter, time.monotonic_ns())
         if self.video_frame_counter % 10 == 0:
             frame_number = int(self.video_frame_counter / 10)
             save_yuv420_frame_as_png(data.GetBuffer(), data.GetStreamWidth(), data.GetStreamHeight(), f"sample_program/out/video_frames/output_{frame_number:06d}.png")
-            print(f"Saved frame {frame_number} to sample_program/out/video_frames/output_{frame_number:06d}.png")
+            log.debug("Saved frame %d to sample_program/out/video_frames/output_%06d.png", frame_number, frame_number)
         self.video_frame_counter += 1
 
     def stop_raw_recording(self):
         # Stop audio recording if active
         if self.is_audio_recording and self.audio_recorder:
-            self.audio_recorder.stop_recording()
-            self.is_audio_recording = False
-            print("Stopped continuous audio recording")
+            self.stop_audio_recording()
+            log.info("Stopped continuous audio recording")
         
         rec_ctrl = self.meeting_service.StopRawRecording()
         if rec_ctrl.StopRawRecording() != zoom.SDKERR_SUCCESS:
             raise Exception("Error with stop raw recording")
 
+    def open_recording_upload(self):
+        """Start streaming the recording to remote storage if RECORDING_STORAGE asks for it"""
+        try:
+            storage = storage_from_env()
+            if storage.streaming:
+                log.info("Streaming recording to %s storage", storage.name)
+                return storage.open_upload(recording_key(self.meeting_number))
+        except Exception as e:
+            log.warning("Recording storage unavailable, keeping the recording local only: %s", e)
+        return None
+
+    def open_timeline(self, recording):
+        try:
+            self.timeline = CaptureTimeline(recording, self.sample_rate, self.channels)
+        except Exception as e:
+            log.warning("Error creating the alignment index, recording without it: %s", e)
+        try:
+            origin_ns = self.timeline.origin_ns if self.timeline else None
+            self.speakers = SpeakerTimeline(recording, origin_ns)
+        except Exception as e:
+            log.warning("Error creating the speaker timeline, recording without it: %s", e)
+
+    def stop_audio_recording(self):
+        """Close the recording file, finish its upload and tell the API it is ready"""
+        self.audio_recorder.stop_recording()
+        self.is_audio_recording = False
+        self.close_audio_bus()
+        if self.timeline is not None:
+            timeline, self.timeline = self.timeline, None
+            timeline.close()
+        if self.speakers is not None:
+            speakers, self.speakers = self.speakers, None
+            speakers.close()
+
+        location = None
+        if self.audio_recorder.uploader:
+            try:
+                location = self.audio_recorder.uploader.complete(self.audio_recorder.output_path)
+                log.info("Recording uploaded to %s", location)
+            except Exception as e:
+                log.error("Error uploading recording: %s", e)
+
+        self.heartbeat.send_event(
+            "recording_ready",
+            path=os.path.abspath(self.audio_recorder.output_path),
+            bytes_written=self.audio_recorder.bytes_written,
+            location=location
+        )
+
     def leave(self):
         if self.meeting_service is None:
             return
 
         # Stop audio recording before leaving
         if self.is_audio_recording and self.audio_recorder:
-            self.audio_recorder.stop_recording()
-            self.is_audio_recording = False
-            print("Stopped audio recording before leaving meeting")
+            self.stop_audio_recording()
+            log.info("Stopped audio recording before leaving meeting")
 
         status = self.meeting_service.GetMeetingStatus()
         if status == zoom.MEETING_STATUS_IDLE:
@@ -673,31 +976,73 @@ class MeetingBot:
         param.psw = password
         param.isVideoOff = False
         param.isAudioOff = False
-        param.isAudioRawDataStereo = False
+        param.isAudioRawDataStereo = self.channels == 2
         param.isMyVoiceInMix = False
-        param.eAudioRawdataSamplingRate = zoom.AudioRawdataSamplingRate.AudioRawdataSamplingRate_32K
+        if self.sdk_sample_rate == 48000:
+            param.eAudioRawdataSamplingRate = zoom.AudioRawdataSamplingRate.AudioRawdataSamplingRate_48K
+        else:
+            param.eAudioRawdataSamplingRate = zoom.AudioRawdataSamplingRate.AudioRawdataSamplingRate_32K
 
         join_result = self.meeting_service.Join(join_param)
-        print("join_result =",join_result)
+        log.info("join_result = %s", join_result)
 
         self.audio_settings = self.setting_service.GetAudioSettings()
         self.audio_settings.EnableAutoJoinAudio(True)
 
+    def heartbeat_stats(self):
+        """Compact snapshot of the bot state for the API heartbeat"""
+        now = time.monotonic()
+        elapsed = now - self.last_stats_at
+        frame_count = self.audio_frame_count
+        audio_fps = (frame_count - self.last_stats_frame_count) / elapsed if elapsed > 0 else 0.0
+        self.last_stats_at = now
+        self.last_stats_frame_count = frame_count
+
+        stats = {
+            "status": self.meeting_status,
+            "recording": self.is_audio_recording,
+            "audio_fps": round(audio_fps, 1),
+            "sample_rate": self.sample_rate,
+            "channels": self.channels,
+            "audio_frames": frame_count,
+            "audio_dropped": self.audio_dropped_count,
+            "audio_gaps": self.timeline.gaps if self.timeline else 0,
+            "speaker_turns": self.speakers.turns if self.speakers else 0,
+            "chat_messages": self.chat_store.count if self.chat_store else 0,
+            "bytes_written": self.audio_recorder.bytes_written if self.audio_recorder else 0,
+            "write_errors": self.audio_recorder.write_errors if self.audio_recorder else 0,
+            "last_write_error": self.audio_recorder.last_write_error if self.audio_recorder else None,
+            "last_write_error_at": self.audio_recorder.last_write_error_at if self.audio_recorder else None,
+            "durability": self.audio_recorder.durability_stats() if self.audio_recorder else None,
+            "last_audio_at": self.last_audio_at,
+            "startup": startup.report()
+        }
+        if callback_stats.ENABLED:
+            stats["callbacks"] = callback_stats.snapshot()
+        return stats
+
     def on_reminder_notify(self, content, handler):
         if handler:
             handler.Accept()
 
     def auth_return(self, result):
         if result == zoom.AUTHRET_SUCCESS:
-            print("Auth completed successfully.")
+            log.info("Auth completed successfully.")
+            startup.mark("auth")
+            self.authenticated = True
+            if self.meeting_number is None:
+                log.info("Standing by for a meeting assignment")
+                return
             return self.join_meeting()
 
         raise Exception("Failed to authorize. result =", result)
 
     def meeting_status_changed(self, status, iResult):
-        print("meeting_status_changed called. status =",status,"iResult=",iResult)
+        log.info("meeting_status_changed called. status = %s iResult = %s", status, iResult)
+        self.meeting_status = getattr(status, "name", str(status))
 
         if status == zoom.MEETING_STATUS_INMEETING:
+            startup.mark("join")
             return self.on_join()
 
     def create_services(self):
@@ -716,15 +1061,18 @@ class MeetingBot:
         self.auth_service = zoom.CreateAuthService()
 
         set_event_result = self.auth_service.SetEvent(self.auth_event)
-        print("set_event_result =",set_event_result)
+        log.debug("set_event_result = %s", set_event_result)
 
         # Use the auth service
         auth_context = zoom.AuthContext()
-        auth_context.jwt_token = generate_jwt(os.environ.get('ZOOM_APP_CLIENT_ID'), os.environ.get('ZOOM_APP_CLIENT_SECRET'))
+        if FAKE_SDK:
+            auth_context.jwt_token = "fake"
+        else:
+            auth_context.jwt_token = os.environ.get('ZOOM_JWT') or generate_jwt(os.environ.get('ZOOM_APP_CLIENT_ID'), os.environ.get('ZOOM_APP_CLIENT_SECRET'))
 
         result = self.auth_service.SDKAuth(auth_context)
 
         if result == zoom.SDKError.SDKERR_SUCCESS:
-            print("Authentication successful")
+            log.info("Authentication successful")
         else:
-            print("Authentication failed with error:", result)
+            log.error("Authentication failed with error: %s", result)
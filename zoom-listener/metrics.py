@@ -0,0 +1,140 @@
+"""
+Minimal Prometheus-compatible metrics for the recorder API.
+
+Recording a value must stay cheap because it happens on request handlers and
+on the heartbeat thread. Counters and histograms therefore keep one shard per
+thread: the hot path only mutates its own thread's list without taking a
+lock, and shards are summed when /metrics is scraped. Gauges that describe
+current state are computed from a callback at scrape time.
+"""
+
+import bisect
+import threading
+
+# Default histogram buckets in seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+LIFETIME_BUCKETS = (60, 300, 900, 1800, 3600, 7200, 14400, 28800)
+
+
+class _ShardedMetric:
+    """Per-thread value shards; only shard creation takes the lock"""
+
+    def __init__(self, name, documentation, shard_size):
+        self.name = name
+        self.documentation = documentation
+        self.shard_size = shard_size
+        self.local = threading.local()
+        self.shards = []
+        self.lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self.local, "shard", None)
+        if shard is None:
+            shard = [0] * self.shard_size
+            with self.lock:
+                self.shards.append(shard)
+            self.local.shard = shard
+        return shard
+
+    def _totals(self):
+        with self.lock:
+            shards = list(self.shards)
+        totals = [0] * self.shard_size
+        for shard in shards:
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class Counter(_ShardedMetric):
+    def __init__(self, name, documentation):
+        super().__init__(name, documentation, 1)
+
+    def inc(self, amount=1):
+        self._shard()[0] += amount
+
+    def render(self):
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+            f"{self.name} {_format(self._totals()[0])}"
+        ]
+
+
+class Histogram(_ShardedMetric):
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # One slot per bucket plus +Inf, then sum and count
+        super().__init__(name, documentation, len(self.buckets) + 3)
+
+    def observe(self, value):
+        shard = self._shard()
+        shard[bisect.bisect_left(self.buckets, value)] += 1
+        shard[-2] += value
+        shard[-1] += 1
+
+    def render(self):
+        totals = self._totals()
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram"
+        ]
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), totals):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else _format(bound)
+            lines.append(f'{self.name}_bucket{{le="{le}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_format(totals[-2])}")
+        lines.append(f"{self.name}_count {totals[-1]}")
+        return lines
+
+
+class GaugeFunction:
+    """Gauge whose value is computed by a callback when metrics are scraped"""
+
+    def __init__(self, name, documentation, function):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+
+    def render(self):
+        try:
+            value = self.function()
+        except Exception:
+            return []
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_format(value)}"
+        ]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, documentation) -> Counter:
+        return self._add(Counter(name, documentation))
+
+    def histogram(self, name, documentation, buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, documentation, buckets))
+
+    def gauge_function(self, name, documentation, function) -> GaugeFunction:
+        return self._add(GaugeFunction(name, documentation, function))
+
+    def render(self) -> str:
+        """Text exposition format for a Prometheus scrape"""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+
+def _format(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
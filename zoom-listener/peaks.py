@@ -0,0 +1,156 @@
+"""
+Multi-resolution waveform peaks for recordings.
+
+While a bot records, PeakWriter reduces the audio to min/max pairs at several
+resolutions (PEAK_LEVELS samples per peak, each level 4x coarser than the
+previous) and appends them to small files next to the recording:
+
+    meeting_recording_<id>.peaks.json     sample rate and levels
+    meeting_recording_<id>.peaks256.bin   int16 min/max pairs, 256 samples per pair
+    ...
+
+A web UI drawing an overview of a one-hour meeting reads a few KB from the
+coarsest level instead of downloading the whole WAV.
+"""
+
+import json
+import os
+import wave
+
+import numpy as np
+
+PEAK_LEVELS = (256, 1024, 4096, 16384, 65536)
+
+# Audio is reduced in batches of this many bytes to keep per-callback work small
+PEAK_BATCH_BYTES = 64 * 1024
+
+
+def peaks_base(recording):
+    base, _ = os.path.splitext(recording)
+    return base + ".peaks"
+
+
+def peaks_manifest_path(recording):
+    return peaks_base(recording) + ".json"
+
+
+def peaks_level_path(recording, samples_per_peak):
+    return f"{peaks_base(recording)}{samples_per_peak}.bin"
+
+
+class _Level:
+    """One resolution: reduces blocks of `factor` inputs to a single min/max pair"""
+
+    def __init__(self, path, factor):
+        self.file = open(path, "wb")
+        self.factor = factor
+        self.pending_min = np.empty(0, dtype=np.int16)
+        self.pending_max = np.empty(0, dtype=np.int16)
+
+    def reduce(self, mins, maxs, final=False):
+        mins = np.concatenate((self.pending_min, mins))
+        maxs = np.concatenate((self.pending_max, maxs))
+        count = len(mins) // self.factor
+        if final and len(mins) % self.factor:
+            count += 1
+
+        if final:
+            # The last, partial block is padded with its own edge values
+            padding = count * self.factor - len(mins)
+            block_min = np.pad(mins, (0, padding), mode="edge").reshape(count, self.factor).min(axis=1)
+            block_max = np.pad(maxs, (0, padding), mode="edge").reshape(count, self.factor).max(axis=1)
+            self.pending_min = self.pending_max = np.empty(0, dtype=np.int16)
+        else:
+            used = count * self.factor
+            block_min = mins[:used].reshape(count, self.factor).min(axis=1)
+            block_max = maxs[:used].reshape(count, self.factor).max(axis=1)
+            self.pending_min, self.pending_max = mins[used:], maxs[used:]
+
+        if count:
+            self.file.write(np.column_stack((block_min, block_max)).astype("<i2").tobytes())
+            self.file.flush()
+        return block_min, block_max
+
+
+class PeakWriter:
+    """Incrementally computes peak levels for 16-bit PCM as it is recorded"""
+
+    def __init__(self, recording, sample_rate, channels=1, levels=PEAK_LEVELS):
+        self.recording = recording
+        self.channels = channels
+        self.levels = tuple(levels)
+        self.buffer = bytearray()
+        self.frame_bytes = 2 * channels
+
+        os.makedirs(os.path.dirname(os.path.abspath(recording)), exist_ok=True)
+        with open(peaks_manifest_path(recording), "w") as f:
+            json.dump({"sample_rate": sample_rate, "channels": channels, "levels": list(self.levels)}, f)
+
+        factors = [self.levels[0]] + [fine_coarse[1] // fine_coarse[0] for fine_coarse in zip(self.levels, self.levels[1:])]
+        self.reducers = [_Level(peaks_level_path(recording, spp), factor) for spp, factor in zip(self.levels, factors)]
+
+    def feed(self, pcm_data):
+        self.buffer += pcm_data
+        if len(self.buffer) >= PEAK_BATCH_BYTES:
+            self._reduce(final=False)
+
+    def close(self):
+        self._reduce(final=True)
+        for level in self.reducers:
+            level.file.close()
+
+    def _reduce(self, final):
+        usable = len(self.buffer) - len(self.buffer) % self.frame_bytes
+        samples = np.frombuffer(bytes(self.buffer[:usable]), dtype="<i2").reshape(-1, self.channels)
+        del self.buffer[:usable]
+
+        # Channels are folded into one envelope
+        mins, maxs = samples.min(axis=1), samples.max(axis=1)
+        for level in self.reducers:
+            mins, maxs = level.reduce(mins, maxs, final)
+
+
+def build_peaks_from_wav(recording, levels=PEAK_LEVELS, chunk_frames=1 << 20):
+    """Compute peaks for an existing WAV recording, e.g. one made before peaks existed"""
+    with wave.open(recording, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError("Only 16-bit PCM recordings are supported")
+        writer = PeakWriter(recording, wav.getframerate(), wav.getnchannels(), levels)
+        while True:
+            data = wav.readframes(chunk_frames)
+            if not data:
+                break
+            writer.feed(data)
+    writer.close()
+
+
+def read_peaks(recording, max_points):
+    """
+    Finest level with at most max_points min/max pairs (the coarsest level if none fits).
+
+    Returns:
+        Dictionary with sample_rate, samples_per_peak, min and max lists, or None if no peaks exist
+    """
+    manifest_file = peaks_manifest_path(recording)
+    if not os.path.exists(manifest_file):
+        return None
+    with open(manifest_file) as f:
+        manifest = json.load(f)
+
+    chosen = manifest["levels"][-1]
+    for samples_per_peak in manifest["levels"]:
+        path = peaks_level_path(recording, samples_per_peak)
+        if os.path.exists(path) and os.path.getsize(path) // 4 <= max_points:
+            chosen = samples_per_peak
+            break
+
+    pairs = np.fromfile(peaks_level_path(recording, chosen), dtype="<i2")
+    pairs = pairs[:len(pairs) - len(pairs) % 2].reshape(-1, 2)
+    return {
+        "sample_rate": manifest["sample_rate"],
+        "samples_per_peak": chosen,
+        "seconds_per_peak": chosen / manifest["sample_rate"],
+        "length": len(pairs),
+        "min": pairs[:, 0].tolist(),
+        "max": pairs[:, 1].tolist()
+    }
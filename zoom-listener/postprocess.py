@@ -0,0 +1,232 @@
+"""
+Post-processing of finished recordings.
+
+When a bot reports recording_ready the API queues a job that runs the
+configured stages (POSTPROCESS_STAGES, e.g. "normalize,mp3,transcript") on a
+small worker pool. Every stage is retried with backoff, job state is persisted
+as JSON so unfinished jobs resume after an API restart, and the produced
+artifacts are registered in a manifest next to the recording
+(meeting_recording_<id>.artifacts.json) for /record consumers.
+"""
+
+import copy
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+import uuid
+
+import httpx
+
+DEFAULT_STAGES = "normalize,mp3"
+STAGE_TIMEOUT = 3600
+DEEPGRAM_LISTEN_URL = "https://api.deepgram.com/v1/listen"
+
+
+def artifact_path(recording, suffix):
+    """Path of an artifact stored next to the recording, e.g. .normalized.wav"""
+    base, _ = os.path.splitext(recording)
+    return base + suffix
+
+
+def manifest_path(recording):
+    return artifact_path(recording, ".artifacts.json")
+
+
+def write_json_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def run_ffmpeg(args):
+    """Run ffmpeg at low CPU priority so it does not compete with live bots"""
+    cmd = ["nice", "-n", "10", "ffmpeg", "-hide_banner", "-loglevel", "error", "-y"] + args
+    result = subprocess.run(cmd, capture_output=True, timeout=STAGE_TIMEOUT)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='replace').strip()}")
+
+
+def stage_normalize(context):
+    """Loudness-normalize the recording (EBU R128)"""
+    output = artifact_path(context["recording"], ".normalized.wav")
+    run_ffmpeg(["-i", context["recording"], "-af", "loudnorm=I=-16:TP=-1.5:LRA=11", output])
+    return output
+
+
+def stage_mp3(context):
+    """Compressed copy for listening, made from the normalized audio if available"""
+    source = context["artifacts"].get("normalize", context["recording"])
+    output = artifact_path(context["recording"], ".mp3")
+    run_ffmpeg(["-i", source, "-codec:a", "libmp3lame", "-q:a", "4", output])
+    return output
+
+
+def stage_transcript(context):
+    """Transcribe the recording with Deepgram's prerecorded API"""
+    api_key = os.environ.get("DEEPGRAM_API_KEY")
+    if not api_key:
+        raise RuntimeError("DEEPGRAM_API_KEY is not set")
+
+    output = artifact_path(context["recording"], ".transcript.json")
+    with open(context["recording"], "rb") as f:
+        response = httpx.post(
+            DEEPGRAM_LISTEN_URL,
+            params={"model": "nova-2", "punctuate": "true", "smart_format": "true", "diarize": "true"},
+            headers={"Authorization": f"Token {api_key}", "Content-Type": "audio/wav"},
+            content=f,
+            timeout=STAGE_TIMEOUT
+        )
+    response.raise_for_status()
+    write_json_atomic(output, response.json())
+    return output
+
+
+# Stage name -> callable(context) returning the artifact path.
+# Other modules may register additional stages here.
+STAGES = {
+    "normalize": stage_normalize,
+    "mp3": stage_mp3,
+    "transcript": stage_transcript
+}
+
+
+class PostProcessor:
+    """Worker pool running post-processing jobs with retries and persisted state"""
+
+    def __init__(self, state_dir, stages=None, workers=None, retries=None, retry_delay=None, on_complete=None):
+        """
+        Args:
+            state_dir: Directory for persisted job state files
+            stages: Ordered stage names; defaults to POSTPROCESS_STAGES
+            workers: Number of jobs processed concurrently
+            retries: Attempts per stage before the job fails
+            retry_delay: Initial backoff in seconds, doubled on every retry
+            on_complete: Optional callable (job) invoked when a job finishes or fails
+        """
+        stages = stages or os.environ.get("POSTPROCESS_STAGES", DEFAULT_STAGES)
+        self.stages = [stage.strip() for stage in stages.split(",") if stage.strip()] if isinstance(stages, str) else list(stages)
+        self.state_dir = state_dir
+        self.workers = workers or int(os.environ.get("POSTPROCESS_WORKERS", 2))
+        self.retries = retries or int(os.environ.get("POSTPROCESS_RETRIES", 3))
+        self.retry_delay = retry_delay or float(os.environ.get("POSTPROCESS_RETRY_DELAY", 5))
+        self.on_complete = on_complete
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.jobs = {}
+
+        unknown = [stage for stage in self.stages if stage not in STAGES]
+        if unknown:
+            raise ValueError(f"Unknown post-processing stages: {', '.join(unknown)}")
+
+    def start(self):
+        """Resume unfinished jobs from disk and start the workers"""
+        os.makedirs(self.state_dir, exist_ok=True)
+        for name in sorted(os.listdir(self.state_dir)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.state_dir, name)) as f:
+                    job = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable post-processing job {name}: {e}")
+                continue
+
+            with self.lock:
+                self.jobs[job["meeting_id"]] = job
+            if job["state"] in ("pending", "running"):
+                print(f"Resuming post-processing job for meeting {job['meeting_id']}")
+                self.queue.put(job)
+
+        for i in range(self.workers):
+            threading.Thread(target=self._worker, name=f"postprocess-{i}", daemon=True).start()
+
+    def submit(self, meeting_id, recording):
+        """Queue post-processing of a finished recording"""
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "meeting_id": meeting_id,
+            "recording": recording,
+            "stages": list(self.stages),
+            "state": "pending",
+            "completed_stages": [],
+            "artifacts": {},
+            "attempts": 0,
+            "error": None,
+            "created_at": time.time(),
+            "updated_at": time.time()
+        }
+        with self.lock:
+            self.jobs[meeting_id] = job
+        self._persist(job)
+        self.queue.put(job)
+        return dict(job)
+
+    def get(self, meeting_id):
+        with self.lock:
+            job = self.jobs.get(meeting_id)
+            return copy.deepcopy(job) if job else None
+
+    def _worker(self):
+        while True:
+            job = self.queue.get()
+            try:
+                self._run(job)
+            except Exception as e:
+                print(f"Post-processing job for meeting {job['meeting_id']} crashed: {e}")
+                self._update(job, state="failed", error=str(e))
+            if self.on_complete:
+                self.on_complete(self.get(job["meeting_id"]))
+
+    def _run(self, job):
+        self._update(job, state="running")
+        context = {"meeting_id": job["meeting_id"], "recording": job["recording"], "artifacts": job["artifacts"]}
+
+        for stage in job["stages"]:
+            if stage in job["completed_stages"]:
+                continue
+
+            delay = self.retry_delay
+            for attempt in range(1, self.retries + 1):
+                try:
+                    output = STAGES[stage](context)
+                    break
+                except Exception as e:
+                    self._update(job, attempts=job["attempts"] + 1, error=f"{stage}: {e}")
+                    if attempt == self.retries:
+                        self._update(job, state="failed")
+                        return
+                    print(f"Stage {stage} failed for meeting {job['meeting_id']} (attempt {attempt}): {e}")
+                    time.sleep(delay)
+                    delay *= 2
+
+            context["artifacts"] = dict(job["artifacts"], **{stage: output})
+            self._update(job, artifacts=context["artifacts"], completed_stages=job["completed_stages"] + [stage], error=None)
+            self._write_manifest(job)
+
+        self._update(job, state="done")
+
+    def _update(self, job, **changes):
+        with self.lock:
+            job.update(changes)
+            job["updated_at"] = time.time()
+        self._persist(job)
+
+    def _persist(self, job):
+        write_json_atomic(os.path.join(self.state_dir, f"{job['meeting_id']}.json"), job)
+
+    def _write_manifest(self, job):
+        """Register the artifacts next to the recording so /record consumers find them"""
+        manifest = {
+            "meeting_id": job["meeting_id"],
+            "recording": job["recording"],
+            "artifacts": {
+                stage: {"path": path, "size": os.path.getsize(path) if os.path.exists(path) else None}
+                for stage, path in job["artifacts"].items()
+            },
+            "updated_at": time.time()
+        }
+        write_json_atomic(manifest_path(job["recording"]), manifest)
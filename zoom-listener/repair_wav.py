@@ -0,0 +1,173 @@
+"""
+Repair recordings left behind by a crashed bot or host.
+
+A recording can be broken in three ways:
+
+- stale header: the sizes in the header do not cover all audio, because the
+  bot died before closing the file or updating its header
+- truncated: the file ends halfway through a sample frame
+- headerless: the file holds raw PCM, e.g. the audio.wav mirror, or a
+  host crash lost the page that held the header, which then reads as zeros
+
+Stale and truncated files are fixed in place by rewriting the two size fields
+and cutting the partial frame. Headerless files are rewritten with a header
+in front of the audio. Their format comes from the recording's alignment
+index (.align.bin) if there is one, and from the command line otherwise.
+
+Usage:
+    python repair_wav.py FILE [FILE ...] [--check] [--sample-rate 32000] [--channels 1]
+"""
+
+import argparse
+import os
+import shutil
+import struct
+import sys
+
+from capture import DEFAULT_CHANNELS, DEFAULT_SAMPLE_RATE
+from durability import wav_header
+from storage import WAV_HEADER_SIZE
+from timeline import read_alignment
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def inspect_wav(path):
+    """
+    Find out what is wrong with a recording.
+
+    Returns:
+        Dictionary with the problem (None, "stale_header", "truncated" or "headerless"),
+        the audio format if the header has one, and where the audio starts and ends
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        head = f.read(min(size, 4096))
+
+    if len(head) < 12 or head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+        return {"problem": "headerless", "size": size, "data_offset": 0, "data_bytes": size}
+
+    fmt = None
+    position = 12
+    while position + 8 <= len(head):
+        chunk_id, chunk_size = struct.unpack_from("<4sI", head, position)
+        if chunk_id == b"fmt " and position + 24 <= len(head):
+            _, channels, sample_rate, _, block_align, bits = struct.unpack_from("<HHIIHH", head, position + 8)
+            fmt = {"sample_rate": sample_rate, "channels": channels, "sample_width": bits // 8, "block_align": block_align}
+        elif chunk_id == b"data":
+            break
+        position += 8 + chunk_size + (chunk_size & 1)
+    else:
+        return {"problem": "headerless", "size": size, "data_offset": 0, "data_bytes": size}
+    if fmt is None or fmt["block_align"] == 0:
+        return {"problem": "headerless", "size": size, "data_offset": 0, "data_bytes": size}
+
+    data_offset = position + 8
+    stored_riff_size = struct.unpack_from("<I", head, 4)[0]
+    stored_data_bytes = struct.unpack_from("<I", head, position + 4)[0]
+    # A crashed writer leaves the audio running to the end of the file
+    available = size - data_offset
+    data_bytes = available - available % fmt["block_align"]
+
+    problem = None
+    if data_bytes != available:
+        problem = "truncated"
+    elif stored_data_bytes != data_bytes or stored_riff_size != size - 8:
+        problem = "stale_header"
+    return dict(fmt, problem=problem, size=size, data_offset=data_offset, data_bytes=data_bytes,
+                data_size_offset=position + 4, stored_data_bytes=stored_data_bytes)
+
+
+def headerless_format(path, sample_rate, channels, sample_width):
+    """Format of a headerless recording: from its alignment index, else the given one"""
+    try:
+        alignment = read_alignment(path)
+    except (OSError, ValueError):
+        alignment = None
+    if alignment is not None:
+        return alignment[0]["sample_rate"], alignment[0]["channels"], sample_width
+    return sample_rate, channels, sample_width
+
+
+def repair_wav(path, sample_rate=DEFAULT_SAMPLE_RATE, channels=DEFAULT_CHANNELS, sample_width=2):
+    """
+    Repair a recording in place.
+
+    Args:
+        path: WAV file, or raw PCM to turn into one
+        sample_rate, channels, sample_width: Format of a headerless file without alignment index
+
+    Returns:
+        The inspect_wav() result from before the repair
+    """
+    info = inspect_wav(path)
+    if info["problem"] is None:
+        return info
+
+    if info["problem"] == "headerless":
+        sample_rate, channels, sample_width = headerless_format(path, sample_rate, channels, sample_width)
+        block_align = channels * sample_width
+        with open(path, "rb") as f:
+            head = f.read(WAV_HEADER_SIZE)
+        # A header page lost in a host crash reads as zeros; anything else is audio
+        skip = WAV_HEADER_SIZE if len(head) == WAV_HEADER_SIZE and not any(head) else 0
+        data_bytes = info["size"] - skip
+        data_bytes -= data_bytes % block_align
+
+        tmp_path = f"{path}.repair.tmp"
+        with open(path, "rb") as source, open(tmp_path, "wb") as target:
+            target.write(wav_header(sample_rate, channels, sample_width, data_bytes))
+            source.seek(skip)
+            remaining = data_bytes
+            while remaining:
+                chunk = source.read(min(COPY_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                target.write(chunk)
+                remaining -= len(chunk)
+            target.flush()
+            os.fsync(target.fileno())
+        shutil.copystat(path, tmp_path)
+        os.replace(tmp_path, path)
+        return info
+
+    with open(path, "r+b") as f:
+        f.truncate(info["data_offset"] + info["data_bytes"])
+        f.seek(4)
+        f.write(struct.pack("<I", info["data_offset"] + info["data_bytes"] - 8))
+        f.seek(info["data_size_offset"])
+        f.write(struct.pack("<I", info["data_bytes"]))
+        f.flush()
+        os.fsync(f.fileno())
+    return info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Repair recordings with a stale or missing WAV header")
+    parser.add_argument("files", nargs="+", help="Recordings to repair")
+    parser.add_argument("--check", action="store_true", help="Only report problems; exit with 1 if there are any")
+    parser.add_argument("--sample-rate", type=int, default=DEFAULT_SAMPLE_RATE, help="Rate of headerless files")
+    parser.add_argument("--channels", type=int, default=DEFAULT_CHANNELS, help="Channels of headerless files")
+    parser.add_argument("--sample-width", type=int, default=2, help="Bytes per sample of headerless files")
+    args = parser.parse_args()
+
+    broken = 0
+    for path in args.files:
+        try:
+            info = inspect_wav(path) if args.check else repair_wav(path, args.sample_rate, args.channels, args.sample_width)
+        except OSError as e:
+            print(f"{path}: {e}")
+            broken += 1
+            continue
+        if info["problem"] is None:
+            print(f"{path}: ok")
+            continue
+        broken += 1
+        print(f"{path}: {info['problem']}" + ("" if args.check else ", repaired"))
+
+    if args.check and broken:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Streaming polyphase resampler for 16-bit PCM.
+
+The SDK delivers 32 kHz audio, while speech recognition needs at most 16 kHz.
+StreamingResampler converts between rates with a rational factor up/down
+using a Kaiser-windowed sinc filter split into polyphase branches, so every
+output sample costs only taps/up multiply-adds. It keeps the filter history
+and output phase between calls: feeding a stream chunk by chunk produces
+exactly the same samples as resampling it in one piece, whatever the chunk
+boundaries are.
+"""
+
+import math
+
+import numpy as np
+
+# Zero crossings of the sinc kept on each side of the centre tap
+ZERO_CROSSINGS = 24
+KAISER_BETA = 8.6
+# Passband edge as a fraction of the output Nyquist frequency
+ROLLOFF = 0.92
+
+
+def design_filter(up, down, zero_crossings=ZERO_CROSSINGS, beta=KAISER_BETA, rolloff=ROLLOFF):
+    """Low-pass FIR at the upsampled rate, with length a multiple of `up` and gain `up`"""
+    factor = max(up, down)
+    length = 2 * zero_crossings * factor + 1
+    length += -length % up
+    cutoff = rolloff * 0.5 / factor
+    n = np.arange(length) - (length - 1) / 2
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, beta)
+    return taps * (up / taps.sum())
+
+
+class StreamingResampler:
+    """Stateful rate converter; one instance per stream"""
+
+    def __init__(self, input_rate, output_rate, channels=1):
+        divisor = math.gcd(input_rate, output_rate)
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.up = output_rate // divisor
+        self.down = input_rate // divisor
+        self.channels = channels
+
+        taps = design_filter(self.up, self.down)
+        # Branch p holds taps p, p + up, p + 2*up, ...; branch k-th tap multiplies x[i - k]
+        self.phases = taps.reshape(-1, self.up).T.astype(np.float32)
+        self.taps_per_phase = self.phases.shape[1]
+        self.history = np.zeros((self.taps_per_phase - 1, channels), dtype=np.float32)
+        # Position of the next output sample on the upsampled time axis, relative to the next chunk
+        self.next_position = 0
+
+    @property
+    def is_identity(self):
+        return self.up == self.down
+
+    def process(self, pcm):
+        """Resample little-endian 16-bit PCM bytes; returns the samples that are ready"""
+        if self.is_identity:
+            return bytes(pcm)
+        samples = np.frombuffer(pcm, dtype="<i2").reshape(-1, self.channels)
+        output = self.process_array(samples.astype(np.float32))
+        return np.clip(np.rint(output), -32768, 32767).astype("<i2").tobytes()
+
+    def process_array(self, samples):
+        """Resample a float array of shape (frames, channels)"""
+        frames = len(samples)
+        buffer = np.concatenate((self.history, samples))
+
+        # Output n sits at upsampled position t = next_position + n*down, i.e. at
+        # input sample t // up using polyphase branch t % up
+        count = max(0, -(-(frames * self.up - self.next_position) // self.down))
+        positions = self.next_position + self.down * np.arange(count)
+        inputs = positions // self.up + self.taps_per_phase - 1
+        gather = inputs[:, None] - np.arange(self.taps_per_phase)[None, :]
+        output = np.einsum("nkc,nk->nc", buffer[gather], self.phases[positions % self.up])
+
+        self.next_position += count * self.down - frames * self.up
+        self.history = buffer[len(buffer) - (self.taps_per_phase - 1):]
+        return output
+
+    def latency_seconds(self):
+        """Group delay of the filter"""
+        return (self.phases.size - 1) / 2 / (self.input_rate * self.up)
@@ -0,0 +1,279 @@
+"""
+Disk retention for recordings and bot output.
+
+Bots keep writing meeting_recording_<id>.* files, PNG video frames and the
+raw audio.wav mirror, and nothing else removes them. The retention manager
+runs on a background thread at the lowest CPU priority (which also lowers its
+I/O priority) and, every RETENTION_INTERVAL_SECONDS:
+
+- applies RETENTION_ACTION to recordings older than RETENTION_MAX_AGE_DAYS:
+  delete them, compress the recording WAV to FLAC, or offload them to the
+  RECORDING_STORAGE bucket, which /record serves them from, and delete the
+  local copy
+- deletes video frames older than RETENTION_MAX_AGE_DAYS and truncates the
+  audio.wav mirror once it grows beyond RETENTION_MIRROR_MAX_MB
+- evicts the oldest recordings and frames while they take more than
+  RECORDINGS_DISK_BUDGET_MB, or while less than RETENTION_MIN_FREE_MB (twice
+  the scheduler's MIN_FREE_DISK_MB by default) is free on the recordings disk,
+  offloading them first if the action is offload
+
+Recordings of meetings that are still recording or post-processing, and files
+modified within RETENTION_MIN_IDLE_SECONDS, are never touched. Work is done
+in batches of RETENTION_BATCH_SIZE files with a pause in between, so a large
+cleanup does not saturate the disk the live bots write to.
+"""
+
+import os
+import threading
+import time
+
+from postprocess import run_ffmpeg
+from scheduler import free_disk_mb
+from storage import RECORDINGS_DIR, recording_key
+
+OUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_program", "out")
+FRAMES_DIR = os.path.join(OUT_DIR, "video_frames")
+MIRROR_PATH = os.path.join(OUT_DIR, "audio", "audio.wav")
+
+ACTIONS = ("delete", "compress", "offload")
+RECORDING_PREFIX = recording_key("")[:-len(".wav")]
+MB = 1024 * 1024
+
+
+class RetentionManager:
+    """Enforces the age policy and disk budget on a low-priority background thread"""
+
+    def __init__(self, root=RECORDINGS_DIR, in_use=None, storage=None, max_age_days=None, action=None,
+                 budget_mb=None, min_free_mb=None, interval=None, batch_size=None, batch_pause=None):
+        """
+        Args:
+            root: Directory the bots write recordings to
+            in_use: Callable meeting_id -> bool; True while a meeting's files must be kept
+            storage: Storage backend recordings are offloaded to when the action is offload
+            max_age_days: Age after which the action is applied; 0 disables the age policy
+            action: delete, compress or offload
+            budget_mb: Disk space recordings and frames may take; 0 means no budget
+            min_free_mb: Free space below which the oldest recordings are evicted
+            interval: Seconds between passes
+            batch_size: Files handled before pausing
+            batch_pause: Seconds to pause between batches
+        """
+        self.root = root
+        self.in_use = in_use or (lambda meeting_id: False)
+        self.max_age = float(max_age_days if max_age_days is not None else os.environ.get("RETENTION_MAX_AGE_DAYS", 30)) * 86400
+        self.action = action or os.environ.get("RETENTION_ACTION", "delete")
+        if self.action not in ACTIONS:
+            raise ValueError(f"RETENTION_ACTION must be one of {', '.join(ACTIONS)}, not {self.action!r}")
+        self.budget = float(budget_mb if budget_mb is not None else os.environ.get("RECORDINGS_DISK_BUDGET_MB", 0)) * MB
+        # Above the scheduler's MIN_FREE_DISK_MB, so space is freed before new bots are refused
+        self.min_free_mb = min_free_mb if min_free_mb is not None else float(
+            os.environ.get("RETENTION_MIN_FREE_MB", 2 * float(os.environ.get("MIN_FREE_DISK_MB", 1024))))
+        self.mirror_max = float(os.environ.get("RETENTION_MIRROR_MAX_MB", 1024)) * MB
+        self.min_idle = float(os.environ.get("RETENTION_MIN_IDLE_SECONDS", 600))
+        self.interval = interval or float(os.environ.get("RETENTION_INTERVAL_SECONDS", 60))
+        self.batch_size = batch_size or int(os.environ.get("RETENTION_BATCH_SIZE", 20))
+        self.batch_pause = batch_pause if batch_pause is not None else float(os.environ.get("RETENTION_BATCH_PAUSE_SECONDS", 1))
+
+        # /record falls back to the recording storage only when it is remote
+        self.storage = storage
+        if self.action == "offload" and (self.storage is None or not self.storage.streaming):
+            raise ValueError("RETENTION_ACTION=offload needs a remote RECORDING_STORAGE")
+
+        self.stopped = threading.Event()
+        self.wakeup = threading.Event()
+        self.handled = 0
+        self.lock = threading.Lock()
+        self.last_pass = None
+        self.totals = {"deleted": 0, "compressed": 0, "offloaded": 0, "bytes_freed": 0, "errors": 0}
+
+    def start(self):
+        threading.Thread(target=self._loop, name="retention", daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+        self.wakeup.set()
+
+    def trigger(self):
+        """Run a pass now, e.g. when a bot reports failing writes"""
+        self.wakeup.set()
+
+    def status(self):
+        with self.lock:
+            return {
+                "action": self.action,
+                "max_age_days": self.max_age / 86400,
+                "budget_mb": self.budget / MB or None,
+                "min_free_mb": self.min_free_mb,
+                "free_disk_mb": free_disk_mb(self.root),
+                "last_pass": self.last_pass,
+                **self.totals
+            }
+
+    def run_once(self):
+        """One retention pass; returns its summary"""
+        now = started_at = time.time()
+        before = dict(self.totals)
+
+        self._cap_mirror()
+
+        if self.max_age > 0:
+            for item in self._recordings() + self._frames():
+                if not self._eligible(item, now) or now - item["mtime"] <= self.max_age:
+                    continue
+                if "meeting_id" not in item:
+                    self._apply(item, "delete")
+                elif self._wants_action(item):
+                    self._apply(item, self.action)
+
+        # Then the oldest first, until the budget and the free space are both satisfied
+        items = self._recordings() + self._frames()
+        usage = sum(item["size"] for item in items)
+        for item in sorted((item for item in items if self._eligible(item, now)), key=lambda item: item["mtime"]):
+            over_budget = self.budget and usage > self.budget
+            free_mb = free_disk_mb(self.root)
+            low_disk = free_mb is not None and free_mb < self.min_free_mb
+            if not over_budget and not low_disk:
+                break
+            if self._apply(item, "offload" if self.action == "offload" and "meeting_id" in item else "delete"):
+                usage -= item["size"]
+
+        summary = {key: self.totals[key] - before[key] for key in self.totals}
+        summary.update(started_at=started_at, duration=round(time.time() - started_at, 3),
+                       usage_mb=round(usage / MB, 1), free_disk_mb=free_disk_mb(self.root))
+        with self.lock:
+            self.last_pass = summary
+        if summary["bytes_freed"] or summary["errors"]:
+            print(f"Retention freed {summary['bytes_freed'] / MB:.1f} MB "
+                  f"({summary['deleted']} deleted, {summary['compressed']} compressed, "
+                  f"{summary['offloaded']} offloaded, {summary['errors']} errors)")
+        return summary
+
+    def _loop(self):
+        # Only this thread: Linux applies a thread ID's nice value to that thread,
+        # and the default I/O scheduler class derives its priority from it
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except OSError as e:
+            print(f"Could not lower the retention thread priority: {e}")
+
+        while not self.stopped.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error in retention pass: {e}")
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+
+    def _recordings(self):
+        """Files in root grouped by meeting, with their total size and latest mtime"""
+        groups = {}
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            return []
+        for entry in entries:
+            if not entry.name.startswith(RECORDING_PREFIX) or not entry.is_file():
+                continue
+            meeting_id = entry.name[len(RECORDING_PREFIX):].split(".", 1)[0]
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            group = groups.setdefault(meeting_id, {"meeting_id": meeting_id, "paths": [], "size": 0, "mtime": 0})
+            group["paths"].append(entry.path)
+            group["size"] += stat.st_size
+            group["mtime"] = max(group["mtime"], stat.st_mtime)
+        return list(groups.values())
+
+    def _frames(self):
+        frames = []
+        try:
+            entries = list(os.scandir(FRAMES_DIR))
+        except OSError:
+            return []
+        for entry in entries:
+            if entry.name.endswith(".png") and entry.is_file():
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                frames.append({"paths": [entry.path], "size": stat.st_size, "mtime": stat.st_mtime})
+        return frames
+
+    def _cap_mirror(self):
+        """The mirror is raw PCM appended by every bot; they recreate it on the next frame"""
+        try:
+            size = os.path.getsize(MIRROR_PATH)
+        except OSError:
+            return
+        if size > self.mirror_max:
+            self._remove([MIRROR_PATH])
+
+    def _eligible(self, item, now):
+        if now - item["mtime"] <= self.min_idle:
+            return False
+        return "meeting_id" not in item or not self.in_use(item["meeting_id"])
+
+    def _wants_action(self, group):
+        # Compressed recordings have no WAV left; offloaded ones are gone locally
+        return self.action != "compress" or self._recording_wav(group) in group["paths"]
+
+    def _recording_wav(self, group):
+        # Only the recording itself: the manifest of post-processing artifacts,
+        # e.g. .normalized.wav, points at their paths
+        return os.path.join(self.root, recording_key(group["meeting_id"]))
+
+    def _apply(self, item, action):
+        """Apply an action to a recording group or frame; returns True if it left the disk"""
+        try:
+            if action == "compress":
+                if self._recording_wav(item) in item["paths"]:
+                    self._compress(self._recording_wav(item))
+                return False
+            if action == "offload":
+                for path in item["paths"]:
+                    key = os.path.basename(path)
+                    if not self.storage.exists(key):
+                        self.storage.put_file(key, path)
+            self._remove(item["paths"])
+            self._count("offloaded" if action == "offload" else "deleted")
+            return True
+        except Exception as e:
+            self._count("errors")
+            print(f"Error applying retention action {action} to {item['paths'][0]}: {e}")
+            return False
+
+    def _compress(self, path):
+        flac_path = os.path.splitext(path)[0] + ".flac"
+        tmp_path = flac_path + ".tmp"
+        run_ffmpeg(["-i", path, "-codec:a", "flac", "-f", "flac", tmp_path])
+        # Keep the recording's age, so compressing it does not restart its retention
+        stat = os.stat(path)
+        os.utime(tmp_path, (stat.st_atime, stat.st_mtime))
+        os.replace(tmp_path, flac_path)
+        freed = os.path.getsize(path) - os.path.getsize(flac_path)
+        os.remove(path)
+        with self.lock:
+            self.totals["compressed"] += 1
+            self.totals["bytes_freed"] += max(freed, 0)
+        self._pace()
+
+    def _remove(self, paths):
+        for path in paths:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            with self.lock:
+                self.totals["bytes_freed"] += size
+            self._pace()
+
+    def _count(self, key):
+        with self.lock:
+            self.totals[key] += 1
+
+    def _pace(self):
+        self.handled += 1
+        if self.handled % self.batch_size == 0:
+            self.stopped.wait(self.batch_pause)
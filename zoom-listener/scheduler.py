@@ -0,0 +1,241 @@
+"""
+Admission control for meeting bot processes.
+
+Every Zoom SDK bot needs a few hundred MB of memory and up to a core, so the
+API does not spawn them unconditionally. A start request is admitted only if
+the host is below the concurrency limit and has enough free memory, CPU and
+disk space for the recording; otherwise it waits in a priority queue until a
+running bot ends, or is rejected when the queue itself is full.
+"""
+
+import heapq
+import itertools
+import os
+import shutil
+import threading
+import time
+from typing import Optional
+
+from storage import RECORDINGS_DIR
+
+
+class SchedulerFull(Exception):
+    """Raised when a start request can neither be admitted nor queued"""
+
+    def __init__(self, reason, retry_after=30):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def available_memory_mb() -> Optional[float]:
+    """MemAvailable from /proc/meminfo in MB, or None if it cannot be read"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def free_disk_mb(path) -> Optional[float]:
+    """Free space in MB on the filesystem holding `path` (or its nearest existing parent), or None"""
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+    try:
+        return shutil.disk_usage(path).free / (1024 * 1024)
+    except OSError:
+        return None
+
+
+class BotScheduler:
+    """Decides when a meeting bot may be launched and which CPUs it runs on"""
+
+    def __init__(self, launch, max_concurrent=None, max_pending=None, bot_memory_mb=None,
+                 warmup_seconds=None, max_load_per_cpu=None, cpu_pinning=None, cpus_per_bot=None,
+                 min_free_disk_mb=None, bot_disk_mb=None, disk_path=RECORDINGS_DIR, reserved_bots=0):
+        """
+        Args:
+            launch: Callable (meeting_id, meeting_password, cpus, **options) -> bool that spawns the bot
+            max_concurrent: Maximum number of bots running at the same time
+            max_pending: Maximum number of queued start requests
+            bot_memory_mb: Memory a single bot is expected to use at peak
+            warmup_seconds: How long a new bot is assumed not to have allocated its memory yet
+            max_load_per_cpu: 1-minute load average per CPU above which no bot is admitted
+            cpu_pinning: Pin every bot to its own set of CPUs
+            cpus_per_bot: Number of CPUs in each bot's set when pinning
+            min_free_disk_mb: Free space that must be left on the recordings disk
+            bot_disk_mb: Disk space a running bot is expected to still write
+            disk_path: Directory the bots write recordings to
+            reserved_bots: Bot processes kept outside the scheduler, i.e. the standby pool;
+                they count against every limit as bots about to join a meeting
+        """
+        self.launch = launch
+        self.max_concurrent = max_concurrent or int(os.environ.get("MAX_CONCURRENT_BOTS", os.cpu_count() or 1))
+        self.max_pending = max_pending or int(os.environ.get("MAX_PENDING_STARTS", 100))
+        self.bot_memory_mb = bot_memory_mb or float(os.environ.get("BOT_MEMORY_MB", 500))
+        self.warmup_seconds = warmup_seconds or float(os.environ.get("BOT_WARMUP_SECONDS", 30))
+        self.max_load_per_cpu = max_load_per_cpu or float(os.environ.get("MAX_LOAD_PER_CPU", 1.5))
+        if cpu_pinning is None:
+            cpu_pinning = os.environ.get("BOT_CPU_PINNING") == "true"
+        self.cpu_pinning = cpu_pinning
+        self.cpus_per_bot = cpus_per_bot or int(os.environ.get("BOT_CPUS_PER_BOT", 1))
+        self.min_free_disk_mb = min_free_disk_mb or float(os.environ.get("MIN_FREE_DISK_MB", 1024))
+        self.bot_disk_mb = bot_disk_mb or float(os.environ.get("BOT_DISK_MB", 256))
+        self.disk_path = disk_path
+        self.reserved_bots = reserved_bots
+        if self.reserved_bots >= self.max_concurrent:
+            raise ValueError(f"BOT_STANDBY_POOL ({self.reserved_bots}) must be below MAX_CONCURRENT_BOTS ({self.max_concurrent})")
+        self.cpus = sorted(os.sched_getaffinity(0))
+
+        self.cond = threading.Condition()
+        # meeting_id -> {"launched_at": monotonic time, "cpus": set or None}
+        self.running = {}
+        # Heap of (-priority, sequence, meeting_id, meeting_password, submitted_at, options)
+        self.pending = []
+        self.sequence = itertools.count()
+        self.thread = None
+
+    def start(self):
+        """Start the dispatcher thread that launches queued bots when capacity frees up"""
+        self.thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self.thread.start()
+
+    def submit(self, meeting_id, meeting_password, priority=0, options=None) -> dict:
+        """
+        Admit a start request or queue it.
+
+        Args:
+            options: Extra keyword arguments passed to launch, e.g. the capture format
+
+        Returns:
+            {"state": "admitted"} if the bot was launched, or
+            {"state": "queued", "position": n} if it waits for capacity
+
+        Raises:
+            SchedulerFull: if the pending queue is full
+        """
+        with self.cond:
+            position = self._position(meeting_id)
+            if position is not None:
+                return {"state": "queued", "position": position}
+
+            # Queued requests with a higher priority go first
+            outranked = any(-item[0] >= priority for item in self.pending)
+            if not outranked and self._block_reason() is None:
+                cpus = self._reserve(meeting_id)
+            else:
+                if len(self.pending) >= self.max_pending:
+                    raise SchedulerFull(f"{len(self.pending)} start requests already pending")
+                heapq.heappush(self.pending, (-priority, next(self.sequence), meeting_id, meeting_password, time.time(), options or {}))
+                self.cond.notify()
+                return {"state": "queued", "position": self._position(meeting_id)}
+
+        if not self.launch(meeting_id, meeting_password, cpus, **(options or {})):
+            self.release(meeting_id)
+            return {"state": "failed"}
+        return {"state": "admitted"}
+
+    def release(self, meeting_id):
+        """Free the slot of a bot that ended or was stopped"""
+        with self.cond:
+            if self.running.pop(meeting_id, None) is not None:
+                self.cond.notify()
+
+    def cancel(self, meeting_id) -> bool:
+        """Remove a queued start request; returns False if it was not queued"""
+        with self.cond:
+            for index, item in enumerate(self.pending):
+                if item[2] == meeting_id:
+                    self.pending.pop(index)
+                    heapq.heapify(self.pending)
+                    return True
+        return False
+
+    def position(self, meeting_id) -> Optional[int]:
+        """1-based position of a meeting in the pending queue, or None"""
+        with self.cond:
+            return self._position(meeting_id)
+
+    def capacity(self) -> dict:
+        """Snapshot of the limits and current usage"""
+        with self.cond:
+            return {
+                "running": len(self.running),
+                "reserved": self.reserved_bots,
+                "max_concurrent": self.max_concurrent,
+                "pending": len(self.pending),
+                "max_pending": self.max_pending,
+                "available_memory_mb": available_memory_mb(),
+                "free_disk_mb": free_disk_mb(self.disk_path),
+                "load_per_cpu": round(os.getloadavg()[0] / len(self.cpus), 2),
+                "block_reason": self._block_reason()
+            }
+
+    def _position(self, meeting_id):
+        for position, item in enumerate(sorted(self.pending), start=1):
+            if item[2] == meeting_id:
+                return position
+        return None
+
+    def _block_reason(self) -> Optional[str]:
+        """Why no further bot can be admitted right now, or None if one can"""
+        if len(self.running) + self.reserved_bots >= self.max_concurrent:
+            return "max_concurrent"
+
+        memory_mb = available_memory_mb()
+        if memory_mb is not None:
+            # Bots launched recently have not allocated their memory yet, and
+            # reserved bots allocate a meeting's worth once they join one
+            now = time.monotonic()
+            warming_up = sum(1 for bot in self.running.values() if now - bot["launched_at"] < self.warmup_seconds)
+            warming_up += self.reserved_bots
+            if memory_mb - warming_up * self.bot_memory_mb < self.bot_memory_mb:
+                return "memory"
+
+        if os.getloadavg()[0] / len(self.cpus) > self.max_load_per_cpu:
+            return "cpu"
+
+        disk_mb = free_disk_mb(self.disk_path)
+        if disk_mb is not None:
+            # Running bots keep growing their recordings; a full disk loses every one of them
+            if disk_mb - (len(self.running) + self.reserved_bots + 1) * self.bot_disk_mb < self.min_free_disk_mb:
+                return "disk"
+
+        return None
+
+    def _reserve(self, meeting_id):
+        """Take a slot for a bot and pick its CPU set; caller holds the lock"""
+        cpus = None
+        if self.cpu_pinning:
+            usage = {cpu: 0 for cpu in self.cpus}
+            for bot in self.running.values():
+                for cpu in bot["cpus"] or ():
+                    usage[cpu] += 1
+            cpus = set(sorted(self.cpus, key=lambda cpu: usage[cpu])[:self.cpus_per_bot])
+
+        self.running[meeting_id] = {"launched_at": time.monotonic(), "cpus": cpus}
+        return cpus
+
+    def _dispatch_loop(self):
+        while True:
+            with self.cond:
+                # Memory and load change without notifications, so re-check periodically
+                while not self.pending or self._block_reason() is not None:
+                    self.cond.wait(timeout=1)
+                _, _, meeting_id, meeting_password, submitted_at, options = heapq.heappop(self.pending)
+                cpus = self._reserve(meeting_id)
+
+            print(f"Launching queued meeting {meeting_id} after {time.time() - submitted_at:.1f}s")
+            try:
+                launched = self.launch(meeting_id, meeting_password, cpus, **options)
+            except Exception as e:
+                print(f"Error launching queued meeting {meeting_id}: {e}")
+                launched = False
+            if not launched:
+                self.release(meeting_id)
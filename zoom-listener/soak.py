@@ -0,0 +1,334 @@
+"""
+Soak test of a meeting bot for memory growth.
+
+Runs a MeetingBot in this process against the fake SDK (fake_zoom_sdk.py) with
+synthetic media, for --hours simulated hours at --speed times real time. Every
+--interval simulated minutes it records the process RSS, the memory traced by
+tracemalloc and the number of live objects by type. After --warmup minutes the
+first sample becomes the baseline; the report lists the allocation sites and
+object types that grew since then.
+
+Growth is the slope of a linear fit of RSS over the samples after the
+baseline, in MB per simulated hour. The run fails (exit status 1) if it
+exceeds --max-growth, or if audio did not arrive at --min-audio-ratio of the
+rate the fake SDK sends, so a bot that never received audio does not pass.
+
+At speeds other than 1 gap detection is off (AUDIO_GAP_MODE=off), because
+the sped-up audio outruns the wall clock the bot stamps frames with.
+
+The JSON report (--report) can be compared with the report of another
+version:
+
+Usage:
+    python soak.py [--hours 2] [--speed 10] [--interval 5] [--report soak.json]
+    python soak.py --diff old.json new.json
+
+The bot runs in a temporary directory that is removed afterwards. At 32 kHz
+mono its recording and the audio.wav copy it keeps take about 460 MB per
+simulated hour.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+
+# Any number; the fake SDK accepts every meeting
+MEETING_ID = "1000000000"
+TOP = 15
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Peak rather than current RSS, but still shows steady growth
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def object_counts():
+    return Counter(type(obj).__name__ for obj in gc.get_objects())
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        tracemalloc.Filter(False, "<unknown>")
+    ))
+
+
+def allocation_growth(baseline, snapshot):
+    """Allocation sites whose traced size grew the most since the baseline"""
+    root = os.path.dirname(os.path.abspath(__file__)) + os.sep
+    growth = []
+    for stat in snapshot.compare_to(baseline, "lineno")[:TOP]:
+        if stat.size_diff <= 0:
+            continue
+        frame = stat.traceback[0]
+        growth.append({
+            "where": f"{frame.filename.replace(root, '')}:{frame.lineno}",
+            "size_kb": round(stat.size / 1024, 1),
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "count_diff": stat.count_diff
+        })
+    return growth
+
+
+def slope_per_hour(samples, key):
+    """MB per simulated hour from a linear fit, None with fewer than two samples"""
+    if len(samples) < 2:
+        return None
+    hours = [sample["hours"] for sample in samples]
+    values = [sample[key] for sample in samples]
+    return round(float(np.polyfit(hours, values, 1)[0]), 3)
+
+
+def run(args):
+    # The fake SDK and storage read their settings on import
+    recordings_dir = os.path.abspath(args.recordings_dir or tempfile.mkdtemp(prefix="soak-"))
+    os.environ.update(ZOOM_SDK_FAKE="true", ZOOM_FAKE_SPEED=str(args.speed), RECORDINGS_DIR=recordings_dir)
+    # The bot also appends raw audio to sample_program/out/audio/audio.wav relative to its working directory
+    os.makedirs(os.path.join(recordings_dir, "sample_program", "out", "audio"), exist_ok=True)
+    os.chdir(recordings_dir)
+    os.environ.pop("DEEPGRAM_API_KEY", None)
+    os.environ.pop("RECORDING_STORAGE", None)
+    # Sped-up audio outruns the wall clock the bot stamps frames with; gap detection
+    # would log every frame as a discontinuity, which production never does
+    gap_detection = args.speed == 1
+    if not gap_detection:
+        os.environ["AUDIO_GAP_MODE"] = "off"
+
+    if args.trace_frames:
+        tracemalloc.start(args.trace_frames)
+
+    import gi
+    gi.require_version('GLib', '2.0')
+    from gi.repository import GLib
+
+    from bot_logging import setup_bot_logging, shutdown_bot_logging
+    from meeting_bot import MeetingBot
+    from heartbeat import HEARTBEAT_INTERVAL_MS
+    from fake_zoom_sdk import DROP_RATE, FRAME_MS
+
+    setup_bot_logging(MEETING_ID, level=args.log_level)
+    bot = MeetingBot(MEETING_ID, "", "Soak")
+    bot.init()
+
+    samples = []
+    state = {"baseline": None, "baseline_objects": None, "started": time.monotonic()}
+    main_loop = GLib.MainLoop()
+
+    def simulated_hours():
+        return (time.monotonic() - state["started"]) * args.speed / 3600
+
+    def sample():
+        gc.collect()
+        hours = simulated_hours()
+        traced, peak = tracemalloc.get_traced_memory() if args.trace_frames else (0, 0)
+        counts = object_counts()
+        samples.append({
+            "hours": round(hours, 3),
+            "rss_mb": round(rss_mb(), 2),
+            "traced_mb": round(traced / 2 ** 20, 2),
+            "traced_peak_mb": round(peak / 2 ** 20, 2),
+            "objects": sum(counts.values()),
+            "audio_frames": bot.audio_frame_count
+        })
+        print(f"{hours:6.2f} h  RSS {samples[-1]['rss_mb']:8.1f} MB  traced {samples[-1]['traced_mb']:8.1f} MB  "
+              f"objects {samples[-1]['objects']:>9}  frames {bot.audio_frame_count}", flush=True)
+        if state["baseline_objects"] is None and hours * 60 >= args.warmup:
+            state["baseline_objects"] = counts
+            state["baseline_index"] = len(samples) - 1
+            if args.trace_frames:
+                state["baseline"] = take_snapshot()
+        return True
+
+    def heartbeat():
+        bot.heartbeat.send(bot.heartbeat_stats())
+        return True
+
+    def finish():
+        sample()
+        state["end_objects"] = object_counts()
+        state["end_snapshot"] = take_snapshot() if args.trace_frames and state["baseline"] else None
+        state["stats"] = bot.heartbeat_stats()
+        bot.leave()
+        bot.cleanup()
+        main_loop.quit()
+        return False
+
+    real_interval_ms = int(args.interval * 60 * 1000 / args.speed)
+    GLib.timeout_add(max(real_interval_ms, 100), sample)
+    GLib.timeout_add(HEARTBEAT_INTERVAL_MS, heartbeat)
+    GLib.timeout_add(int(args.hours * 3600 * 1000 / args.speed), finish)
+    try:
+        main_loop.run()
+    finally:
+        shutdown_bot_logging()
+        if not args.recordings_dir:
+            shutil.rmtree(recordings_dir, ignore_errors=True)
+
+    measured = samples[state.get("baseline_index", len(samples)):]
+    growth = {
+        "rss_mb_per_hour": slope_per_hour(measured, "rss_mb"),
+        "traced_mb_per_hour": slope_per_hour(measured, "traced_mb") if args.trace_frames else None,
+        "rss_mb": round(measured[-1]["rss_mb"] - measured[0]["rss_mb"], 2) if measured else None,
+        "objects": measured[-1]["objects"] - measured[0]["objects"] if measured else None
+    }
+    object_growth = {}
+    if state["baseline_objects"] is not None:
+        diff = state["end_objects"]
+        diff.subtract(state["baseline_objects"])
+        object_growth = dict((name, count) for name, count in diff.most_common(TOP) if count > 0)
+
+    # Audio must have flowed the whole time, or the run measured an idle bot
+    expected_fps = 1000 / FRAME_MS * (1 - DROP_RATE)
+    audio = {"frames": bot.audio_frame_count, "frames_per_second": None, "expected_per_second": round(expected_fps, 1)}
+    if len(measured) >= 2 and measured[-1]["hours"] > measured[0]["hours"]:
+        audio["frames_per_second"] = round((measured[-1]["audio_frames"] - measured[0]["audio_frames"])
+                                           / ((measured[-1]["hours"] - measured[0]["hours"]) * 3600), 1)
+
+    failures = []
+    # A run too short to fit a slope proves nothing and does not pass
+    if growth["rss_mb_per_hour"] is None:
+        failures.append("too few samples after the warmup")
+    elif growth["rss_mb_per_hour"] > args.max_growth:
+        failures.append("memory grows faster than the limit")
+    if audio["frames"] == 0:
+        failures.append("no audio frames were received")
+    elif audio["frames_per_second"] is not None and audio["frames_per_second"] < args.min_audio_ratio * expected_fps:
+        failures.append(f"audio arrived at {audio['frames_per_second']} frames per simulated second, "
+                        f"expected {audio['expected_per_second']}")
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "hours": args.hours, "speed": args.speed, "interval_minutes": args.interval,
+            "warmup_minutes": args.warmup, "trace_frames": args.trace_frames,
+            "max_growth_mb_per_hour": args.max_growth, "min_audio_ratio": args.min_audio_ratio,
+            "gap_detection": gap_detection
+        },
+        "samples": samples,
+        "growth": growth,
+        "audio": audio,
+        "allocation_growth": allocation_growth(state["baseline"], state["end_snapshot"]) if state.get("end_snapshot") else [],
+        "object_growth": object_growth,
+        "bot_stats": state.get("stats"),
+        "failures": failures,
+        "passed": not failures
+    }
+
+
+def print_summary(report):
+    growth = report["growth"]
+    if growth["objects"] is None:
+        print("\nNo samples after the warmup; run longer than --warmup")
+    else:
+        print(f"\nRSS growth {growth['rss_mb']} MB, {growth['rss_mb_per_hour']} MB per simulated hour "
+              f"(limit {report['config']['max_growth_mb_per_hour']}), traced {growth['traced_mb_per_hour']} MB per hour, "
+              f"{growth['objects']:+} objects")
+    if report["allocation_growth"]:
+        print("\nAllocation sites that grew:")
+        for site in report["allocation_growth"]:
+            print(f"  {site['size_diff_kb']:>+10.1f} KB {site['count_diff']:>+8} blocks  {site['where']}")
+    if report["object_growth"]:
+        print("\nObject types that grew:")
+        for name, count in report["object_growth"].items():
+            print(f"  {count:>+10}  {name}")
+    audio = report["audio"]
+    print(f"\nAudio: {audio['frames']} frames, {audio['frames_per_second']} per simulated second "
+          f"(expected {audio['expected_per_second']})")
+    if not report["config"]["gap_detection"]:
+        print("Gap detection was off: at speeds other than 1 the audio outruns the capture clock")
+    print("\nPASSED" if report["passed"] else "\nFAILED: " + "; ".join(report["failures"]))
+
+
+def diff_reports(old_path, new_path):
+    """Print the growth figures of two reports side by side"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    print(f"{'':<24}{old.get('commit') or old_path:>16}{new.get('commit') or new_path:>16}")
+    for key in ("rss_mb_per_hour", "traced_mb_per_hour", "rss_mb", "objects"):
+        print(f"{key:<24}{str(old['growth'].get(key)):>16}{str(new['growth'].get(key)):>16}")
+    print(f"{'final rss_mb':<24}{old['samples'][-1]['rss_mb']:>16}{new['samples'][-1]['rss_mb']:>16}")
+    print(f"{'passed':<24}{str(old['passed']):>16}{str(new['passed']):>16}")
+
+    old_sites = {site["where"]: site for site in old["allocation_growth"]}
+    new_sites = [site for site in new["allocation_growth"] if site["where"] not in old_sites]
+    if new_sites:
+        print("\nAllocation sites growing only in the new report:")
+        for site in new_sites:
+            print(f"  {site['size_diff_kb']:>+10.1f} KB  {site['where']}")
+
+    types = sorted(set(old["object_growth"]) | set(new["object_growth"]),
+                   key=lambda name: -new["object_growth"].get(name, 0))
+    if types:
+        print("\nObject growth by type:")
+        for name in types:
+            print(f"  {name:<30}{old['object_growth'].get(name, 0):>+10}{new['object_growth'].get(name, 0):>+10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test a meeting bot for memory growth")
+    parser.add_argument("--hours", type=float, default=2, help="Simulated meeting duration in hours")
+    parser.add_argument("--speed", type=float, default=10, help="Simulated seconds per real second")
+    parser.add_argument("--interval", type=float, default=5, help="Simulated minutes between samples")
+    parser.add_argument("--warmup", type=float, default=15, help="Simulated minutes before the baseline sample")
+    parser.add_argument("--max-growth", type=float, default=5, help="Allowed RSS growth in MB per simulated hour")
+    parser.add_argument("--min-audio-ratio", type=float, default=0.9,
+                        help="Fail if audio frames arrive at less than this fraction of the expected rate")
+    parser.add_argument("--trace-frames", type=int, default=1, help="tracemalloc traceback depth, 0 disables tracing")
+    parser.add_argument("--log-level", default="WARNING", help="Bot log level")
+    parser.add_argument("--recordings-dir", help="Keep the recording in this directory")
+    parser.add_argument("--report", help="Write the JSON report to this file")
+    parser.add_argument("--diff", nargs=2, metavar=("OLD", "NEW"), help="Compare two reports instead of running")
+    args = parser.parse_args()
+
+    if args.diff:
+        diff_reports(*args.diff)
+        return
+    if args.report:
+        # run() changes into the scratch directory
+        args.report = os.path.abspath(args.report)
+
+    print(f"Soak: {args.hours} simulated hours at {args.speed}x, "
+          f"about {args.hours * 60 / args.speed:.0f} minutes", flush=True)
+    report = run(args)
+    print_summary(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.report}")
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
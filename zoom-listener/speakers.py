@@ -0,0 +1,200 @@
+"""
+Speaker activity timeline of a recording.
+
+The SDK reports which participants are talking (active audio changes) and
+when they mute or unmute. SpeakerTimeline appends those events to a small
+file next to the recording, on the capture clock of timeline.py, so speaker
+turns line up with the audio and transcript:
+
+    meeting_recording_<id>.speakers.bin    16-byte header, then 16-byte events
+    meeting_recording_<id>.speakers.json   user id -> display name
+
+read_turns() loads the events into NumPy arrays and pairs them into turns.
+Matching transcript segments against the turns attributes text to speakers
+without running diarization on the audio.
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+SPEAKERS_MAGIC = b"ZSP1"
+SPEAKERS_VERSION = 1
+# magic, version, wall clock time of the capture clock origin
+SPEAKERS_HEADER = struct.Struct("<4sId")
+# capture ns since the origin, user id, event
+SPEAKER_EVENT = struct.Struct("<qIB3x")
+EVENT_DTYPE = np.dtype([("capture_ns", "<i8"), ("user_id", "<u4"), ("event", "u1"), ("pad", "V3")])
+
+SPEAKING = 1
+SILENT = 2
+MUTED = 3
+UNMUTED = 4
+
+# Active audio flickers between words; shorter pauses do not end a turn
+TURN_MERGE_GAP = float(os.environ.get("SPEAKER_TURN_MERGE_GAP", 0.5))
+
+
+def speakers_path(recording):
+    base, _ = os.path.splitext(recording)
+    return base + ".speakers.bin"
+
+
+def speaker_names_path(recording):
+    base, _ = os.path.splitext(recording)
+    return base + ".speakers.json"
+
+
+class SpeakerTimeline:
+    """Append-only speaker events of one recording; safe to call from SDK threads"""
+
+    def __init__(self, recording, origin_ns=None):
+        # Share the origin of the recording's CaptureTimeline to stay aligned with it
+        self.origin_ns = origin_ns if origin_ns is not None else time.monotonic_ns()
+        self.lock = threading.Lock()
+        self.file = open(speakers_path(recording), "wb")
+        started_at = time.time() - (time.monotonic_ns() - self.origin_ns) / 1e9
+        self.file.write(SPEAKERS_HEADER.pack(SPEAKERS_MAGIC, SPEAKERS_VERSION, started_at))
+        self.file.flush()
+        self.names_file = speaker_names_path(recording)
+        self.names = {}
+        self.speaking = set()
+        self.turns = 0
+
+    def active(self, user_ids, captured_ns):
+        """Participants whose audio is active now; everyone else stopped talking"""
+        with self.lock:
+            now = set(user_ids)
+            for user_id in sorted(self.speaking - now):
+                self._append(captured_ns, user_id, SILENT)
+            for user_id in sorted(now - self.speaking):
+                self._append(captured_ns, user_id, SPEAKING)
+                self.turns += 1
+            self.speaking = now
+
+    def muted(self, user_id, muted, captured_ns):
+        with self.lock:
+            if muted and user_id in self.speaking:
+                self.speaking.discard(user_id)
+                self._append(captured_ns, user_id, SILENT)
+            self._append(captured_ns, user_id, MUTED if muted else UNMUTED)
+
+    def knows(self, user_id):
+        return user_id in self.names
+
+    def name(self, user_id, name):
+        with self.lock:
+            if self.file.closed or self.names.get(user_id) == name:
+                return
+            self.names[user_id] = name
+            # Rewritten whole, it only changes when somebody new talks
+            with open(self.names_file + ".tmp", "w") as f:
+                json.dump({str(k): v for k, v in self.names.items()}, f)
+            os.replace(self.names_file + ".tmp", self.names_file)
+
+    def close(self):
+        """End the turns still open at the end of the recording"""
+        with self.lock:
+            captured_ns = time.monotonic_ns()
+            for user_id in sorted(self.speaking):
+                self._append(captured_ns, user_id, SILENT)
+            self.speaking = set()
+            self.file.close()
+
+    def _append(self, captured_ns, user_id, event):
+        # An active-speaker or mute callback that got hold of this timeline before
+        # stop_audio_recording() dropped it can still run after close()
+        if self.file.closed:
+            return
+        self.file.write(SPEAKER_EVENT.pack(captured_ns - self.origin_ns, user_id, event))
+        self.file.flush()
+
+
+def read_speaker_events(recording):
+    """
+    Returns:
+        (wall clock start, structured array of events), or None if the recording has no speaker timeline
+    """
+    path = speakers_path(recording)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < SPEAKERS_HEADER.size:
+        return None
+    magic, version, started_at = SPEAKERS_HEADER.unpack_from(data)
+    if magic != SPEAKERS_MAGIC or version != SPEAKERS_VERSION:
+        raise ValueError(f"{path} is not a speaker timeline")
+
+    body = data[SPEAKERS_HEADER.size:]
+    # A bot still recording may be halfway through an event
+    events = np.frombuffer(body[:len(body) - len(body) % EVENT_DTYPE.itemsize], dtype=EVENT_DTYPE)
+    return started_at, events
+
+
+def read_turns(recording, start=None, end=None, merge_gap=TURN_MERGE_GAP):
+    """
+    Speaker turns overlapping [start, end], in seconds since the recording started.
+
+    Returns:
+        Dictionary with the speakers' names, their turns (end is None while a turn is
+        still open) and talk time per speaker, or None without a speaker timeline
+    """
+    loaded = read_speaker_events(recording)
+    if loaded is None:
+        return None
+    started_at, events = loaded
+
+    names = {}
+    if os.path.exists(speaker_names_path(recording)):
+        with open(speaker_names_path(recording)) as f:
+            names = json.load(f)
+
+    merge_ns = int(merge_gap * 1e9)
+    turns = []
+    for user_id in np.unique(events["user_id"]):
+        user_events = events[(events["user_id"] == user_id) & np.isin(events["event"], (SPEAKING, SILENT))]
+        opened = None
+        user_turns = []
+        for capture_ns, event in zip(user_events["capture_ns"].tolist(), user_events["event"].tolist()):
+            if event == SPEAKING and opened is None:
+                if user_turns and capture_ns - user_turns[-1][1] <= merge_ns:
+                    opened = user_turns.pop()[0]
+                else:
+                    opened = capture_ns
+            elif event == SILENT and opened is not None:
+                user_turns.append((opened, capture_ns))
+                opened = None
+        if opened is not None:
+            user_turns.append((opened, None))
+        turns.extend((int(user_id), turn_start, turn_end) for turn_start, turn_end in user_turns)
+    turns.sort(key=lambda turn: turn[1])
+
+    start_ns = int(start * 1e9) if start is not None else None
+    end_ns = int(end * 1e9) if end is not None else None
+    selected = []
+    talk_time = {}
+    for user_id, turn_start, turn_end in turns:
+        if end_ns is not None and turn_start > end_ns:
+            continue
+        if start_ns is not None and turn_end is not None and turn_end < start_ns:
+            continue
+        selected.append({
+            "user_id": user_id,
+            "name": names.get(str(user_id)),
+            "start": turn_start / 1e9,
+            "end": turn_end / 1e9 if turn_end is not None else None
+        })
+        if turn_end is not None:
+            talk_time[str(user_id)] = talk_time.get(str(user_id), 0.0) + (turn_end - turn_start) / 1e9
+
+    return {
+        "started_at": started_at,
+        "speakers": names,
+        "turns": selected,
+        "talk_time": {user_id: round(seconds, 3) for user_id, seconds in talk_time.items()}
+    }
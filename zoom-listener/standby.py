@@ -0,0 +1,118 @@
+"""
+Standby bots: bot processes started before their meeting is known.
+
+A standby bot (cli.py --standby) imports its modules, initializes the SDK and
+authenticates right away, then waits for one JSON line on stdin naming its
+meeting. Handing a start request to a standby bot skips all of that, which
+matters most when many meetings start at the same time. The pool keeps
+BOT_STANDBY_POOL bots waiting, starting at most one replacement per check so
+refills do not compete with the bots that were just assigned, and replaces
+bots older than BOT_STANDBY_MAX_AGE seconds.
+"""
+
+import json
+import os
+import threading
+import time
+
+STANDBY_POOL_SIZE = int(os.environ.get("BOT_STANDBY_POOL", 0))
+STANDBY_MAX_AGE = float(os.environ.get("BOT_STANDBY_MAX_AGE", 3600))
+CHECK_INTERVAL = 2
+
+
+class StandbyPool:
+    """Keeps `size` standby bots; take() hands one out for a meeting"""
+
+    def __init__(self, spawn, size=STANDBY_POOL_SIZE, max_age=STANDBY_MAX_AGE):
+        """
+        Args:
+            spawn: Starts a standby bot, returning (Popen with stdin=PIPE, its log path)
+            size: Number of bots to keep waiting
+            max_age: Seconds after which a waiting bot is replaced
+        """
+        self.spawn = spawn
+        self.size = size
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        # (process, log path, started at), oldest first
+        self.waiting = []
+        self.stopped = threading.Event()
+        self.spawned = 0
+        self.assigned = 0
+
+    def start(self):
+        if self.size > 0:
+            threading.Thread(target=self._maintain, name="standby-pool", daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+        with self.lock:
+            waiting, self.waiting = self.waiting, []
+        for process, _, _ in waiting:
+            process.terminate()
+
+    def take(self, meeting_id, meeting_password, sample_rate, channels):
+        """
+        Assign a meeting to the oldest live standby bot.
+
+        Returns:
+            (process, log path) of the assigned bot, or None if none is waiting
+        """
+        assignment = json.dumps({
+            "meeting_id": meeting_id, "meeting_password": meeting_password,
+            "sample_rate": sample_rate, "channels": channels
+        }).encode() + b"\n"
+
+        while True:
+            with self.lock:
+                if not self.waiting:
+                    return None
+                process, log_path, _ = self.waiting.pop(0)
+            if process.poll() is not None:
+                continue
+            try:
+                process.stdin.write(assignment)
+                process.stdin.close()
+            except OSError:
+                # Exited after the poll
+                continue
+            self.assigned += 1
+            return process, log_path
+
+    def status(self):
+        with self.lock:
+            return {"size": self.size, "waiting": len(self.waiting), "spawned": self.spawned, "assigned": self.assigned}
+
+    def _maintain(self):
+        while not self.stopped.wait(CHECK_INTERVAL):
+            now = time.monotonic()
+            expired = []
+            with self.lock:
+                alive = []
+                for entry in self.waiting:
+                    process, _, started_at = entry
+                    if process.poll() is not None:
+                        continue
+                    if now - started_at > self.max_age:
+                        expired.append(process)
+                    else:
+                        alive.append(entry)
+                self.waiting = alive
+                missing = self.size - len(alive)
+
+            for process in expired:
+                # Closing stdin makes a standby bot exit by itself
+                process.stdin.close()
+
+            if missing > 0:
+                try:
+                    process, log_path = self.spawn()
+                except Exception as e:
+                    print(f"Error starting a standby bot: {e}")
+                    continue
+                with self.lock:
+                    self.spawned += 1
+                    if not self.stopped.is_set():
+                        self.waiting.append((process, log_path, time.monotonic()))
+                        continue
+                process.terminate()
@@ -0,0 +1,239 @@
+"""
+Recording storage backends.
+
+RECORDING_STORAGE selects where recordings end up:
+
+- local (default): recordings stay on the bot host's disk
+- s3: recordings are streamed to an S3-compatible bucket (AWS, MinIO, ...)
+  with a multipart upload while the meeting is still running, so the final
+  object exists seconds after the meeting ends
+
+The S3 backend needs boto3, which is imported only when it is selected.
+"""
+
+import os
+import shutil
+import threading
+import queue
+
+# Parts uploaded while recording. S3 requires every part except the last to
+# be at least 5 MB; 8 MB is about two minutes of 32 kHz mono audio.
+PART_SIZE = 8 * 1024 * 1024
+
+# Size of the canonical PCM WAV header written by the wave module
+WAV_HEADER_SIZE = 44
+
+PRESIGNED_URL_EXPIRY = 3600
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Bots write recordings here (relative to zoom-listener/ by default)
+RECORDINGS_DIR = os.environ.get(
+    "RECORDINGS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_program", "out", "audio")
+)
+
+
+def recording_key(meeting_id, suffix=".wav"):
+    return f"meeting_recording_{meeting_id}{suffix}"
+
+
+class LocalStorage:
+    """Recordings stay on local disk; nothing is uploaded while recording"""
+
+    name = "local"
+    streaming = False
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        return os.path.join(self.root, key)
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def put_file(self, key, path):
+        target = self.path(key)
+        if os.path.abspath(path) != os.path.abspath(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(path, target)
+        return target
+
+    def presigned_url(self, key):
+        return None
+
+
+class S3Storage:
+    """S3-compatible object storage; S3_ENDPOINT_URL points it at MinIO or another stand-in"""
+
+    name = "s3"
+    streaming = True
+
+    def __init__(self, bucket, prefix="", endpoint_url=None):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("RECORDING_STORAGE=s3 requires boto3 (pip install boto3)")
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def object_key(self, key):
+        return self.prefix + key
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+            return True
+        except ClientError:
+            return False
+
+    def put_file(self, key, path):
+        self.client.upload_file(path, self.bucket, self.object_key(key))
+        return f"s3://{self.bucket}/{self.object_key(key)}"
+
+    def presigned_url(self, key):
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self.object_key(key)},
+            ExpiresIn=PRESIGNED_URL_EXPIRY
+        )
+
+    def iter_object(self, key):
+        """Stream an object's bytes, for deployments where clients cannot reach the bucket"""
+        body = self.client.get_object(Bucket=self.bucket, Key=self.object_key(key))["Body"]
+        try:
+            yield from body.iter_chunks(STREAM_CHUNK_SIZE)
+        finally:
+            body.close()
+
+    def open_upload(self, key):
+        return MultipartUpload(self, key)
+
+
+class MultipartUpload:
+    """
+    Streams a WAV recording into a multipart upload while it is being written.
+
+    Audio appended to the file is buffered and shipped as parts 2..n by a
+    background thread as soon as PART_SIZE bytes are available. Part 1 covers
+    the start of the file including the WAV header, whose sizes are only final
+    once the file is closed, so it is read back from disk and uploaded last.
+    Recordings shorter than one part are uploaded as a single object.
+    """
+
+    def __init__(self, storage, key, part_size=PART_SIZE):
+        self.storage = storage
+        self.key = key
+        self.part_size = part_size
+        self.upload_id = None
+        self.parts = {}
+        self.error = None
+
+        # File offset up to which data belongs to part 1
+        self.first_part_end = WAV_HEADER_SIZE + part_size
+        self.offset = WAV_HEADER_SIZE
+        self.buffer = bytearray()
+        self.next_part_number = 2
+
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._upload_loop, daemon=True)
+        self.thread.start()
+
+    def feed(self, data):
+        """Account for audio bytes just appended to the file; called from the writer"""
+        start = self.offset
+        self.offset += len(data)
+        if self.offset <= self.first_part_end:
+            return
+
+        # Only bytes past the first part are buffered for streaming
+        self.buffer += data[max(0, self.first_part_end - start):]
+        while len(self.buffer) >= self.part_size:
+            self.queue.put((self.next_part_number, bytes(self.buffer[:self.part_size])))
+            del self.buffer[:self.part_size]
+            self.next_part_number += 1
+
+    def complete(self, path):
+        """Upload the remaining data and the header part once the file is closed"""
+        if self.offset <= self.first_part_end:
+            # Short recording: a single object is simpler than a multipart upload
+            self.queue.put(None)
+            self.thread.join()
+            self._abort()
+            return self.storage.put_file(self.key, path)
+
+        if self.buffer:
+            self.queue.put((self.next_part_number, bytes(self.buffer)))
+            self.buffer.clear()
+        with open(path, "rb") as f:
+            self.queue.put((1, f.read(self.first_part_end)))
+        self.queue.put(None)
+        self.thread.join()
+
+        if self.error is not None:
+            self._abort()
+            raise RuntimeError(f"Multipart upload of {self.key} failed: {self.error}")
+
+        self.storage.client.complete_multipart_upload(
+            Bucket=self.storage.bucket,
+            Key=self.storage.object_key(self.key),
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": [{"PartNumber": n, "ETag": self.parts[n]} for n in sorted(self.parts)]}
+        )
+        return f"s3://{self.storage.bucket}/{self.storage.object_key(self.key)}"
+
+    def _upload_loop(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if self.error is not None:
+                continue
+
+            part_number, data = item
+            try:
+                if self.upload_id is None:
+                    self.upload_id = self.storage.client.create_multipart_upload(
+                        Bucket=self.storage.bucket,
+                        Key=self.storage.object_key(self.key),
+                        ContentType="audio/wav"
+                    )["UploadId"]
+                response = self.storage.client.upload_part(
+                    Bucket=self.storage.bucket,
+                    Key=self.storage.object_key(self.key),
+                    UploadId=self.upload_id,
+                    PartNumber=part_number,
+                    Body=data
+                )
+                self.parts[part_number] = response["ETag"]
+            except Exception as e:
+                print(f"Error uploading part {part_number} of {self.key}: {e}")
+                self.error = e
+
+    def _abort(self):
+        if self.upload_id is None:
+            return
+        try:
+            self.storage.client.abort_multipart_upload(
+                Bucket=self.storage.bucket,
+                Key=self.storage.object_key(self.key),
+                UploadId=self.upload_id
+            )
+        except Exception as e:
+            print(f"Error aborting multipart upload of {self.key}: {e}")
+
+
+def storage_from_env(local_root=RECORDINGS_DIR):
+    """Create the backend selected by RECORDING_STORAGE"""
+    backend = os.environ.get("RECORDING_STORAGE", "local")
+    if backend == "s3":
+        bucket = os.environ.get("S3_BUCKET")
+        if not bucket:
+            raise RuntimeError("RECORDING_STORAGE=s3 requires S3_BUCKET")
+        return S3Storage(bucket, os.environ.get("S3_PREFIX", ""), os.environ.get("S3_ENDPOINT_URL"))
+    if backend == "local":
+        return LocalStorage(local_root)
+    raise RuntimeError(f"Unknown RECORDING_STORAGE backend: {backend}")
@@ -0,0 +1,120 @@
+"""
+Unit tests of the shared memory audio bus: wrap-around and lap detection.
+
+Rings are 200 bytes (100 Hz mono for one second), so a few writes wrap them.
+
+Run with: python -m pytest test_audio_bus.py
+"""
+
+import itertools
+import os
+
+import pytest
+
+from audio_bus import AudioBusReader, AudioBusWriter
+
+CAPACITY = 200
+meeting_ids = itertools.count()
+
+
+def pcm(start, size):
+    """Bytes that differ at every offset, so misplaced copies show up"""
+    return bytes((start + i) % 251 for i in range(size))
+
+
+@pytest.fixture
+def bus():
+    meeting_id = f"test_{os.getpid()}_{next(meeting_ids)}"
+    writer = AudioBusWriter(meeting_id, sample_rate=100, channels=1, seconds=1)
+    readers = []
+
+    def attach(**options):
+        reader = AudioBusReader(meeting_id, **options)
+        readers.append(reader)
+        return reader
+
+    yield writer, attach
+    for reader in readers:
+        reader.close()
+    # Unless the test closed it already
+    if writer.shm.buf is not None:
+        writer.close()
+
+
+def test_reader_sees_the_stream_format(bus):
+    writer, attach = bus
+    reader = attach()
+    assert (reader.sample_rate, reader.channels, reader.sample_width, reader.capacity) == (100, 1, 2, CAPACITY)
+
+
+def test_reads_across_the_end_of_the_ring(bus):
+    writer, attach = bus
+    reader = attach()
+    writer.write(pcm(0, 150))
+    assert reader.read() == (pcm(0, 150), 0)
+
+    # Starts at offset 150 and wraps to the front of the ring
+    writer.write(pcm(150, 120))
+    assert reader.read() == (pcm(150, 120), 0)
+    assert reader.read() == (b"", 0)
+
+
+def test_max_bytes_leaves_the_rest_for_the_next_read(bus):
+    writer, attach = bus
+    reader = attach()
+    writer.write(pcm(0, 150))
+    assert reader.read(max_bytes=100) == (pcm(0, 100), 0)
+    writer.write(pcm(150, 100))
+    assert reader.read() == (pcm(100, 150), 0)
+
+
+def test_lapped_reader_gets_the_newest_audio_and_the_dropped_count(bus):
+    writer, attach = bus
+    reader = attach()
+    for start in range(0, 500, 50):
+        writer.write(pcm(start, 50))
+    assert reader.read() == (pcm(300, CAPACITY), 300)
+    assert reader.read() == (b"", 0)
+
+
+def test_audio_overwritten_while_copying_is_discarded(bus, monkeypatch):
+    writer, attach = bus
+    reader = attach()
+    writer.write(pcm(0, 150))
+    # The writer appends 80 bytes between the reader's first index check and its copy check
+    indexes = iter([150, 230])
+    monkeypatch.setattr(reader, "write_index", lambda: next(indexes))
+    chunk, dropped = reader.read()
+    assert (chunk, dropped) == (pcm(30, 120), 30)
+
+
+def test_write_larger_than_the_ring_keeps_its_end(bus):
+    writer, attach = bus
+    reader = attach()
+    writer.write(pcm(0, 450))
+    assert writer.write_index == 450
+    assert reader.read() == (pcm(250, CAPACITY), 250)
+
+
+def test_reader_starts_at_new_audio_unless_asked_for_the_ring(bus):
+    writer, attach = bus
+    writer.write(pcm(0, 300))
+    late = attach()
+    from_start = attach(from_start=True)
+    assert from_start.read() == (pcm(100, CAPACITY), 0)
+    writer.write(pcm(300, 10))
+    assert late.read() == (pcm(300, 10), 0)
+
+
+def test_close_is_visible_to_attached_readers(bus):
+    writer, attach = bus
+    reader = attach()
+    writer.write(pcm(0, 10))
+    writer.close()
+    assert reader.is_closed()
+    assert reader.read() == (pcm(0, 10), 0)
+
+
+def test_attaching_without_a_writer_fails():
+    with pytest.raises(FileNotFoundError):
+        AudioBusReader(f"test_{os.getpid()}_missing")
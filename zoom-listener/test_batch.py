@@ -0,0 +1,120 @@
+"""
+Unit tests of batch jobs and the token bucket that paces bot starts.
+
+The bucket runs on a fake clock whose sleep() advances it, so every
+acquisition time is exact.
+
+Run with: python -m pytest test_batch.py
+"""
+
+import threading
+
+import pytest
+
+import batch
+from batch import BatchRunner, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def time(self):
+        return 1e9 + self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(batch, "time", clock)
+    return clock
+
+
+def acquire_times(bucket, clock, count):
+    times = []
+    for _ in range(count):
+        bucket.acquire()
+        times.append(round(clock.now, 6))
+    return times
+
+
+def test_burst_then_paced_at_rate(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    assert acquire_times(bucket, clock, 7) == [0, 0, 0, 0.5, 1.0, 1.5, 2.0]
+
+
+def test_idle_time_refills_at_most_the_burst(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    acquire_times(bucket, clock, 3)
+    clock.now += 60
+    assert acquire_times(bucket, clock, 4) == [60, 60, 60, 60.5]
+
+
+def test_fractional_rate(clock):
+    bucket = TokenBucket(rate=0.25, burst=1)
+    assert acquire_times(bucket, clock, 3) == [0, 4, 8]
+
+
+@pytest.mark.parametrize("rate, burst", [(0, 5), (-1, 5), (5, 0), (5, 0.5)])
+def test_invalid_settings_are_rejected(rate, burst):
+    with pytest.raises(ValueError):
+        TokenBucket(rate, burst)
+
+
+def run_jobs(runner, count, submit):
+    """Submit count jobs and wait until all of them reached a final state"""
+    done = threading.Event()
+    finished = []
+
+    def on_update(job):
+        if job["state"] not in ("pending", "running"):
+            finished.append(job)
+            if len(finished) == count:
+                done.set()
+
+    runner.on_update = on_update
+    jobs = submit()
+    assert done.wait(5)
+    return {job["meeting_id"]: runner.get(job["job_id"]) for job in jobs}
+
+
+def test_start_jobs_report_the_start_result():
+    calls = []
+
+    def start_one(meeting_id, meeting_password, priority, options):
+        calls.append((meeting_id, meeting_password, priority, options))
+        if meeting_id == "3":
+            raise RuntimeError("spawn failed")
+        return ("queued", "position 1") if meeting_id == "2" else ("started", None)
+
+    runner = BatchRunner(start_one, None, spawn_rate=1000, spawn_burst=10, workers=2)
+    jobs = run_jobs(runner, 3, lambda: runner.submit_starts([
+        {"meeting_id": "1", "meeting_password": "a", "sample_rate": 16000},
+        {"meeting_id": "2", "meeting_password": "b", "priority": 5},
+        {"meeting_id": "3", "meeting_password": "c"},
+    ]))
+
+    assert sorted(calls) == [("1", "a", 0, {"sample_rate": 16000}), ("2", "b", 5, {}), ("3", "c", 0, {})]
+    assert (jobs["1"]["state"], jobs["1"]["detail"]) == ("started", None)
+    assert (jobs["2"]["state"], jobs["2"]["detail"]) == ("queued", "position 1")
+    assert (jobs["3"]["state"], jobs["3"]["detail"]) == ("failed", "spawn failed")
+
+
+def test_stop_jobs_are_not_paced():
+    runner = BatchRunner(None, lambda meeting_id: ("stopped", None), spawn_rate=0.001, spawn_burst=1)
+    jobs = run_jobs(runner, 3, lambda: runner.submit_stops(["1", "2", "3"]))
+    assert [job["state"] for job in jobs.values()] == ["stopped"] * 3
+
+
+def test_only_the_latest_jobs_are_kept(monkeypatch):
+    monkeypatch.setattr(batch, "MAX_TRACKED_JOBS", 2)
+    runner = BatchRunner(None, lambda meeting_id: ("stopped", None))
+    jobs = run_jobs(runner, 3, lambda: runner.submit_stops(["1", "2", "3"]))
+    assert jobs["1"] is None
+    assert jobs["3"]["state"] == "stopped"
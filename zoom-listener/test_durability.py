@@ -0,0 +1,128 @@
+"""
+Unit tests of crash-safe recordings: background header updates and repair.
+
+Run with: python -m pytest test_durability.py
+"""
+
+import shutil
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from durability import DurableWavFile, wav_header
+from repair_wav import inspect_wav, repair_wav
+
+RATE = 32000
+CHUNK = np.arange(320, dtype="<i2").tobytes()  # 10 ms of mono audio
+
+
+def frames(path):
+    with wave.open(str(path), "rb") as f:
+        return f.getnframes(), f.getframerate(), f.getnchannels(), f.readframes(f.getnframes())
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_header_covers_the_audio_while_recording(tmp_path):
+    path = tmp_path / "recording.wav"
+    wav = DurableWavFile(str(path), RATE, 1, mode="none", header_interval=0.05)
+    for _ in range(100):
+        wav.write(CHUNK)
+    wait_for(lambda: wav.header_updates > 0)
+
+    # What a crashed bot would leave behind plays as far as the last update
+    crashed = tmp_path / "crashed.wav"
+    shutil.copyfile(path, crashed)
+    assert inspect_wav(str(crashed))["problem"] is None
+    assert frames(crashed)[0] == 100 * 320
+    wav.close()
+
+
+def test_closed_file_is_a_complete_wav(tmp_path):
+    path = tmp_path / "recording.wav"
+    wav = DurableWavFile(str(path), RATE, 2, mode="periodic", fsync_interval=0.05)
+    for _ in range(10):
+        wav.write(CHUNK)
+    wav.close()
+
+    assert frames(path) == (10 * 160, RATE, 2, CHUNK * 10)
+    assert wav.stats()["unsynced_bytes"] == 0
+
+
+def test_segment_mode_syncs_every_segment(tmp_path):
+    wav = DurableWavFile(str(tmp_path / "recording.wav"), RATE, 1, mode="segment",
+                         segment_seconds=0.1, header_interval=0)
+    for _ in range(25):
+        wav.write(CHUNK)
+    # 250 ms of audio: at most the 50 ms after the second segment is not synced
+    wait_for(lambda: wav.stats()["unsynced_bytes"] < 0.1 * RATE * 2)
+    assert wav.syncs >= 1
+    wav.close()
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        DurableWavFile(str(tmp_path / "recording.wav"), RATE, 1, mode="always")
+
+
+def write_wav(path, data, rate=RATE, channels=1):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(data)
+
+
+def test_stale_header_is_rewritten(tmp_path):
+    path = tmp_path / "recording.wav"
+    path.write_bytes(wav_header(RATE, 1, 2, 0) + CHUNK * 3)
+
+    assert repair_wav(str(path))["problem"] == "stale_header"
+    assert frames(path)[0] == 3 * 320
+    assert inspect_wav(str(path))["problem"] is None
+
+
+def test_truncated_file_loses_only_the_partial_frame(tmp_path):
+    path = tmp_path / "recording.wav"
+    write_wav(path, CHUNK * 3, channels=2)
+    # Half a stereo frame written before the crash
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02")
+
+    info = repair_wav(str(path))
+    assert info["problem"] == "truncated"
+    assert frames(path) == (3 * 160, RATE, 2, CHUNK * 3)
+    assert inspect_wav(str(path))["problem"] is None
+
+
+def test_headerless_pcm_gets_a_header(tmp_path):
+    path = tmp_path / "audio.wav"
+    path.write_bytes(CHUNK * 4 + b"\x01")
+
+    assert repair_wav(str(path), sample_rate=48000, channels=1)["problem"] == "headerless"
+    assert frames(path) == (4 * 320, 48000, 1, CHUNK * 4)
+
+
+def test_zeroed_header_page_is_replaced(tmp_path):
+    # A host crash lost the page holding the header
+    path = tmp_path / "recording.wav"
+    path.write_bytes(bytes(44) + CHUNK * 2)
+
+    repair_wav(str(path), sample_rate=RATE)
+    assert frames(path) == (2 * 320, RATE, 1, CHUNK * 2)
+
+
+def test_intact_file_is_left_alone(tmp_path):
+    path = tmp_path / "recording.wav"
+    write_wav(path, CHUNK)
+    before = path.read_bytes()
+
+    assert repair_wav(str(path))["problem"] is None
+    assert path.read_bytes() == before
@@ -0,0 +1,119 @@
+"""
+Unit tests of the live audio hub: fan-out, slow subscribers and end of stream.
+
+A real AudioBusWriter feeds the hub, which polls every millisecond; every test
+runs its own event loop.
+
+Run with: python -m pytest test_live.py
+"""
+
+import asyncio
+import itertools
+import os
+
+import numpy as np
+import pytest
+
+from audio_bus import AudioBusWriter
+from live import END_OF_STREAM, LiveAudioHub
+
+RATE = 32000
+meeting_ids = itertools.count()
+
+
+def chunk(index, frames=320):
+    return np.full(frames, index, dtype="<i2").tobytes()
+
+
+@pytest.fixture
+def writer():
+    meeting_id = f"test_live_{os.getpid()}_{next(meeting_ids)}"
+    writer = AudioBusWriter(meeting_id, RATE)
+    writer.meeting_id = meeting_id
+    yield writer
+    if writer.shm.buf is not None:
+        writer.close()
+
+
+def drain(subscriber):
+    chunks = []
+    while not subscriber.queue.empty():
+        chunks.append(subscriber.queue.get_nowait())
+    return chunks
+
+
+async def publish(writer, count):
+    """Write chunks one poll apart, so the hub offers each of them separately"""
+    for index in range(count):
+        writer.write(chunk(index))
+        await asyncio.sleep(0.01)
+
+
+def test_slow_subscriber_is_dropped_without_holding_back_the_others(writer):
+    async def run():
+        hub = LiveAudioHub(poll_interval=0.001, max_queue=3)
+        fast = hub.subscribe(writer.meeting_id)
+        slow = hub.subscribe(writer.meeting_id)
+        received = []
+        for index in range(10):
+            writer.write(chunk(index))
+            await asyncio.sleep(0.01)
+            received += drain(fast)
+
+        assert b"".join(received) == b"".join(chunk(index) for index in range(10))
+        assert not fast.overflowed
+        assert slow.overflowed
+        # It keeps what it had queued; the connection handler closes it
+        assert len(drain(slow)) == 3
+        assert hub.listeners() == {writer.meeting_id: 1}
+        hub.unsubscribe(writer.meeting_id, slow)
+        hub.unsubscribe(writer.meeting_id, fast)
+        assert hub.listeners() == {}
+
+    asyncio.run(run())
+
+
+def test_subscribers_of_one_rate_share_a_converter(writer):
+    async def run():
+        hub = LiveAudioHub(poll_interval=0.001)
+        native = hub.subscribe(writer.meeting_id)
+        first = hub.subscribe(writer.meeting_id, rate=16000)
+        second = hub.subscribe(writer.meeting_id, rate=16000)
+        assert first.format == {"sample_rate": 16000, "channels": 1, "encoding": "pcm_s16le"}
+        await publish(writer, 5)
+
+        assert len(b"".join(drain(native))) == 5 * 640
+        first_pcm = b"".join(drain(first))
+        assert first_pcm == b"".join(drain(second))
+        assert len(first_pcm) == 5 * 320
+        hub.unsubscribe(writer.meeting_id, native)
+        hub.unsubscribe(writer.meeting_id, first)
+        hub.unsubscribe(writer.meeting_id, second)
+
+    asyncio.run(run())
+
+
+def test_unsupported_rate_is_rejected(writer):
+    async def run():
+        hub = LiveAudioHub()
+        with pytest.raises(ValueError):
+            hub.subscribe(writer.meeting_id, rate=11025)
+        assert hub.listeners() == {}
+
+    asyncio.run(run())
+
+
+def test_subscribers_get_end_of_stream_when_the_bot_stops(writer):
+    async def run():
+        hub = LiveAudioHub(poll_interval=0.001)
+        subscriber = hub.subscribe(writer.meeting_id)
+        await publish(writer, 2)
+        writer.close()
+        await asyncio.sleep(0.02)
+
+        chunks = drain(subscriber)
+        assert chunks[-1] == END_OF_STREAM
+        assert b"".join(chunks[:-1]) == chunk(0) + chunk(1)
+        assert hub.listeners() == {}
+
+    asyncio.run(run())
@@ -0,0 +1,66 @@
+"""
+Unit tests of the streaming resampler: chunk invariance and output length.
+
+Run with: python -m pytest test_resampler.py
+"""
+
+import numpy as np
+import pytest
+
+from resampler import StreamingResampler
+
+CONVERSIONS = [(32000, 16000, 1), (48000, 16000, 1), (32000, 48000, 1), (48000, 32000, 2), (32000, 8000, 2)]
+
+
+def noise(rate, channels, seconds=1.0, seed=0):
+    samples = np.random.default_rng(seed).integers(-20000, 20000, size=(int(rate * seconds), channels))
+    return samples.astype("<i2").tobytes()
+
+
+def chunked(pcm, frame_bytes, seed=1):
+    """Split PCM into chunks of random whole frames, some of them empty"""
+    rng = np.random.default_rng(seed)
+    position = 0
+    while position < len(pcm):
+        size = int(rng.integers(0, 700)) * frame_bytes
+        yield pcm[position:position + size]
+        position += size
+
+
+@pytest.mark.parametrize("input_rate, output_rate, channels", CONVERSIONS)
+def test_chunked_output_matches_one_shot(input_rate, output_rate, channels):
+    pcm = noise(input_rate, channels)
+    one_shot = StreamingResampler(input_rate, output_rate, channels).process(pcm)
+
+    resampler = StreamingResampler(input_rate, output_rate, channels)
+    streamed = b"".join(resampler.process(chunk) for chunk in chunked(pcm, 2 * channels))
+
+    assert streamed == one_shot
+
+
+@pytest.mark.parametrize("input_rate, output_rate, channels", CONVERSIONS)
+def test_output_length_follows_the_rate_ratio(input_rate, output_rate, channels):
+    resampler = StreamingResampler(input_rate, output_rate, channels)
+    frames = output_frames = 0
+    for chunk in chunked(noise(input_rate, channels, seconds=0.73), 2 * channels):
+        frames += len(chunk) // (2 * channels)
+        output_frames += len(resampler.process(chunk)) // (2 * channels)
+        # Every output sample whose position has been reached is emitted, none earlier
+        assert output_frames == -(-frames * output_rate // input_rate)
+
+
+def test_equal_rates_pass_audio_through():
+    pcm = noise(32000, 1, seconds=0.1)
+    resampler = StreamingResampler(32000, 32000)
+    assert resampler.is_identity
+    assert resampler.process(pcm) == pcm
+
+
+def test_tone_in_the_passband_keeps_its_level():
+    rate = 32000
+    t = np.arange(rate) / rate
+    tone = (10000 * np.sin(2 * np.pi * 1000 * t)).astype("<i2").tobytes()
+    output = np.frombuffer(StreamingResampler(rate, 16000).process(tone), dtype="<i2").astype(np.float64)
+    # Leave out the filter's start-up
+    steady = output[1000:]
+    assert np.sqrt(np.mean(steady ** 2)) == pytest.approx(10000 / np.sqrt(2), rel=0.01)
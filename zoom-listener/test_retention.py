@@ -0,0 +1,188 @@
+"""
+Unit tests of the retention pass: age policy, guards and disk budget.
+
+Recordings are written to a temporary root with fake modification times, and
+the free disk space is stubbed, so no pass depends on the real disk.
+
+Run with: python -m pytest test_retention.py
+"""
+
+import os
+import time
+
+import pytest
+
+import retention
+from retention import MB, RetentionManager
+from storage import LocalStorage
+
+DAY = 86400
+NOW = time.time()
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(retention, "FRAMES_DIR", str(tmp_path / "video_frames"))
+    monkeypatch.setattr(retention, "MIRROR_PATH", str(tmp_path / "audio.wav"))
+    monkeypatch.setattr(retention, "free_disk_mb", lambda path: 100000)
+
+
+def recording(root, meeting_id, age_seconds, size=1000, suffixes=(".wav", ".align.bin")):
+    """Write a recording's files, last modified age_seconds ago"""
+    paths = []
+    for suffix in suffixes:
+        path = root / f"meeting_recording_{meeting_id}{suffix}"
+        path.write_bytes(b"\0" * (size // len(suffixes)))
+        os.utime(path, (NOW - age_seconds, NOW - age_seconds))
+        paths.append(path)
+    return paths
+
+
+def manager(root, **options):
+    options.setdefault("max_age_days", 0)
+    options.setdefault("budget_mb", 0)
+    options.setdefault("min_free_mb", 0)
+    return RetentionManager(root=str(root), batch_pause=0, **options)
+
+
+def test_old_recordings_are_deleted(tmp_path):
+    old = recording(tmp_path, "1", 40 * DAY)
+    new = recording(tmp_path, "2", 10 * DAY)
+
+    summary = manager(tmp_path, max_age_days=30).run_once()
+
+    assert summary["deleted"] == 1
+    assert summary["bytes_freed"] == 1000
+    assert not any(path.exists() for path in old)
+    assert all(path.exists() for path in new)
+
+
+def test_recordings_in_use_are_kept(tmp_path):
+    paths = recording(tmp_path, "1", 40 * DAY)
+
+    summary = manager(tmp_path, max_age_days=30, budget_mb=0.0001, in_use=lambda meeting_id: meeting_id == "1").run_once()
+
+    assert summary["deleted"] == 0
+    assert all(path.exists() for path in paths)
+
+
+def test_recently_modified_files_are_kept(tmp_path):
+    # Over budget, but written to a minute ago
+    paths = recording(tmp_path, "1", 60)
+
+    summary = manager(tmp_path, budget_mb=0.0001).run_once()
+
+    assert summary["deleted"] == 0
+    assert all(path.exists() for path in paths)
+
+
+class FakeRemoteStorage:
+    name = "s3"
+    streaming = True
+
+    def __init__(self):
+        self.objects = {}
+
+    def exists(self, key):
+        return key in self.objects
+
+    def put_file(self, key, path):
+        with open(path, "rb") as f:
+            self.objects[key] = f.read()
+
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch):
+    calls = []
+
+    def run_ffmpeg(args):
+        calls.append(args)
+        with open(args[-1], "wb") as f:
+            f.write(b"\0" * 100)
+
+    monkeypatch.setattr(retention, "run_ffmpeg", run_ffmpeg)
+    return calls
+
+
+def test_compress_skips_recordings_without_wav(tmp_path, fake_ffmpeg):
+    recording(tmp_path, "1", 40 * DAY, suffixes=(".flac", ".align.bin"))
+    wav = recording(tmp_path, "2", 40 * DAY, suffixes=(".wav",))[0]
+
+    summary = manager(tmp_path, max_age_days=30, action="compress").run_once()
+
+    assert [args[1] for args in fake_ffmpeg] == [str(wav)]
+    assert summary["compressed"] == 1
+    assert summary["bytes_freed"] == 900
+    flac = tmp_path / "meeting_recording_2.flac"
+    assert not wav.exists()
+    # The compressed file keeps the recording's age
+    assert flac.stat().st_mtime == pytest.approx(NOW - 40 * DAY)
+
+
+def test_compress_leaves_post_processing_artifacts(tmp_path, fake_ffmpeg):
+    wav, normalized = recording(tmp_path, "1", 40 * DAY, suffixes=(".wav", ".normalized.wav"))
+
+    manager(tmp_path, max_age_days=30, action="compress").run_once()
+
+    assert [args[1] for args in fake_ffmpeg] == [str(wav)]
+    # The post-processing manifest still points at it
+    assert normalized.exists()
+    assert not (tmp_path / "meeting_recording_1.normalized.flac").exists()
+
+
+def test_offload_copies_to_the_recording_storage(tmp_path):
+    storage = FakeRemoteStorage()
+    paths = recording(tmp_path, "1", 40 * DAY)
+
+    summary = manager(tmp_path, max_age_days=30, action="offload", storage=storage).run_once()
+
+    assert summary["offloaded"] == 1
+    assert sorted(storage.objects) == ["meeting_recording_1.align.bin", "meeting_recording_1.wav"]
+    assert not any(path.exists() for path in paths)
+
+
+def test_offload_needs_storage_that_record_serves_from(tmp_path):
+    # /record only falls back to remote storage; offloading to a local one would lose the recording
+    with pytest.raises(ValueError):
+        manager(tmp_path, action="offload", storage=LocalStorage(str(tmp_path / "offload")))
+    with pytest.raises(ValueError):
+        manager(tmp_path, action="offload")
+
+
+def test_eviction_stops_once_the_budget_is_met(tmp_path):
+    for i, age in enumerate((5, 4, 3, 2, 1)):
+        recording(tmp_path, str(i), age * DAY, size=100 * 1024)
+
+    summary = manager(tmp_path, budget_mb=0.25).run_once()
+
+    # 500 KB on disk and a 256 KB budget: the three oldest go, the remaining 200 KB fit
+    remaining = sorted(path.name for path in tmp_path.iterdir())
+    assert summary["deleted"] == 3
+    assert summary["usage_mb"] == pytest.approx(200 * 1024 / MB, abs=0.1)
+    assert remaining == ["meeting_recording_3.align.bin", "meeting_recording_3.wav",
+                         "meeting_recording_4.align.bin", "meeting_recording_4.wav"]
+
+
+def test_eviction_stops_once_enough_disk_is_free(tmp_path, monkeypatch):
+    for i, age in enumerate((3, 2, 1)):
+        recording(tmp_path, str(i), age * DAY, size=MB)
+    # Every removed recording frees 1 MB on a disk with 98 MB free
+    monkeypatch.setattr(retention, "free_disk_mb", lambda path: 101 - len(list(tmp_path.iterdir())) / 2)
+
+    summary = manager(tmp_path, min_free_mb=99.5).run_once()
+
+    assert summary["deleted"] == 2
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["meeting_recording_2.align.bin", "meeting_recording_2.wav"]
+
+
+def test_failed_removal_is_not_counted(tmp_path, monkeypatch):
+    recording(tmp_path, "1", 40 * DAY)
+
+    def failing_remove(path):
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr(retention.os, "remove", failing_remove)
+    summary = manager(tmp_path, max_age_days=30).run_once()
+
+    assert summary["deleted"] == 0
+    assert summary["errors"] == 1
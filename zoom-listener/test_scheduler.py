@@ -0,0 +1,179 @@
+"""
+Unit tests of bot admission control.
+
+Memory, load and disk readings are stubbed, so every test decides exactly
+what the host looks like.
+
+Run with: python -m pytest test_scheduler.py
+"""
+
+import threading
+
+import pytest
+
+import scheduler
+from scheduler import BotScheduler, SchedulerFull
+
+
+class Host:
+    """Stubbed host readings"""
+
+    def __init__(self, monkeypatch):
+        self.memory_mb = 100000
+        self.load = 0.0
+        self.disk_mb = 100000
+        monkeypatch.setattr(scheduler, "available_memory_mb", lambda: self.memory_mb)
+        monkeypatch.setattr(scheduler, "free_disk_mb", lambda path: self.disk_mb)
+        monkeypatch.setattr(scheduler.os, "getloadavg", lambda: (self.load, 0.0, 0.0))
+
+
+@pytest.fixture
+def host(monkeypatch):
+    return Host(monkeypatch)
+
+
+class Launcher:
+    def __init__(self, result=True):
+        self.result = result
+        self.launched = []
+        self.event = threading.Event()
+
+    def __call__(self, meeting_id, meeting_password, cpus, **options):
+        self.launched.append((meeting_id, cpus, options))
+        self.event.set()
+        return self.result
+
+
+def make_scheduler(launch, **options):
+    options.setdefault("max_concurrent", 2)
+    options.setdefault("max_pending", 10)
+    options.setdefault("bot_memory_mb", 500)
+    options.setdefault("warmup_seconds", 30)
+    options.setdefault("max_load_per_cpu", 1.5)
+    options.setdefault("cpu_pinning", False)
+    options.setdefault("min_free_disk_mb", 1000)
+    options.setdefault("bot_disk_mb", 100)
+    return BotScheduler(launch, **options)
+
+
+def test_admits_up_to_the_limit_then_queues(host):
+    launch = Launcher()
+    bots = make_scheduler(launch)
+
+    assert bots.submit("1", "pw")["state"] == "admitted"
+    assert bots.submit("2", "pw", options={"sample_rate": 16000})["state"] == "admitted"
+    assert bots.submit("3", "pw") == {"state": "queued", "position": 1}
+    # Submitting again does not queue twice
+    assert bots.submit("3", "pw") == {"state": "queued", "position": 1}
+    assert [meeting_id for meeting_id, _, _ in launch.launched] == ["1", "2"]
+    assert launch.launched[1][2] == {"sample_rate": 16000}
+    assert bots.capacity()["block_reason"] == "max_concurrent"
+
+
+def test_higher_priority_is_queued_first(host):
+    bots = make_scheduler(Launcher(), max_concurrent=1)
+    bots.submit("running", "pw")
+    bots.submit("low", "pw", priority=0)
+    bots.submit("high", "pw", priority=5)
+    bots.submit("later", "pw", priority=0)
+
+    assert [bots.position(meeting_id) for meeting_id in ("high", "low", "later")] == [1, 2, 3]
+
+
+def test_full_queue_rejects(host):
+    bots = make_scheduler(Launcher(), max_concurrent=1, max_pending=1)
+    bots.submit("1", "pw")
+    bots.submit("2", "pw")
+    with pytest.raises(SchedulerFull):
+        bots.submit("3", "pw")
+
+
+def test_release_launches_the_queued_bot(host):
+    launch = Launcher()
+    bots = make_scheduler(launch, max_concurrent=1)
+    bots.start()
+    bots.submit("1", "pw")
+    bots.submit("2", "pw", options={"channels": 2})
+    launch.event.clear()
+
+    bots.release("1")
+    assert launch.event.wait(5)
+    assert launch.launched[-1] == ("2", None, {"channels": 2})
+    assert bots.position("2") is None
+    assert bots.capacity()["running"] == 1
+
+
+def test_cancel_removes_a_queued_start(host):
+    bots = make_scheduler(Launcher(), max_concurrent=1)
+    bots.submit("1", "pw")
+    bots.submit("2", "pw")
+    assert bots.cancel("2")
+    assert not bots.cancel("2")
+    assert bots.capacity()["pending"] == 0
+
+
+def test_failed_launch_frees_its_slot(host):
+    bots = make_scheduler(Launcher(result=False), max_concurrent=1)
+    assert bots.submit("1", "pw") == {"state": "failed"}
+    assert bots.capacity()["running"] == 0
+
+
+def test_memory_of_warming_up_bots_is_reserved(host):
+    bots = make_scheduler(Launcher(), max_concurrent=10)
+    host.memory_mb = 1200
+    assert bots.submit("1", "pw")["state"] == "admitted"
+    # 1200 MB free, but the first bot will still take 500 of it
+    assert bots.submit("2", "pw")["state"] == "admitted"
+    assert bots.submit("3", "pw")["state"] == "queued"
+    assert bots.capacity()["block_reason"] == "memory"
+
+    # Once warmed up, their memory shows in the reading itself
+    bots.warmup_seconds = 0
+    assert bots.capacity()["block_reason"] is None
+
+
+def test_high_load_blocks(host):
+    bots = make_scheduler(Launcher())
+    host.load = 1.6 * len(bots.cpus)
+    assert bots.capacity()["block_reason"] == "cpu"
+
+
+def test_running_bots_reserve_disk_for_their_recordings(host):
+    bots = make_scheduler(Launcher(), max_concurrent=10)
+    host.disk_mb = 1250
+    assert bots.submit("1", "pw")["state"] == "admitted"
+    assert bots.submit("2", "pw")["state"] == "admitted"
+    # 1250 MB free - 3 bots * 100 MB is below the 1000 MB minimum
+    assert bots.submit("3", "pw")["state"] == "queued"
+    assert bots.capacity()["block_reason"] == "disk"
+
+
+def test_reserved_bots_count_against_every_limit(host):
+    bots = make_scheduler(Launcher(), max_concurrent=3, reserved_bots=2)
+    assert bots.capacity()["reserved"] == 2
+    assert bots.submit("1", "pw")["state"] == "admitted"
+    assert bots.capacity()["block_reason"] == "max_concurrent"
+
+    bots = make_scheduler(Launcher(), max_concurrent=10, reserved_bots=2)
+    host.memory_mb = 1400
+    assert bots.capacity()["block_reason"] == "memory"
+    host.memory_mb = 100000
+    host.disk_mb = 1250
+    assert bots.capacity()["block_reason"] == "disk"
+
+    with pytest.raises(ValueError):
+        make_scheduler(Launcher(), max_concurrent=2, reserved_bots=2)
+
+
+def test_pinned_bots_get_the_least_used_cpus(host):
+    launch = Launcher()
+    bots = make_scheduler(launch, max_concurrent=4, cpu_pinning=True, cpus_per_bot=2)
+    bots.cpus = [0, 1, 2, 3]
+    bots.submit("1", "pw")
+    bots.submit("2", "pw")
+    bots.submit("3", "pw")
+    assert [cpus for _, cpus, _ in launch.launched] == [{0, 1}, {2, 3}, {0, 1}]
+
+    bots.release("1")
+    bots.submit("4", "pw")
+    assert launch.launched[-1][1] == {0, 1}
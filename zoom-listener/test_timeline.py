@@ -0,0 +1,156 @@
+"""
+Unit tests of the capture timeline: gap fill, skip and ahead arithmetic, and seek.
+
+Frames are 10 ms at 32 kHz mono and arrive at synthetic capture times, so
+every expected position can be computed by hand.
+
+Run with: python -m pytest test_timeline.py
+"""
+
+import pytest
+
+from timeline import AHEAD, FILL, SKIP, CaptureTimeline, read_alignment, seek, timeline_summary
+
+RATE = 32000
+FRAME = 320  # sample frames per 10 ms callback
+MS = 1_000_000
+
+
+def make_timeline(tmp_path, **options):
+    recording = str(tmp_path / "meeting_recording_1.wav")
+    timeline = CaptureTimeline(recording, RATE, **options)
+    # Capture times in these tests count from 0
+    timeline.origin_ns = 0
+    return recording, timeline
+
+
+def feed(timeline, arrivals_ms):
+    """Feed one frame per arrival time; returns the silence inserted before each"""
+    return [timeline.audio(FRAME, at * MS) for at in arrivals_ms]
+
+
+def kinds(recording):
+    return [kind for kind in read_alignment(recording)[1]["kind"].tolist()]
+
+
+def test_steady_audio_has_no_gaps(tmp_path):
+    recording, timeline = make_timeline(tmp_path)
+    inserted = feed(timeline, range(10, 1010, 10))
+    timeline.close()
+
+    assert inserted == [0] * 100
+    assert timeline.gaps == 0
+    assert timeline.position == 100 * FRAME
+    assert timeline_summary(recording)["gaps"] == []
+
+
+def test_jitter_within_tolerance_is_not_a_gap(tmp_path):
+    recording, timeline = make_timeline(tmp_path, tolerance=0.2)
+    # Callbacks bunch up and spread out by up to 150 ms around the audio clock
+    feed(timeline, [10, 20, 170, 175, 180, 185, 190, 195, 200, 205, 210, 215, 220, 225, 230, 235, 240])
+    timeline.close()
+    assert timeline.gaps == 0
+
+
+def test_dropped_frames_are_filled_with_silence(tmp_path):
+    recording, timeline = make_timeline(tmp_path, fill=True, tolerance=0.2)
+    # 10 frames, then 50 frames (500 ms) dropped, then 10 more
+    inserted = feed(timeline, list(range(10, 110, 10)) + list(range(610, 710, 10)))
+    timeline.close()
+
+    assert inserted[10] == 500 * RATE // 1000
+    assert sum(inserted) == 16000
+    assert timeline.gaps == 1
+    assert timeline.position == 20 * FRAME + 16000
+    assert FILL in kinds(recording)
+
+    gap = timeline_summary(recording)["gaps"][0]
+    assert gap["type"] == "filled"
+    assert gap["audio_frame"] == 10 * FRAME
+    assert gap["seconds"] == pytest.approx(0.5)
+
+
+def test_fill_is_capped_and_the_rest_skipped(tmp_path):
+    recording, timeline = make_timeline(tmp_path, fill=True, tolerance=0.2, max_fill_seconds=0.2)
+    inserted = feed(timeline, list(range(10, 110, 10)) + list(range(610, 710, 10)))
+    timeline.close()
+
+    assert inserted[10] == 6400
+    assert timeline.position == 20 * FRAME + 6400
+    records = read_alignment(recording)[1]
+    skip = records[records["kind"] == SKIP][0]
+    assert skip["length"] == 16000 - 6400
+    assert skip["capture_ns"] == 600 * MS
+
+
+def test_mark_mode_records_the_gap_without_silence(tmp_path):
+    recording, timeline = make_timeline(tmp_path, fill=False, tolerance=0.2)
+    inserted = feed(timeline, list(range(10, 110, 10)) + list(range(610, 710, 10)))
+    timeline.close()
+
+    assert inserted == [0] * 20
+    assert timeline.gaps == 1
+    assert timeline.position == 20 * FRAME
+    assert timeline_summary(recording)["gaps"][0]["type"] == "missing"
+    # Re-anchored after the gap: the frames that follow are on time
+    assert timeline.capture_ns(timeline.position) == 700 * MS
+
+
+def test_burst_ahead_of_the_clock_is_recorded_once(tmp_path):
+    recording, timeline = make_timeline(tmp_path, tolerance=0.2)
+    # 30 frames (300 ms of audio) delivered at the same instant
+    inserted = feed(timeline, [10] * 30)
+    timeline.close()
+
+    assert inserted == [0] * 30
+    # Drift passes -200 ms at the 22nd frame; the timeline re-anchors there
+    assert timeline.gaps == 1
+    records = read_alignment(recording)[1]
+    ahead = records[records["kind"] == AHEAD][0]
+    assert ahead["position"] == 21 * FRAME
+    assert ahead["length"] == 210 * RATE // 1000
+    assert timeline.position == 30 * FRAME
+
+
+def test_seek_maps_time_to_audio_through_a_filled_gap(tmp_path):
+    recording, timeline = make_timeline(tmp_path, fill=True, tolerance=0.2)
+    feed(timeline, list(range(10, 110, 10)) + list(range(610, 1010, 10)))
+    timeline.close()
+
+    result = seek(recording, 0.65)
+    assert result["audio_frame"] == 650 * RATE // 1000
+    assert result["audio_byte_offset"] == 44 + 650 * RATE // 1000 * 2
+    assert result["streams"] == ["audio"]
+    assert result["video_frame"] is None
+    assert result["transcript_offset"] is None
+
+
+def test_seek_inside_a_skipped_gap_maps_to_its_end(tmp_path):
+    recording, timeline = make_timeline(tmp_path, fill=False, tolerance=0.2)
+    feed(timeline, list(range(10, 110, 10)) + list(range(610, 710, 10)))
+    timeline.close()
+
+    assert seek(recording, 0.3)["audio_frame"] == 10 * FRAME
+    assert seek(recording, 0.65)["audio_frame"] == 10 * FRAME + 50 * RATE // 1000
+
+
+def test_seek_finds_the_transcript_line(tmp_path):
+    recording, timeline = make_timeline(tmp_path)
+    feed(timeline, range(10, 2010, 10))
+    timeline.transcript(500 * MS, 900 * MS, "hello")
+    timeline.transcript(1200 * MS, 1500 * MS, "world")
+    timeline.close()
+
+    assert seek(recording, 0.4)["transcript_offset"] is None
+    first = seek(recording, 0.7)
+    second = seek(recording, 1.3)
+    assert first["streams"] == ["audio", "transcript"]
+    assert first["transcript_offset"] == 0
+    assert second["transcript_offset"] == first["transcript_length"]
+    with open(tmp_path / "meeting_recording_1.transcript.jsonl", "rb") as f:
+        f.seek(second["transcript_offset"])
+        assert b'"world"' in f.read(second["transcript_length"])
+
+
+def test_seek_without_index(tmp_path):
+    assert seek(str(tmp_path / "meeting_recording_2.wav"), 1.0) is None
@@ -0,0 +1,310 @@
+"""
+Capture timeline of a recording.
+
+SDK audio callbacks carry no timestamps, so concatenated PCM drifts from the
+wall clock whenever the SDK drops or bursts frames. The bot stamps every frame
+with a monotonic capture time and CaptureTimeline compares it with the audio
+written so far: a gap longer than the tolerance is filled with silence (or only
+recorded, AUDIO_GAP_MODE=mark), and audio running ahead of the clock is
+recorded as well. Sync points of every stream go to one alignment index next
+to the recording:
+
+    meeting_recording_<id>.align.bin          32-byte header, then 32-byte records
+    meeting_recording_<id>.transcript.jsonl   final transcript segments
+
+Each record maps a position in a stream (audio sample frame, video frame,
+transcript byte offset) to a capture time in ns since the recording started.
+All streams share that clock, so a downstream job seeks from a time to an
+audio offset, video frame or transcript line with a binary search instead of
+re-scanning the media.
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from storage import WAV_HEADER_SIZE
+
+INDEX_MAGIC = b"ZAL1"
+INDEX_VERSION = 1
+# magic, version, sample rate, channels, wall clock start, monotonic start ns
+INDEX_HEADER = struct.Struct("<4sIIIdq")
+# kind, flags, capture ns since start, position, length
+INDEX_RECORD = struct.Struct("<4sIqqq")
+RECORD_DTYPE = np.dtype([
+    ("kind", "S4"), ("flags", "<u4"), ("capture_ns", "<i8"), ("position", "<i8"), ("length", "<i8")
+])
+
+# Audio record kinds; position is a sample frame of the recording captured at capture_ns
+SYNC = b"sync"   # periodic sync point
+FILL = b"fill"   # `length` frames of silence inserted at position
+SKIP = b"skip"   # `length` frames missing before position, not filled
+AHEAD = b"over"  # audio ran `length` frames ahead of the clock at position
+AUDIO_KINDS = (SYNC, FILL, SKIP, AHEAD)
+GAP_KINDS = (FILL, SKIP, AHEAD)
+
+VIDEO = b"vidf"  # position is the video frame number
+TEXT = b"text"   # position/length locate a line of the transcript file
+
+# fill, mark, or off: no gap detection, for clocks that do not follow the audio (soak.py)
+GAP_MODE = os.environ.get("AUDIO_GAP_MODE", "fill")
+GAP_TOLERANCE = float(os.environ.get("AUDIO_GAP_TOLERANCE_MS", 200)) / 1000
+# Longer gaps are only recorded, the silence would be mostly useless bytes
+MAX_FILL_SECONDS = float(os.environ.get("AUDIO_GAP_MAX_FILL_SECONDS", 60))
+SYNC_INTERVAL = 1.0
+
+
+def alignment_path(recording):
+    base, _ = os.path.splitext(recording)
+    return base + ".align.bin"
+
+
+def transcript_path(recording):
+    base, _ = os.path.splitext(recording)
+    return base + ".transcript.jsonl"
+
+
+def silence(frames, frame_bytes, chunk_frames=32000):
+    """Zeroed PCM for `frames` sample frames, in chunks of at most chunk_frames"""
+    chunk = bytes(min(frames, chunk_frames) * frame_bytes)
+    while frames > 0:
+        count = min(frames, chunk_frames)
+        yield chunk[:count * frame_bytes]
+        frames -= count
+
+
+class CaptureTimeline:
+    """Gap detection and alignment index of one recording; safe to call from SDK and transcription threads"""
+
+    def __init__(self, recording, sample_rate, channels=1, fill=GAP_MODE == "fill",
+                 tolerance=GAP_TOLERANCE, max_fill_seconds=MAX_FILL_SECONDS, detect=GAP_MODE != "off"):
+        self.sample_rate = sample_rate
+        self.fill = fill
+        self.detect = detect
+        self.tolerance_ns = int(tolerance * 1e9)
+        self.max_fill = int(max_fill_seconds * sample_rate)
+        self.lock = threading.Lock()
+
+        self.origin_ns = time.monotonic_ns()
+        self.index = open(alignment_path(recording), "wb")
+        self.index.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, sample_rate, channels, time.time(), self.origin_ns))
+        self.index.flush()
+        self.transcript_file = None
+        self.transcript_name = transcript_path(recording)
+
+        # Audio position (sample frames written) and the clock anchor it is measured against
+        self.position = 0
+        self.anchor_ns = None
+        self.anchor_position = 0
+        self.last_sync_ns = 0
+        self.gaps = 0
+        self.filled_frames = 0
+
+    def audio(self, frames, captured_ns):
+        """
+        Account for an audio frame of `frames` sample frames that arrived at captured_ns (time.monotonic_ns()).
+
+        Returns:
+            Number of silent sample frames to write before the frame
+        """
+        with self.lock:
+            now = captured_ns - self.origin_ns
+            start = now - frames * 1_000_000_000 // self.sample_rate
+            if self.anchor_ns is None:
+                self._anchor(start)
+                self._record(SYNC, start, self.position)
+
+            # Positive drift: audio is missing; negative: more audio than time has passed
+            drift = start - self.capture_ns(self.position) if self.detect else 0
+            inserted = 0
+            if drift > self.tolerance_ns:
+                missing = drift * self.sample_rate // 1_000_000_000
+                self.gaps += 1
+                if self.fill:
+                    inserted = min(missing, self.max_fill)
+                    self._record(FILL, self.capture_ns(self.position), self.position, inserted)
+                    self.position += inserted
+                    self.filled_frames += inserted
+                if missing > inserted:
+                    self._anchor(start)
+                    self._record(SKIP, start, self.position, missing - inserted)
+            elif drift < -self.tolerance_ns:
+                self.gaps += 1
+                self._record(AHEAD, start, self.position, -drift * self.sample_rate // 1_000_000_000)
+                self._anchor(start)
+
+            self.position += frames
+            if now - self.last_sync_ns >= SYNC_INTERVAL * 1e9:
+                # Callback jitter within the tolerance is not drift; sync points follow the audio clock
+                self._record(SYNC, self.capture_ns(self.position), self.position)
+            return inserted
+
+    def capture_ns(self, position):
+        """Capture time of an audio position, relative to the start; exact for positions since the last discontinuity"""
+        return self.anchor_ns + (position - self.anchor_position) * 1_000_000_000 // self.sample_rate
+
+    def video(self, frame_number, captured_ns):
+        with self.lock:
+            self._record(VIDEO, captured_ns - self.origin_ns, frame_number)
+
+    def transcript(self, start_ns, end_ns, text):
+        """Append a final transcript segment with its capture times (time.monotonic_ns())"""
+        with self.lock:
+            if self.index.closed:
+                return
+            if self.transcript_file is None:
+                self.transcript_file = open(self.transcript_name, "wb")
+            line = json.dumps({
+                "start": (start_ns - self.origin_ns) / 1e9,
+                "end": (end_ns - self.origin_ns) / 1e9,
+                "text": text
+            }).encode() + b"\n"
+            offset = self.transcript_file.tell()
+            self.transcript_file.write(line)
+            self.transcript_file.flush()
+            self._record(TEXT, start_ns - self.origin_ns, offset, len(line))
+
+    def close(self):
+        with self.lock:
+            if self.anchor_ns is not None:
+                self._record(SYNC, self.capture_ns(self.position), self.position)
+            self.index.close()
+            if self.transcript_file is not None:
+                self.transcript_file.close()
+
+    def _anchor(self, start_ns):
+        self.anchor_ns = start_ns
+        self.anchor_position = self.position
+
+    def _record(self, kind, capture_ns, position, length=0):
+        # Deepgram keeps returning results for audio sent before the stop, and an
+        # audio frame can race stop_audio_recording(); both end up here after close()
+        if self.index.closed:
+            return
+        if kind == SYNC:
+            self.last_sync_ns = capture_ns
+        self.index.write(INDEX_RECORD.pack(kind, 0, capture_ns, position, length))
+        self.index.flush()
+
+
+def read_alignment(recording):
+    """
+    Returns:
+        (header dict, structured array of records), or None if the recording has no alignment index
+    """
+    path = alignment_path(recording)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < INDEX_HEADER.size:
+        return None
+    magic, version, sample_rate, channels, started_at, _ = INDEX_HEADER.unpack_from(data)
+    if magic != INDEX_MAGIC or version != INDEX_VERSION:
+        raise ValueError(f"{path} is not an alignment index")
+
+    body = data[INDEX_HEADER.size:]
+    # A bot still recording may be halfway through a record
+    records = np.frombuffer(body[:len(body) - len(body) % RECORD_DTYPE.itemsize], dtype=RECORD_DTYPE)
+    header = {"sample_rate": sample_rate, "channels": channels, "started_at": started_at}
+    return header, records
+
+
+def audio_position(header, records, capture_ns):
+    """Recording sample frame captured at capture_ns; times inside a skipped gap map to its end"""
+    audio = records[np.isin(records["kind"], AUDIO_KINDS)]
+    if len(audio) == 0:
+        return 0
+    # Audio that ran ahead of the clock is re-anchored earlier; keep the times searchable
+    times = np.maximum.accumulate(audio["capture_ns"])
+    i = max(0, np.searchsorted(times, capture_ns, side="right") - 1)
+    position = int(audio["position"][i]) + max(0, capture_ns - int(times[i])) * header["sample_rate"] // 1_000_000_000
+    if i + 1 < len(audio):
+        position = min(position, int(audio["position"][i + 1]))
+    return position
+
+
+def aligned_streams(records):
+    """Streams with records in the index; bots align video only when a renderer is subscribed, which they do not do by default"""
+    kinds = set(records["kind"].tolist())
+    streams = []
+    if kinds & set(AUDIO_KINDS):
+        streams.append("audio")
+    if VIDEO in kinds:
+        streams.append("video")
+    if TEXT in kinds:
+        streams.append("transcript")
+    return streams
+
+
+def seek(recording, seconds):
+    """
+    Locate the moment `seconds` after the recording started in every stream.
+
+    Returns:
+        Dictionary with the streams in the index, the audio frame and WAV byte offset, and the
+        last video frame and transcript line at that time (None when the stream is absent),
+        or None without an index
+    """
+    alignment = read_alignment(recording)
+    if alignment is None:
+        return None
+    header, records = alignment
+    capture_ns = int(seconds * 1e9)
+
+    frame = audio_position(header, records, capture_ns)
+    result = {
+        "seconds": seconds,
+        "streams": aligned_streams(records),
+        "audio_frame": frame,
+        "audio_byte_offset": WAV_HEADER_SIZE + frame * header["channels"] * 2,
+        "video_frame": None,
+        "transcript_offset": None,
+        "transcript_length": None
+    }
+    for kind, name in ((VIDEO, "video"), (TEXT, "transcript")):
+        stream = records[records["kind"] == kind]
+        i = np.searchsorted(stream["capture_ns"], capture_ns, side="right") - 1
+        if i < 0:
+            continue
+        if kind == VIDEO:
+            result["video_frame"] = int(stream["position"][i])
+        else:
+            result["transcript_offset"] = int(stream["position"][i])
+            result["transcript_length"] = int(stream["length"][i])
+    return result
+
+
+def timeline_summary(recording):
+    """Start time, captured duration and discontinuities of a recording, or None without an index"""
+    alignment = read_alignment(recording)
+    if alignment is None:
+        return None
+    header, records = alignment
+    rate = header["sample_rate"]
+
+    audio = records[np.isin(records["kind"], AUDIO_KINDS)]
+    gaps = records[np.isin(records["kind"], GAP_KINDS)]
+    return {
+        "sample_rate": rate,
+        "channels": header["channels"],
+        "started_at": header["started_at"],
+        "streams": aligned_streams(records),
+        "duration": float(audio["capture_ns"].max()) / 1e9 if len(audio) else 0.0,
+        "audio_frames": int(audio["position"].max()) if len(audio) else 0,
+        "video_frames": int(np.count_nonzero(records["kind"] == VIDEO)),
+        "transcript_segments": int(np.count_nonzero(records["kind"] == TEXT)),
+        "gaps": [
+            {
+                "type": {FILL: "filled", SKIP: "missing", AHEAD: "ahead"}[gap["kind"]],
+                "at": int(gap["capture_ns"]) / 1e9,
+                "audio_frame": int(gap["position"]),
+                "seconds": int(gap["length"]) / rate
+            }
+            for gap in gaps
+        ]
+    }
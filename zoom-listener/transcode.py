@@ -0,0 +1,169 @@
+"""
+Transcode-on-demand for /record with a size-bounded cache.
+
+A request for another format or sample rate runs ffmpeg once on a small
+worker pool; concurrent requests for the same variant wait for that single
+run. Results are kept in TRANSCODE_CACHE_DIR, keyed by meeting, format and
+parameters, and the least recently used files are evicted once the cache
+grows beyond TRANSCODE_CACHE_MAX_MB. A cached file is rebuilt when the
+source recording has changed since it was made.
+"""
+
+import collections
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from postprocess import run_ffmpeg
+
+# Format name -> (file extension, ffmpeg codec arguments, media type)
+FORMATS = {
+    "wav": (".wav", ["-codec:a", "pcm_s16le"], "audio/wav"),
+    "mp3": (".mp3", ["-codec:a", "libmp3lame", "-q:a", "4"], "audio/mpeg"),
+    "opus": (".ogg", ["-codec:a", "libopus", "-b:a", "32k"], "audio/ogg"),
+    "flac": (".flac", ["-codec:a", "flac"], "audio/flac")
+}
+
+SAMPLE_RATES = (8000, 16000, 22050, 24000, 32000, 44100, 48000)
+# libopus only encodes these rates
+OPUS_SAMPLE_RATES = (8000, 16000, 24000, 48000)
+
+
+def validate_variant(format, rate=None, channels=None):
+    """Return an error message for an unsupported variant, or None"""
+    if format not in FORMATS:
+        return f"Unsupported format {format!r}; use one of {', '.join(FORMATS)}"
+    if rate is not None and rate not in SAMPLE_RATES:
+        return f"Unsupported rate {rate}; use one of {', '.join(map(str, SAMPLE_RATES))}"
+    if format == "opus" and rate is not None and rate not in OPUS_SAMPLE_RATES:
+        return f"Opus supports rates {', '.join(map(str, OPUS_SAMPLE_RATES))}"
+    if channels is not None and channels not in (1, 2):
+        return "channels must be 1 or 2"
+    return None
+
+
+def source_signature(source):
+    """Size and mtime of a local source; remote sources are treated as immutable"""
+    if not os.path.exists(source):
+        return None
+    stat = os.stat(source)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class TranscodeCache:
+    """LRU cache of transcoded recordings with single-flight ffmpeg runs"""
+
+    def __init__(self, cache_dir, max_bytes=None, workers=None):
+        """
+        Args:
+            cache_dir: Directory holding the transcoded files
+            max_bytes: Cache size limit; defaults to TRANSCODE_CACHE_MAX_MB
+            workers: Concurrent ffmpeg runs; defaults to TRANSCODE_WORKERS
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes or int(os.environ.get("TRANSCODE_CACHE_MAX_MB", 2048)) * 1024 * 1024
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers or int(os.environ.get("TRANSCODE_WORKERS", 2)),
+            thread_name_prefix="transcode"
+        )
+        self.lock = threading.Lock()
+        # file name -> {"size": bytes, "signature": source signature}, oldest first
+        self.entries = collections.OrderedDict()
+        self.total_bytes = 0
+        # file name -> Future of the running transcode
+        self.inflight = {}
+
+    def start(self):
+        """Create the cache directory and pick up the files a previous run left in it"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        files = [name for name in os.listdir(self.cache_dir) if not name.endswith(".tmp")]
+        for name in sorted(files, key=lambda name: os.path.getatime(os.path.join(self.cache_dir, name))):
+            size = os.path.getsize(os.path.join(self.cache_dir, name))
+            # Signatures are not persisted; entries from a previous run are checked by mtime instead
+            self.entries[name] = {"size": size, "signature": None}
+            self.total_bytes += size
+
+    def cache_name(self, meeting_id, format, rate=None, channels=None):
+        extension = FORMATS[format][0]
+        return f"{meeting_id}_{rate or 'orig'}hz_{channels or 'orig'}ch{extension}"
+
+    def get(self, meeting_id, source, format, rate=None, channels=None) -> Future:
+        """
+        Future resolving to (path, hit) for the requested variant.
+
+        Args:
+            meeting_id: Meeting the recording belongs to
+            source: Local path or URL ffmpeg reads the recording from
+            format: Key of FORMATS
+            rate: Output sample rate, None keeps the source rate
+            channels: Output channel count, None keeps the source layout
+        """
+        name = self.cache_name(meeting_id, format, rate, channels)
+        path = os.path.join(self.cache_dir, name)
+        signature = source_signature(source)
+
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is not None and os.path.exists(path) and self._is_fresh(entry, path, signature):
+                self.entries.move_to_end(name)
+                future = Future()
+                future.set_result((path, True))
+                return future
+
+            future = self.inflight.get(name)
+            if future is None:
+                future = self.executor.submit(self._transcode, name, source, signature, format, rate, channels)
+                self.inflight[name] = future
+            return future
+
+    def _is_fresh(self, entry, path, signature):
+        if entry["signature"] is not None or signature is None:
+            return entry["signature"] == signature
+        return os.stat(path).st_mtime_ns >= signature[1]
+
+    def _transcode(self, name, source, signature, format, rate, channels):
+        path = os.path.join(self.cache_dir, name)
+        tmp_path = f"{path}.tmp"
+        args = ["-i", source, "-vn"]
+        if rate:
+            args += ["-ar", str(rate)]
+        if channels:
+            args += ["-ac", str(channels)]
+        args += FORMATS[format][1] + ["-f", _muxer(format), tmp_path]
+
+        try:
+            run_ffmpeg(args)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+            with self.lock:
+                old = self.entries.pop(name, None)
+                if old is not None:
+                    self.total_bytes -= old["size"]
+                self.entries[name] = {"size": size, "signature": signature}
+                self.total_bytes += size
+                self._evict(keep=name)
+            return path, False
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            with self.lock:
+                self.inflight.pop(name, None)
+
+    def _evict(self, keep):
+        """Drop least recently used files until the cache fits; called with the lock held"""
+        for name in list(self.entries):
+            if self.total_bytes <= self.max_bytes:
+                return
+            if name == keep:
+                continue
+            entry = self.entries.pop(name)
+            self.total_bytes -= entry["size"]
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError as e:
+                print(f"Error evicting cached transcode {name}: {e}")
+
+
+def _muxer(format):
+    # The .tmp suffix hides the extension from ffmpeg, so the container is explicit
+    return {"wav": "wav", "mp3": "mp3", "opus": "ogg", "flac": "flac"}[format]